@@ -0,0 +1,157 @@
+# encoding: utf-8
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SamplerCache(object):
+    """ Least recently used cache of prepared random number generators.
+
+    Preparing a random number generator validates the configuration and
+    builds its tables (cumulative probabilities, alias table, ...). The
+    cache keeps the prepared generators, so that the tables are built once
+    per configuration and reused by the following requests.
+
+    The generators are prepared outside the lock of the cache, so building
+    a large table only blocks the requests for the same key. They wait for
+    the generator being prepared instead of preparing it again.
+
+    Attributes:
+        _max_size: The maximum number of cached generators.
+        _samplers: The cached generators in the order of their last use.
+        _pending: The futures of the generators being prepared by their key.
+        _lock: A lock to serialize the access to the cache.
+
+    """
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._samplers = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samplers)
+
+    def __contains__(self, key):
+        return key in self._samplers
+
+    def get(self, key, factory):
+        """ Return the cached generator or prepare a new one.
+
+        Args:
+            key: The key of the generator, e.g. its type and the version of
+                the configuration.
+            factory: A callable without arguments that prepares the generator.
+
+        Returns:
+            The prepared random number generator.
+
+        """
+
+        with self._lock:
+
+            # Mark the generator as the most recently used one
+            if key in self._samplers:
+                self._samplers.move_to_end(key)
+                return self._samplers[key]
+
+            # Wait for the generator if another thread is preparing it
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            sampler = factory()
+
+        except BaseException as error:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            self._samplers[key] = sampler
+
+            # Evict the least recently used generators
+            while len(self._samplers) > self._max_size:
+                self._samplers.popitem(last=False)
+
+        future.set_result(sampler)
+        return sampler
+
+    def peek(self, key):
+        """ Return the cached generator without preparing a new one.
+
+        Args:
+            key: The key of the generator.
+
+        Returns:
+            The cached random number generator or None.
+
+        """
+
+        with self._lock:
+            return self._samplers.get(key)
+
+    def remove(self, predicate):
+        """ Remove the cached generators whose key matches a predicate.
+
+        Args:
+            predicate: A callable that takes a key and returns True if its
+                generator should be removed.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        with self._lock:
+            for key in [key for key in self._samplers if predicate(key)]:
+                del self._samplers[key]
+
+        return self
+
+    def clear(self):
+        """ Remove all the cached generators.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        with self._lock:
+            self._samplers.clear()
+
+        return self
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    from randomgen.core import RandomGenV1
+
+    cache = SamplerCache(max_size=2)
+
+    def prepare():
+        print("Preparing the random number generator")
+        return (
+            RandomGenV1()
+            .set_numbers([1, 2, 3])
+            .set_probabilities([0.2, 0.2, 0.6])
+            .validate()
+        )
+
+    # The second call returns the cached generator
+    rg1 = cache.get((RandomGenV1, 1), prepare)
+    rg2 = cache.get((RandomGenV1, 1), prepare)
+    print("Same generator:", rg1 is rg2)
@@ -5,30 +5,147 @@ from randomgen.errors import (
     RandomGenProbabilitySumError,
     RandomGenEmptyError,
     RandomGenTypeError,
+    RandomGenOptionError,
+    RandomGenNotFoundError,
+)
+from randomgen.histogram import Histogram
+from randomgen.parallel import (
+    MappedArray,
+    count_indices,
+    create_shared_array,
+    fill_shared_array,
+    map_array,
+    split_amount,
+)
+from randomgen.special import gammaln, xlogy, stirling_error, deviance
+from randomgen.streams import (
+    BitSource,
+    CounterStream,
+    random_uniforms,
+    spawn_rngs,
+    validate_rng,
 )
 
+import os
+import copy
+import math
+import numpy
 import random
+from fractions import Fraction
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+# Search modes of RandomGenV1
+SEARCH_BISECT = 'bisect'
+SEARCH_LINEAR = 'linear'
+
+# Largest alias table with 32-bit indices
+ALIAS_INT32_MAX = numpy.iinfo(numpy.int32).max
+
+# Smallest mean of the parametric distributions sampled by rejection
+REJECTION_MIN_MEAN = 10
+
+# Standard deviations (plus one) covered by the inversion tables
+INVERSION_DEVIATIONS = 20
+
+# Largest rate and number of trials of the parametric distributions
+MAX_PARAMETER = 2 ** 53
+
+# Smallest expected count of a bin of the Chi-Square test
+MIN_EXPECTED_COUNT = 5
+
+# Largest number of blocks of numbers evaluated to build the bins
+MAX_BIN_BLOCKS = 4096
+
+# Candidates per number of a seeded stream of the rejection methods
+SEEDED_ATTEMPTS = 4
 
 
 class RandomGenABC(metaclass=ABCMeta):
     """Abstract base class for random number generators.
 
+    The numbers and probabilities can be given as lists or as NumPy arrays.
+    Arrays, including read-only memory-mapped ones, are used without being
+    copied, and all the prepared tables are typed arrays, so distributions
+    with tens of millions of numbers do not need a Python object for every
+    entry. Memory-mapped tables are mapped again instead of being copied
+    when the generator is sent to another process.
+
     Attributes:
-        _numbers: A list of numbers.
-        _probabilities: A list of probabilities.
-        _cumulative_probabilities: A list of cumulative probabilities.
+        _numbers: A list or an array of numbers.
+        _probabilities: A list or an array of probabilities.
+        _numbers_array: The numbers as an array for the batch generation.
+        _cumulative_array: The cumulative probabilities as an array.
+        _rng: The random number generator of the instance, either a
+            numpy.random.Generator (PCG64 by default) or a random.Random.
 
     """
 
     def __init__(self):
         self._numbers = ()
         self._probabilities = ()
-        self._cumulative_probabilities = []
+        self._numbers_array = None
+        self._cumulative_array = None
+        self._rng = numpy.random.default_rng()
+
+    def __copy__(self):
+        # The copies share the tables, also the memory-mapped ones
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def __getstate__(self):
+        # Send the location of the memory-mapped tables instead of the data
+        return {
+            name: map_array(value) or value
+            for name, value in self.__dict__.items()
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update({
+            name: value.open() if isinstance(value, MappedArray) else value
+            for name, value in state.items()
+        })
 
     def __str__(self):
         return f"Numbers: {self._numbers}, Probabilities: {self._probabilities}"
 
+    def set_rng(self, rng):
+        """ Set the random number generator of the instance.
+
+        Args:
+            rng: A random.Random or a numpy.random.Generator object.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._rng = validate_rng(rng)
+        return self
+
+    def spawn(self, amount):
+        """ Create copies with independent random number generators.
+
+        The copies share the numbers and the prepared tables, so they are
+        cheap to create, e.g. one for every thread or process.
+
+        Args:
+            amount: The number of copies.
+
+        Returns:
+            A list of random number generators.
+
+        """
+
+        children = []
+        for rng in spawn_rngs(self._rng, amount):
+            child = copy.copy(self)
+            child._rng = rng
+            children.append(child)
+
+        return children
+
     def from_dict(self, dict_obj):
         """Set the numbers and probabilities from a dictionary.
 
@@ -81,6 +198,16 @@ class RandomGenABC(metaclass=ABCMeta):
         if self._numbers is None:
             raise RandomGenTypeError()
 
+        # Check the arrays without iterating over them
+        elif isinstance(self._numbers, numpy.ndarray):
+            numbers = self._numbers
+
+            if numbers.ndim != 1 or numbers.dtype.kind not in 'iuf':
+                raise RandomGenTypeError()
+
+            elif not numbers.size:
+                raise RandomGenEmptyError()
+
         # Check if the numbers are iterable
         elif not hasattr(self._numbers, '__iter__'):
             raise RandomGenTypeError()
@@ -125,6 +252,23 @@ class RandomGenABC(metaclass=ABCMeta):
         if self._probabilities is None:
             raise RandomGenTypeError()
 
+        # Check the arrays without iterating over them
+        elif isinstance(self._probabilities, numpy.ndarray):
+            probabilities = self._probabilities
+
+            if (probabilities.ndim != 1
+                    or probabilities.dtype.kind not in 'iuf'):
+                raise RandomGenTypeError()
+
+            elif not probabilities.size:
+                raise RandomGenEmptyError()
+
+            elif (probabilities < 0).any():
+                raise RandomGenTypeError()
+
+            elif round(float(probabilities.sum()), 3) != 1:
+                raise RandomGenProbabilitySumError()
+
         # Check if the numbers are iterable
         elif not hasattr(self._probabilities, '__iter__'):
             raise RandomGenTypeError()
@@ -164,11 +308,9 @@ class RandomGenABC(metaclass=ABCMeta):
 
         """
 
-        self._cumulative_probabilities = [
-            sum(self._probabilities[:i + 1])
-            for i in
-            range(len(self._probabilities))
-        ]
+        self._cumulative_array = numpy.cumsum(
+            numpy.asarray(self._probabilities, dtype=float))
+        return self
 
     def validate(self):
         """ Validate all the attributes of the class.
@@ -189,20 +331,230 @@ class RandomGenABC(metaclass=ABCMeta):
         # After the validation calculate the cumulative probabilities
         self.calc_cdf()
 
+        # Prepare the arrays for the batch generation
+        self.calc_arrays()
+
+        return self
+
+    def calc_arrays(self):
+        """ Convert the numbers to an array.
+
+        Arrays of numbers are used as they are. Mixed integers and floats are
+        kept as Python objects, so that the generated numbers have the same
+        type as the configured ones.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if isinstance(self._numbers, numpy.ndarray):
+            self._numbers_array = self._numbers
+            return self
+
+        numbers = list(self._numbers)
+        self._numbers_array = numpy.asarray(numbers)
+
+        # Avoid the promotion of the integers to floats
+        if (self._numbers_array.dtype.kind == 'f'
+                and not all(isinstance(num, float) for num in numbers)):
+            self._numbers_array = numpy.asarray(numbers, dtype=object)
+
+        return self
+
+    def get_tables(self):
+        """ Return the prepared tables of a validated generator.
+
+        Returns:
+            dict: The arrays of the numbers, the probabilities and the
+            cumulative probabilities.
+
+        """
+
+        return {
+            'numbers': self._numbers_array,
+            'probabilities': numpy.asarray(self._probabilities, dtype=float),
+            'cumulative': self._cumulative_array,
+        }
+
+    def set_tables(self, tables):
+        """ Restore the prepared tables saved by get_tables().
+
+        The tables are used as they are, e.g. memory-mapped arrays, and are
+        not validated again.
+
+        Args:
+            tables: A dictionary with the arrays of the tables.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._numbers = self._numbers_array = tables['numbers']
+        self._probabilities = tables['probabilities']
+        self._cumulative_array = tables['cumulative']
+
         return self
 
-    def generate(self, amount):
+    def select_indices(self, uniforms):
+        """ Map uniform random values to the indices of the numbers.
+
+        The indices are found by a binary search in the cumulative
+        probabilities, which is the vectorized form of the inverse transform.
+
+        Args:
+            uniforms: An array of random values in the interval [0, 1).
+
+        Returns:
+            An array of indices into the numbers.
+
+        """
+
+        indices = numpy.searchsorted(self._cumulative_array, uniforms)
+
+        # Rounding errors may leave the last cumulative probability below 1
+        return numpy.minimum(indices, len(self._cumulative_array) - 1)
+
+    def generate_indices(self, amount):
+        """ Generate the indices of random numbers in a single batch.
+
+        Args:
+            amount: The number of random numbers to generate.
+
+        Returns:
+            An array of indices into the numbers.
+
+        """
+
+        return self.select_indices(random_uniforms(self._rng, amount))
+
+    def generate_array(self, amount):
+        """ Generate an array of random numbers in a single batch.
+
+        Args:
+            amount: The number of random numbers to generate.
+
+        Returns:
+            A NumPy array of random numbers.
+
+        """
+
+        return self._numbers_array[self.generate_indices(amount)]
+
+    def map_uniforms(self, uniforms):
+        """ Map uniform random values to random numbers.
+
+        Args:
+            uniforms: An array of random values in the interval [0, 1).
+
+        Returns:
+            A NumPy array of random numbers.
+
+        """
+
+        return self._numbers_array[self.select_indices(uniforms)]
+
+    def generate_seeded(self, amount, seed, offset=0, as_array=False):
+        """ Generate the random numbers at the given positions of a stream.
+
+        The number at each position depends only on the seed, the position
+        and the configuration, so any slice of the stream can be generated
+        directly and reproduced later.
+
+        Args:
+            amount: The number of random numbers to generate.
+            seed: The seed of the stream.
+            offset: The position of the first random number.
+            as_array: Return a NumPy array instead of a list.
+
+        Returns:
+            A list of random numbers.
+
+        """
+
+        uniforms = CounterStream(seed).uniforms(offset, amount)
+        numbers = self.map_uniforms(uniforms)
+        return numbers if as_array else numbers.tolist()
+
+    def generate(self, amount, as_array=False):
         """ Generate random numbers based on the probabilities.
 
         Args:
             amount: The number of random numbers to generate.
+            as_array: Return a NumPy array instead of a list.
 
         Returns:
             A list of random numbers.
 
         """
 
-        return [self.next_num() for _ in range(amount)]
+        numbers = self.generate_array(amount)
+        return numbers if as_array else numbers.tolist()
+
+    def generate_parallel(self, amount, workers=None, histogram=False):
+        """ Generate random numbers in a pool of processes.
+
+        Every worker gets a copy of the generator with an independent random
+        number generator and writes its slice of the numbers directly into a
+        shared array, so no lists are sent back to the parent process. With
+        the histogram option the workers only send back their counts.
+
+        Args:
+            amount: The number of random numbers to generate.
+            workers: The number of processes (all CPUs by default).
+            histogram: Return the histogram of the numbers instead.
+
+        Returns:
+            A NumPy array of random numbers or a Histogram.
+
+        """
+
+        if amount <= 0 and not histogram:
+            return numpy.empty(0, dtype=self._numbers_array.dtype)
+
+        workers = workers or os.cpu_count()
+        children = self.spawn(workers)
+        bounds = split_amount(amount, workers)
+        size = len(self._numbers_array)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+
+            # Merge the counts of the workers into a single histogram
+            if histogram:
+                futures = [
+                    pool.submit(count_indices, child, stop - start, size)
+                    for child, (start, stop) in zip(children, bounds)
+                ]
+                counts = sum(future.result() for future in futures)
+                return Histogram().from_counts({
+                    num: count
+                    for num, count in
+                    zip(self._numbers_array.tolist(), counts.tolist())
+                    if count
+                })
+
+            # Objects cannot be shared, so the workers generate the indices
+            indices = self._numbers_array.dtype == object
+            dtype = numpy.dtype(
+                numpy.int64 if indices else self._numbers_array.dtype)
+
+            path, array = create_shared_array(amount, dtype)
+
+            try:
+                futures = [
+                    pool.submit(fill_shared_array, child, path, dtype.str,
+                                amount, start, stop, indices)
+                    for child, (start, stop) in zip(children, bounds)
+                ]
+                for future in futures:
+                    future.result()
+
+            finally:
+                # The mapping stays valid after the file is removed
+                os.unlink(path)
+
+        return self._numbers_array[array] if indices else array
 
     @abstractmethod
     def next_num(self):
@@ -216,30 +568,1627 @@ class RandomGenABC(metaclass=ABCMeta):
 
 
 class RandomGenV1(RandomGenABC):
+    """ Random number generator based on the inverse transform.
+
+    The cumulative probabilities are searched with a binary search. The
+    original linear scan is kept as a search mode, so that the results can
+    be compared with older versions for the same random seed.
+
+    Attributes:
+        _search: The search mode, either SEARCH_BISECT or SEARCH_LINEAR.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._search = SEARCH_BISECT
+
+    def set_search(self, mode):
+        """ Set the search mode in the cumulative probabilities.
+
+        Args:
+            mode: The search mode, either SEARCH_BISECT or SEARCH_LINEAR.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if mode not in (SEARCH_BISECT, SEARCH_LINEAR):
+            raise RandomGenOptionError()
+
+        self._search = mode
+        return self
+
+    def generate_array(self, amount):
+        """ Generate an array of random numbers.
+
+        In the linear search mode the numbers are generated one by one like
+        in the previous versions.
+
+        Args:
+            amount: The number of random numbers to generate.
+
+        Returns:
+            A NumPy array of random numbers.
+
+        """
+
+        if self._search == SEARCH_LINEAR:
+            return numpy.asarray(
+                [self.next_num() for _ in range(amount)],
+                dtype=self._numbers_array.dtype
+            )
+
+        return super().generate_array(amount)
 
     def next_num(self):
-        """ Generate a random number using the random.random() function.
+        """ Generate a random number using the random() method of the RNG.
 
         Returns:
             A random number.
         """
 
-        rand = random.random()
-        for i, cum_prob in enumerate(self._cumulative_probabilities):
-            if rand <= cum_prob:
-                return self._numbers[i]
+        rand = self._rng.random()
+
+        # Scan the cumulative probabilities like in the previous versions
+        if self._search == SEARCH_LINEAR:
+            for i, cum_prob in enumerate(self._cumulative_array):
+                if rand <= cum_prob:
+                    return self._numbers[i]
+
+        # Find the first cumulative probability greater or equal to rand
+        index = int(numpy.searchsorted(self._cumulative_array, rand))
+        return self._numbers[min(index, len(self._numbers) - 1)]
 
 
 class RandomGenV2(RandomGenABC):
 
     def next_num(self):
-        """ Generate a random number using the random.choice() function.
+        """ Generate a random number using the random.choices() method.
+
+        NumPy generators do not provide choices(), so the same search in the
+        cumulative probabilities is done directly.
+
+        Returns:
+            A random number.
+        """
+
+        cumulative = self._cumulative_array
+
+        if isinstance(self._rng, random.Random):
+            return self._rng.choices(
+                self._numbers, cum_weights=cumulative)[0]
+
+        rand = self._rng.random() * cumulative[-1]
+        index = int(numpy.searchsorted(cumulative, rand, side='right'))
+        return self._numbers[min(index, len(cumulative) - 1)]
+
+    def select_indices(self, uniforms):
+        """ Map uniform random values to indices like random.choices().
+
+        Args:
+            uniforms: An array of random values in the interval [0, 1).
+
+        Returns:
+            An array of indices into the numbers.
+
+        """
+
+        cumulative = self._cumulative_array
+        indices = numpy.searchsorted(
+            cumulative, uniforms * cumulative[-1], side='right')
+
+        return numpy.minimum(indices, len(cumulative) - 1)
+
+
+class RandomGenV3(RandomGenABC):
+    """ Random number generator based on the alias method.
+
+    The alias table is built once by a vectorized form of Vose's algorithm
+    during the validation, after which every random number is drawn in
+    constant time regardless of the number of categories.
+
+    Attributes:
+        _alias_probabilities: The probability to keep the drawn column.
+        _alias_indices: The index of the alias number of each column.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._alias_probabilities = []
+        self._alias_indices = []
+
+    def calc_alias(self):
+        """ Calculate the alias table using a vectorized Vose's algorithm.
+
+        The underfull columns are filled in order from the current overfull
+        column. An overfull column which falls below 1 becomes underfull and
+        is filled from the next one. Both steps only depend on the running
+        sums of the missing and of the excess heights, so the table is built
+        with array operations instead of a loop over the columns.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        probabilities = numpy.asarray(self._probabilities, dtype=float)
+        size = probabilities.size
+
+        # Scale the probabilities so that the average column height is 1
+        scaled = probabilities * size
+
+        # Split the columns into underfull and overfull ones
+        small = numpy.flatnonzero(scaled < 1)
+        large = numpy.flatnonzero(scaled >= 1)
+
+        # The remaining columns are full up to rounding errors
+        self._alias_probabilities = numpy.ones(size)
+        index_type = numpy.int32 if size <= ALIAS_INT32_MAX else numpy.int64
+        self._alias_indices = numpy.arange(size, dtype=index_type)
+
+        if not small.size or not large.size:
+            return self
+
+        missing = numpy.cumsum(1 - scaled[small])
+        excess = numpy.cumsum(scaled[large] - 1)
+
+        # Each underfull column is filled from the current overfull one
+        before = numpy.concatenate(([0.0], missing[:-1]))
+        donors = numpy.minimum(
+            numpy.searchsorted(excess, before), large.size - 1)
+
+        self._alias_probabilities[small] = scaled[small]
+        self._alias_indices[small] = large[donors]
+
+        # An overfull column falls below 1 at the first underfull column
+        # which it cannot fill, and the next overfull column fills it up
+        stops = numpy.searchsorted(missing, excess[:-1], side='right')
+        used = numpy.flatnonzero(stops < small.size)
+
+        self._alias_probabilities[large[used]] = (
+            1 - (missing[stops[used]] - excess[used]))
+        self._alias_indices[large[used]] = large[used + 1]
+
+        return self
+
+    def validate(self):
+        """ Validate all the attributes and build the alias table.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        super().validate()
+        self.calc_alias()
+        return self
+
+    def get_tables(self):
+        """ Return the prepared tables including the alias table.
+
+        Returns:
+            dict: The arrays of the tables.
+
+        """
+
+        tables = super().get_tables()
+        tables['alias_probabilities'] = self._alias_probabilities
+        tables['alias_indices'] = self._alias_indices
+        return tables
+
+    def set_tables(self, tables):
+        """ Restore the prepared tables including the alias table.
+
+        Args:
+            tables: A dictionary with the arrays of the tables.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        super().set_tables(tables)
+        self._alias_probabilities = tables['alias_probabilities']
+        self._alias_indices = tables['alias_indices']
+        return self
+
+    def next_num(self):
+        """ Generate a random number using the alias table.
 
         Returns:
             A random number.
         """
 
-        return random.choices(self._numbers, self._probabilities, k=1)[0]
+        column = int(self._rng.random() * len(self._alias_indices))
+        if self._rng.random() < self._alias_probabilities[column]:
+            return self._numbers[column]
+        return self._numbers[self._alias_indices[column]]
+
+    def select_indices(self, uniforms):
+        """ Map uniform random values to indices using the alias table.
+
+        The integer part of the scaled value selects the column and the
+        fractional part decides between the column and its alias.
+
+        Args:
+            uniforms: An array of random values in the interval [0, 1).
+
+        Returns:
+            An array of indices into the numbers.
+
+        """
+
+        size = len(self._alias_indices)
+        scaled = uniforms * size
+        columns = numpy.minimum(scaled.astype(numpy.int64), size - 1)
+        keep = (scaled - columns) < self._alias_probabilities[columns]
+
+        return numpy.where(keep, columns, self._alias_indices[columns])
+
+
+class RandomGenV4(RandomGenABC):
+    """ Random number generator with dynamic weights.
+
+    The weights are stored in a Fenwick tree (binary indexed tree), so that
+    a weight can be updated, a number inserted or removed and a random
+    number drawn in O(log n) without rebuilding any table. The weights do
+    not need to sum to 1 after the updates. Removed numbers keep their slot
+    with a zero weight.
+
+    Attributes:
+        _weights: The weight of each slot.
+        _tree: The Fenwick tree of the weights (1-based).
+        _capacity: The number of slots, a power of 2.
+        _size: The number of used slots.
+        _positions: The slot of each number in the distribution.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._weights = None
+        self._tree = None
+        self._capacity = 0
+        self._size = 0
+        self._positions = {}
+
+    def to_dict(self):
+        """ Return the numbers and their current probabilities.
+
+        Returns:
+            A dictionary of numbers and respective probabilities.
+
+        """
+
+        total = self.total()
+        return {
+            num: float(self._weights[index]) / total
+            for num, index in self._positions.items()
+        }
+
+    def validate(self):
+        """ Validate all the attributes and build the Fenwick tree.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        super().validate()
+
+        # Allocate the slots for the validated numbers
+        self._weights = None
+        self.calc_tree()
+
+        return self
+
+    def calc_tree(self):
+        """ Build the Fenwick tree of the weights in O(n).
+
+        This can also be used to remove the rounding errors accumulated by
+        many updates.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if self._weights is None:
+            self._numbers = list(self._numbers)
+            self._size = len(self._numbers)
+            self._positions = {
+                num: index for index, num in enumerate(self._numbers)}
+            self._resize(self._size, self._probabilities)
+
+        # Node i holds the sum of the weights in (i - lowbit(i), i]
+        prefix = numpy.concatenate(([0.0], numpy.cumsum(self._weights)))
+        nodes = numpy.arange(1, self._capacity + 1)
+        self._tree = numpy.zeros(self._capacity + 1)
+        self._tree[1:] = prefix[nodes] - prefix[nodes - (nodes & -nodes)]
+
+        return self
+
+    def _resize(self, size, weights):
+        """ Allocate the slots for at least the given number of weights. """
+
+        self._capacity = 1 << max(size - 1, 0).bit_length()
+
+        self._weights = numpy.zeros(self._capacity)
+        self._weights[:len(weights)] = weights
+
+        # Unused slots of the numbers are never selected
+        numbers = self._numbers_array
+        self._numbers_array = numpy.zeros(self._capacity, dtype=numbers.dtype)
+        self._numbers_array[:self._size] = numbers[:self._size]
+
+    def total(self):
+        """ Return the sum of all the weights.
+
+        Returns:
+            float: The total weight.
+
+        """
+
+        # The last node of a power of 2 covers all the slots
+        return float(self._tree[self._capacity])
+
+    def _add(self, index, delta):
+        """ Add a delta to the weight of a slot in O(log n). """
+
+        self._weights[index] += delta
+
+        node = index + 1
+        while node <= self._capacity:
+            self._tree[node] += delta
+            node += node & -node
+
+    def weight(self, number):
+        """ Return the current weight of a number.
+
+        Args:
+            number: A number.
+
+        Returns:
+            float: The weight of the number, 0 if it is not configured.
+
+        """
+
+        index = self._positions.get(number)
+        return 0.0 if index is None else float(self._weights[index])
+
+    def _last_positive(self):
+        """ Return the last used slot with a positive weight. """
+
+        return int(numpy.flatnonzero(self._weights[:self._size] > 0)[-1])
+
+    def _check_weight(self, weight):
+        """ Check if the weight is a non-negative number. """
+
+        if not isinstance(weight, (int, float)) or weight < 0:
+            raise RandomGenTypeError()
+
+    def update_weight(self, number, weight):
+        """ Change the weight of a number in O(log n).
+
+        Args:
+            number: A number of the distribution.
+            weight: The new non-negative weight.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._check_weight(weight)
+
+        if number not in self._positions:
+            raise RandomGenNotFoundError()
+
+        index = self._positions[number]
+        self._add(index, weight - self._weights[index])
+
+        return self
+
+    def insert(self, number, weight):
+        """ Add a number to the distribution in amortized O(log n).
+
+        The weight of a number already in the distribution is updated.
+
+        Args:
+            number: The new number.
+            weight: The non-negative weight of the number.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if not isinstance(number, (int, float)):
+            raise RandomGenTypeError()
+
+        self._check_weight(weight)
+
+        if number in self._positions:
+            return self.update_weight(number, weight)
+
+        # Double the slots when they are full
+        if self._size == self._capacity:
+            self._resize(self._size + 1, self._weights[:self._size])
+            self.calc_tree()
+
+        # Keep the type of the number in the array of numbers
+        kind = self._numbers_array.dtype.kind
+        if (kind in 'iu') != isinstance(number, int) and kind != 'O':
+            self._numbers_array = self._numbers_array.astype(object)
+
+        index = self._size
+        self._numbers.append(number)
+        self._numbers_array[index] = number
+        self._positions[number] = index
+        self._size += 1
+
+        self._add(index, weight)
+
+        return self
+
+    def remove(self, number):
+        """ Remove a number from the distribution in O(log n).
+
+        Args:
+            number: A number of the distribution.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self.update_weight(number, 0)
+        del self._positions[number]
+
+        return self
+
+    def copy(self):
+        """ Return a copy that can be updated independently.
+
+        Returns:
+            A new random number generator with copied tables.
+
+        """
+
+        clone = copy.copy(self)
+        clone._numbers = list(self._numbers)
+        clone._numbers_array = self._numbers_array.copy()
+        clone._weights = self._weights.copy()
+        clone._tree = self._tree.copy()
+        clone._positions = dict(self._positions)
+
+        return clone
+
+    def select_indices(self, uniforms):
+        """ Map uniform random values to indices by descending the tree.
+
+        All the values descend the tree together, level by level.
+
+        Args:
+            uniforms: An array of random values in the interval [0, 1).
+
+        Returns:
+            An array of indices into the numbers.
+
+        """
+
+        total = self.total()
+        if total <= 0:
+            raise RandomGenEmptyError()
+
+        remaining = numpy.asarray(uniforms) * total
+        positions = numpy.zeros(remaining.shape, dtype=numpy.int64)
+
+        # Find the last slot whose prefix sum is not above the value
+        step = self._capacity
+        while step:
+            nodes = positions + step
+            sums = self._tree[numpy.minimum(nodes, self._capacity)]
+            take = (nodes <= self._capacity) & (sums <= remaining)
+            remaining = numpy.where(take, remaining - sums, remaining)
+            positions = numpy.where(take, nodes, positions)
+            step >>= 1
+
+        # Rounding errors may go past the last slot with a positive weight
+        invalid = positions >= self._size
+        invalid[~invalid] = self._weights[positions[~invalid]] <= 0
+        if invalid.any():
+            positions[invalid] = self._last_positive()
+
+        return positions
+
+    def next_num(self):
+        """ Generate a random number by descending the Fenwick tree.
+
+        Returns:
+            A random number.
+        """
+
+        total = self.total()
+        if total <= 0:
+            raise RandomGenEmptyError()
+
+        remaining = self._rng.random() * total
+        position = 0
+
+        step = self._capacity
+        while step:
+            node = position + step
+            if node <= self._capacity and self._tree[node] <= remaining:
+                position = node
+                remaining -= self._tree[node]
+            step >>= 1
+
+        # Rounding errors may go past the last slot with a positive weight
+        if position >= self._size or self._weights[position] <= 0:
+            position = self._last_positive()
+
+        return self._numbers[position]
+
+
+class RandomGenV5(RandomGenABC):
+    """ Random number generator based on the Fast Loaded Dice Roller.
+
+    The distribution is given by integer weights, or by the probabilities,
+    which are converted exactly to integer weights with a common power of
+    two as denominator. The numbers are drawn by a random walk down the
+    binary expansions of the weights (Saad et al., 2020), which is exact
+    for the weights and uses less than H + 6 random bits per number on
+    average, where H is the entropy of the distribution.
+
+    The bits come from a buffered bit source, so no bit of the random
+    number generator is wasted. The walks of a batch advance together,
+    one level per round. Seeded streams use the inverse transform of the
+    base class, since their values must only depend on the position.
+
+    Attributes:
+        _weights: A list or an array of non-negative integer weights, or
+            None to use the probabilities.
+        _depth: The number of levels, the bit length of the total weight.
+        _level_offsets: The position of the first entry of each level.
+        _level_indices: The indices of the numbers whose weight has a one
+            bit at each level, the level of the rejection last.
+        _reject_index: The index of the rejection in the levels.
+        _bits: The bit source of the random number generator.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._weights = None
+        self._depth = 0
+        self._level_offsets = None
+        self._level_indices = None
+        self._reject_index = None
+        self._bits = None
+
+    def set_weights(self, values):
+        """ Set integer weights instead of the probabilities.
+
+        Args:
+            values: A list or an array of non-negative integers.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._weights = values
+        return self
+
+    def set_probabilities(self, values):
+        """ Set the probabilities instead of the integer weights.
+
+        Args:
+            values: A list of probabilities.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._weights = None
+        return super().set_probabilities(values)
+
+    def validate_weights(self):
+        """ Validate the integer weights.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        weights = self._weights
+
+        # Check the arrays without iterating over them
+        if isinstance(weights, numpy.ndarray):
+            if weights.ndim != 1 or weights.dtype.kind not in 'iu':
+                raise RandomGenTypeError()
+
+            elif not weights.size:
+                raise RandomGenEmptyError()
+
+            elif (weights < 0).any():
+                raise RandomGenTypeError()
+
+            elif not weights.any():
+                raise RandomGenProbabilitySumError()
+
+        # Check if the weights are iterable
+        elif not hasattr(weights, '__iter__') or isinstance(weights, dict):
+            raise RandomGenTypeError()
+
+        # Check if empty
+        elif not weights:
+            raise RandomGenEmptyError()
+
+        # Check if any member is not an integer
+        elif not all(isinstance(weight, int) for weight in weights):
+            raise RandomGenTypeError()
+
+        # Check if the weights are non-negative
+        elif any(weight < 0 for weight in weights):
+            raise RandomGenTypeError()
+
+        # Check if any weight is positive
+        elif not any(weights):
+            raise RandomGenProbabilitySumError()
+
+        return self
+
+    def calc_weights(self):
+        """ Convert the probabilities exactly to integer weights.
+
+        Floats are binary fractions, so the weights are the numerators over
+        the least common multiple of their denominators.
+
+        Returns:
+            list: The integer weights.
+
+        """
+
+        fractions = [
+            Fraction(probability) for probability in self._probabilities]
+
+        denominator = math.lcm(*(value.denominator for value in fractions))
+
+        return [value.numerator * (denominator // value.denominator)
+                for value in fractions]
+
+    def validate(self):
+        """ Validate all the attributes and build the tables of the walk.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self.validate_numbers()
+
+        # The integer weights replace the probabilities
+        if self._weights is not None:
+            self.validate_weights()
+            weights = [int(weight) for weight in self._weights]
+            total = sum(weights)
+            self._probabilities = [weight / total for weight in weights]
+
+        else:
+            self.validate_probabilities()
+            weights = self.calc_weights()
+
+        if len(self._numbers) != len(weights):
+            raise RandomGenMismatchError()
+
+        self.calc_cdf()
+        self.calc_arrays()
+        self.calc_levels(weights)
+
+        return self
+
+    def calc_levels(self, weights):
+        """ Calculate the levels of the walk from the integer weights.
+
+        The weights are reduced by their greatest common divisor and
+        completed with a rejection weight up to the next power of two. The
+        level j lists the numbers whose weight has the bit of 2 ** (depth -
+        j - 1) set, so the walk takes the heaviest numbers first.
+
+        Args:
+            weights: A list of non-negative integers.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        divisor = math.gcd(*weights)
+        weights = [weight // divisor for weight in weights]
+        total = sum(weights)
+
+        self._depth = (total - 1).bit_length()
+        self._reject_index = len(weights)
+        weights.append((1 << self._depth) - total)
+
+        # Binary expansions of the weights, one row per weight
+        width = max(1, (self._depth + 7) // 8)
+        data = b''.join(weight.to_bytes(width, 'big') for weight in weights)
+        bits = numpy.unpackbits(
+            numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, width),
+            axis=1)[:, 8 * width - self._depth:]
+
+        # The positive weights, level by level
+        levels, indices = numpy.nonzero(bits.T)
+        counts = numpy.bincount(levels, minlength=self._depth)
+
+        index_type = (
+            numpy.int32 if len(weights) <= ALIAS_INT32_MAX else numpy.int64)
+        self._level_offsets = numpy.concatenate(([0], numpy.cumsum(counts)))
+        self._level_indices = indices.astype(index_type)
+
+        # A single number is drawn without any bit
+        if not self._depth:
+            self._level_indices = numpy.flatnonzero(
+                numpy.asarray(weights[:-1])).astype(index_type)
+
+        return self
+
+    def bit_source(self):
+        """ Return the bit source of the random number generator.
+
+        The source is created again after the generator is replaced, e.g. in
+        the copies made by spawn().
+
+        Returns:
+            BitSource: The bit source.
+
+        """
+
+        if self._bits is None or self._bits.rng is not self._rng:
+            self._bits = BitSource(self._rng)
+
+        return self._bits
+
+    def generate_indices(self, amount):
+        """ Generate the indices of random numbers with the walk.
+
+        Every pending walk takes one bit per round. A walk which reaches an
+        entry of its level stops there, and starts again from the top if
+        the entry is the rejection.
+
+        Args:
+            amount: The number of random numbers to generate.
+
+        Returns:
+            An array of indices into the numbers.
+
+        """
+
+        if not self._depth:
+            return numpy.full(amount, self._level_indices[0])
+
+        offsets = self._level_offsets
+        counts = numpy.diff(offsets)
+        bits = self.bit_source()
+
+        indices = numpy.empty(amount, dtype=numpy.int64)
+        pending = numpy.arange(amount)
+        levels = numpy.zeros(amount, dtype=numpy.int64)
+        distances = numpy.zeros(amount, dtype=numpy.int64)
+
+        while pending.size:
+            distances = 2 * distances + bits.bits(pending.size)
+            level_counts = counts[levels]
+            hits = distances < level_counts
+
+            # The walks which reach an entry of their level
+            drawn = self._level_indices[
+                offsets[levels[hits]] + distances[hits]]
+            accepted = drawn != self._reject_index
+            indices[pending[hits][accepted]] = drawn[accepted]
+
+            # The others go one level down or start again after a rejection
+            distances[~hits] -= level_counts[~hits]
+            levels[~hits] += 1
+
+            keep = ~hits
+            keep[numpy.flatnonzero(hits)[~accepted]] = True
+            levels[hits] = 0
+            distances[hits] = 0
+
+            pending = pending[keep]
+            levels = levels[keep]
+            distances = distances[keep]
+
+        return indices
+
+    def entropy(self):
+        """ Return the entropy of the distribution in bits.
+
+        The walk uses less than entropy() + 6 random bits per number on
+        average.
+
+        Returns:
+            float: The Shannon entropy of the probabilities.
+
+        """
+
+        probabilities = numpy.asarray(self._probabilities, dtype=float)
+        probabilities = probabilities[probabilities > 0]
+        probabilities = probabilities / probabilities.sum()
+
+        return float(-(probabilities * numpy.log2(probabilities)).sum())
+
+    def next_num(self):
+        """ Generate a random number with the walk.
+
+        Returns:
+            A random number.
+        """
+
+        return self._numbers[int(self.generate_indices(1)[0])]
+
+
+class RandomGenParametric(RandomGenABC):
+    """ Base class of the generators of parametric distributions.
+
+    The numbers are drawn from the distribution given by its parameters
+    instead of a table of numbers and probabilities. Distributions with a
+    small spread are sampled by the inversion of a short table of the CDF,
+    which is exact up to the rounding errors. The others are sampled by a
+    transformed rejection method in vectorized rounds, where only the
+    rejected numbers are drawn again.
+
+    Seeded streams draw SEEDED_ATTEMPTS candidates for every position, and
+    the rare positions where all of them are rejected continue in further
+    lanes of the stream, so every number only depends on its position.
+
+    Attributes:
+        _rejection: True if the rejection method is used.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._rejection = False
+
+    @abstractmethod
+    def validate_parameters(self):
+        """ Validate the parameters of the distribution.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def spread(self):
+        """ Return the spread of the distribution which selects the method.
+
+        Returns:
+            float: The mean of the sampled distribution.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def log_pmf(self, values):
+        """ Return the logarithm of the probability mass function.
+
+        Args:
+            values: An array of numbers in the support.
+
+        Returns:
+            An array with the logarithms of the probabilities.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def moments(self):
+        """ Return the mean and the standard deviation of the distribution.
+
+        Returns:
+            tuple: The mean, the standard deviation and the largest number of
+            the support.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def calc_table(self):
+        """ Calculate the table of the inversion method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def calc_rejection(self):
+        """ Calculate the constants of the rejection method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reject(self, u, v):
+        """ Transform pairs of uniform values into candidate numbers.
+
+        Args:
+            u: An array of random values in the interval [0, 1).
+            v: An array of random values in the interval [0, 1).
+
+        Returns:
+            tuple: The array of candidate numbers and the boolean array of
+            the accepted ones.
+
+        """
+        raise NotImplementedError
+
+    def validate(self):
+        """ Validate the parameters and prepare the sampling method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self.validate_parameters()
+        self._rejection = self.spread() >= REJECTION_MIN_MEAN
+
+        if self._rejection:
+            # No table, the array only gives the type of the numbers
+            self._numbers_array = numpy.empty(0, dtype=numpy.int64)
+            self._cumulative_array = None
+            self.calc_rejection()
+        else:
+            self.calc_table()
+
+        return self
+
+    def table_size(self, mean, deviation, limit):
+        """ Return the size of an inversion table without a relevant tail.
+
+        Args:
+            mean: The mean of the sampled distribution.
+            deviation: The standard deviation of the sampled distribution.
+            limit: The largest number of the support.
+
+        Returns:
+            int: The number of entries of the table.
+
+        """
+
+        return int(min(limit, math.ceil(
+            mean + INVERSION_DEVIATIONS * (deviation + 1)))) + 1
+
+    def pmf(self, values):
+        """ Return the probabilities of numbers.
+
+        Args:
+            values: A list or an array of numbers.
+
+        Returns:
+            An array with the probabilities of the numbers.
+
+        """
+
+        values = numpy.asarray(values)
+        probabilities = numpy.zeros(values.shape)
+
+        inside = self.in_support(values)
+        probabilities[inside] = numpy.exp(self.log_pmf(values[inside]))
+        return probabilities
+
+    def in_support(self, values):
+        """ Check which numbers belong to the support of the distribution.
+
+        Args:
+            values: An array of numbers.
+
+        Returns:
+            A boolean array.
+
+        """
+
+        return (values >= 0) & (values == numpy.floor(values))
+
+    def bins(self, amount, min_expected=MIN_EXPECTED_COUNT):
+        """ Group the support into bins for a Chi-Square test.
+
+        The bins cover the mean plus or minus INVERSION_DEVIATIONS standard
+        deviations (plus one), and the first and the last bin also hold the
+        tails below and above. Neighbouring numbers are merged until every
+        bin expects at least min_expected of the random numbers. A wide
+        distribution is evaluated in at most MAX_BIN_BLOCKS blocks of
+        neighbouring numbers, with the mass of a block taken at its middle.
+
+        Args:
+            amount: The number of random numbers to test.
+            min_expected: The smallest expected count of a bin.
+
+        Returns:
+            tuple: The array of the smallest number of each bin and the
+            array of their probabilities.
+
+        """
+
+        mean, deviation, limit = self.moments()
+        margin = INVERSION_DEVIATIONS * (deviation + 1)
+        low = max(0, math.floor(mean - margin))
+        high = min(limit, math.ceil(mean + margin))
+
+        # Blocks of neighbouring numbers, single numbers if possible
+        step = max(1, -(-(high - low + 1) // MAX_BIN_BLOCKS))
+        starts = numpy.arange(low, high + 1, step)
+        widths = numpy.minimum(starts + step, high + 1) - starts
+        masses = widths * numpy.exp(self.log_pmf(starts + (widths - 1) / 2))
+
+        # The tails beyond the range hold the remaining mass, which is
+        # negligible, so it is shared by the open ends
+        rest = max(0.0, 1.0 - float(masses.sum()))
+        ends = [index for index, tail in ((0, low > 0), (-1, high < limit))
+                if tail]
+        for index in ends:
+            masses[index] += rest / len(ends)
+        masses /= masses.sum()
+
+        # Close a bin at the first block where it expects enough numbers
+        cumulative = numpy.cumsum(masses)
+        before = cumulative - masses
+        threshold = min_expected / amount
+        first = [0]
+        while True:
+            index = int(numpy.searchsorted(
+                cumulative, before[first[-1]] + threshold)) + 1
+            if index >= starts.size:
+                break
+            first.append(index)
+
+        # The last bin may expect too few numbers, it joins the previous one
+        if len(first) > 1 and cumulative[-1] - before[first[-1]] < threshold:
+            first.pop()
+
+        numbers = starts[first]
+        numbers[0] = 0
+        return numbers, numpy.add.reduceat(masses, first)
+
+    def generate_array(self, amount):
+        """ Generate an array of random numbers in vectorized rounds.
+
+        Args:
+            amount: The number of random numbers to generate.
+
+        Returns:
+            A NumPy array of random numbers.
+
+        """
+
+        if not self._rejection:
+            return super().generate_array(amount)
+
+        numbers = numpy.empty(amount, dtype=numpy.int64)
+        pending = numpy.arange(amount)
+
+        # Draw new candidates for the rejected numbers only
+        while pending.size:
+            u, v = random_uniforms(
+                self._rng, 2 * pending.size).reshape(2, -1)
+            candidates, accepted = self.reject(u, v)
+
+            numbers[pending[accepted]] = candidates[accepted]
+            pending = pending[~accepted]
+
+        return numbers
+
+    def generate_seeded(self, amount, seed, offset=0, as_array=False):
+        """ Generate the random numbers at the given positions of a stream.
+
+        Args:
+            amount: The number of random numbers to generate.
+            seed: The seed of the stream.
+            offset: The position of the first random number.
+            as_array: Return a NumPy array instead of a list.
+
+        Returns:
+            A list of random numbers.
+
+        """
+
+        if not self._rejection:
+            return super().generate_seeded(amount, seed, offset, as_array)
+
+        stream = CounterStream(seed)
+        width = 2 * SEEDED_ATTEMPTS
+
+        # The first accepted candidate of every position is used
+        uniforms = stream.uniforms(width * offset, width * amount)
+        uniforms = uniforms.reshape(amount, SEEDED_ATTEMPTS, 2)
+        candidates, accepted = self.reject(uniforms[..., 0], uniforms[..., 1])
+
+        numbers = candidates[numpy.arange(amount), accepted.argmax(axis=1)]
+
+        # Continue the rejected positions in the other lanes of the stream
+        for index in numpy.flatnonzero(~accepted.any(axis=1)).tolist():
+            lane = 1
+            while True:
+                u, v = stream.uniforms(2 * (offset + index), 2, lane=lane)
+                candidate, ok = self.reject(numpy.array([u]), numpy.array([v]))
+                if ok[0]:
+                    numbers[index] = candidate[0]
+                    break
+                lane += 1
+
+        return numbers if as_array else numbers.tolist()
+
+    def generate_parallel(self, amount, workers=None, histogram=False):
+        """ Generate random numbers in a pool of processes.
+
+        The numbers have no table of indices, so the histogram is counted
+        from the generated numbers.
+
+        Args:
+            amount: The number of random numbers to generate.
+            workers: The number of processes (all CPUs by default).
+            histogram: Return the histogram of the numbers instead.
+
+        Returns:
+            A NumPy array of random numbers or a Histogram.
+
+        """
+
+        numbers = super().generate_parallel(amount, workers)
+
+        if histogram:
+            return Histogram().set_numbers(numbers).calc()
+
+        return numbers
+
+    def next_num(self):
+        """ Generate a random number.
+
+        Returns:
+            A random number.
+        """
+
+        return int(self.generate_array(1)[0])
+
+
+class RandomGenPoisson(RandomGenParametric):
+    """ Random number generator of the Poisson distribution.
+
+    Rates below REJECTION_MIN_MEAN are sampled by inversion and larger ones
+    by the transformed rejection method PTRS of Hoermann (1993), which
+    takes about 1.1 pairs of uniform values per number for any rate.
+
+    Attributes:
+        _rate: The mean number of events (lambda).
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._rate = None
+        self._constants = None
+
+    def set_rate(self, rate):
+        """ Set the rate of the distribution.
+
+        Args:
+            rate: The mean number of events (lambda).
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._rate = rate
+        return self
+
+    def validate_parameters(self):
+        """ Validate the rate.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        rate = self._rate
+
+        if not isinstance(rate, (int, float)) or isinstance(rate, bool):
+            raise RandomGenTypeError()
+
+        elif not 0 <= rate <= MAX_PARAMETER:
+            raise RandomGenOptionError()
+
+        return self
+
+    def to_dict(self):
+        """ Return the parameters of the distribution as a dictionary.
+
+        Returns:
+            A dictionary of the parameters.
+
+        """
+
+        return {'rate': self._rate}
+
+    def moments(self):
+        """ Return the mean and the standard deviation of the distribution.
+
+        Returns:
+            tuple: The mean, the standard deviation and the largest number of
+            the support, which is unbounded.
+
+        """
+
+        return self._rate, math.sqrt(self._rate), math.inf
+
+    def spread(self):
+        """ Return the rate, which selects the sampling method.
+
+        Returns:
+            float: The rate.
+
+        """
+
+        return self._rate
+
+    def log_pmf(self, values):
+        """ Return the logarithm of the probability mass function.
+
+        Args:
+            values: An array of numbers in the support.
+
+        Returns:
+            An array with the logarithms of the probabilities.
+
+        """
+
+        rate = self._rate
+        values = numpy.asarray(values, dtype=float)
+
+        if rate == 0:
+            return numpy.where(values == 0, 0.0, -numpy.inf)
+
+        # Large rates lose no precision in the difference of logarithms
+        positive = numpy.maximum(values, 1)
+        return numpy.where(
+            values == 0, -rate,
+            -stirling_error(positive) - deviance(positive, rate)
+            - 0.5 * numpy.log(2 * math.pi * positive))
+
+    def calc_table(self):
+        """ Calculate the CDF table of the inversion method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        size = self.table_size(
+            self._rate, math.sqrt(self._rate), MAX_PARAMETER)
+
+        self._numbers_array = numpy.arange(size)
+        self._cumulative_array = numpy.cumsum(
+            numpy.exp(self.log_pmf(self._numbers_array)))
+
+        return self
+
+    def calc_rejection(self):
+        """ Calculate the constants of the PTRS method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        b = 0.931 + 2.53 * math.sqrt(self._rate)
+        a = -0.059 + 0.02483 * b
+
+        self._constants = (
+            a,
+            b,
+            math.log(1.1239 + 1.1328 / (b - 3.4)),
+            0.9277 - 3.6224 / (b - 2),
+        )
+
+        return self
+
+    def reject(self, u, v):
+        """ Transform pairs of uniform values with the PTRS method.
+
+        Args:
+            u: An array of random values in the interval [0, 1).
+            v: An array of random values in the interval [0, 1).
+
+        Returns:
+            tuple: The array of candidate numbers and the boolean array of
+            the accepted ones.
+
+        """
+
+        a, b, log_alpha, vr = self._constants
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            u = u - 0.5
+            us = 0.5 - numpy.abs(u)
+            k = numpy.floor((2 * a / us + b) * u + self._rate + 0.43)
+
+            # Most candidates are accepted without the density
+            accepted = (k >= 0) & (us >= 0.07) & (v <= vr)
+
+            # Check the others against the density
+            check = (k >= 0) & ~accepted & ~((us < 0.013) & (v > us))
+            kc, uc, vc = k[check], us[check], v[check]
+            accepted[check] = (
+                numpy.log(vc) + log_alpha - numpy.log(a / (uc * uc) + b)
+                <= self.log_pmf(kc)
+            )
+
+        return numpy.where(accepted, k, 0).astype(numpy.int64), accepted
+
+
+class RandomGenBinomial(RandomGenParametric):
+    """ Random number generator of the binomial distribution.
+
+    The number of successes is sampled for the smaller of the success and
+    failure probabilities and mirrored if needed. Distributions with fewer
+    than REJECTION_MIN_MEAN expected successes are sampled by inversion and
+    the others by the transformed rejection method BTRS of Hoermann (1993).
+
+    Attributes:
+        _trials: The number of trials.
+        _probability: The probability of a success.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._trials = None
+        self._probability = None
+        self._constants = None
+
+    def set_trials(self, trials):
+        """ Set the number of trials.
+
+        Args:
+            trials: The number of trials.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._trials = trials
+        return self
+
+    def set_success_probability(self, probability):
+        """ Set the probability of a success.
+
+        Args:
+            probability: The probability of a success in one trial.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._probability = probability
+        return self
+
+    def validate_parameters(self):
+        """ Validate the number of trials and the probability.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        trials, probability = self._trials, self._probability
+
+        if not isinstance(trials, int) or isinstance(trials, bool):
+            raise RandomGenTypeError()
+
+        elif (not isinstance(probability, (int, float))
+                or isinstance(probability, bool)):
+            raise RandomGenTypeError()
+
+        elif not 0 <= trials <= MAX_PARAMETER or not 0 <= probability <= 1:
+            raise RandomGenOptionError()
+
+        return self
+
+    def to_dict(self):
+        """ Return the parameters of the distribution as a dictionary.
+
+        Returns:
+            A dictionary of the parameters.
+
+        """
+
+        return {'trials': self._trials, 'probability': self._probability}
+
+    def moments(self):
+        """ Return the mean and the standard deviation of the distribution.
+
+        Returns:
+            tuple: The mean, the standard deviation and the largest number of
+            the support, which is the number of trials.
+
+        """
+
+        n, p = self._trials, self._probability
+        return n * p, math.sqrt(n * p * (1 - p)), n
+
+    def mirrored(self):
+        """ Check if the failures are sampled instead of the successes.
+
+        Returns:
+            bool: True if the probability of a success is above 0.5.
+
+        """
+
+        return self._probability > 0.5
+
+    def spread(self):
+        """ Return the expected number of the rarer outcome.
+
+        Returns:
+            float: The mean of the sampled distribution.
+
+        """
+
+        return self._trials * min(self._probability, 1 - self._probability)
+
+    def in_support(self, values):
+        """ Check which numbers belong to the support of the distribution.
+
+        Args:
+            values: An array of numbers.
+
+        Returns:
+            A boolean array.
+
+        """
+
+        return super().in_support(values) & (values <= self._trials)
+
+    def log_pmf(self, values, probability=None):
+        """ Return the logarithm of the probability mass function.
+
+        Args:
+            values: An array of numbers in the support.
+            probability: The probability of a success (the one of the
+                distribution by default).
+
+        Returns:
+            An array with the logarithms of the probabilities.
+
+        """
+
+        n = self._trials
+        p = self._probability if probability is None else probability
+        values = numpy.asarray(values, dtype=float)
+
+        if n == 0 or p in (0, 1):
+            return (xlogy(values, p) + xlogy(n - values, 1 - p)
+                    + gammaln(n + 1) - gammaln(values + 1)
+                    - gammaln(n - values + 1))
+
+        # Large numbers of trials lose no precision in the difference of
+        # logarithms
+        inner = numpy.clip(values, 1, max(n - 1, 1))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            log_pmf = (
+                stirling_error(n) - stirling_error(inner)
+                - stirling_error(n - inner)
+                - deviance(inner, n * p) - deviance(n - inner, n * (1 - p))
+                + 0.5 * numpy.log(n / (2 * math.pi * inner * (n - inner)))
+            )
+
+        return numpy.select(
+            [values == 0, values == n],
+            [n * math.log1p(-p), n * math.log(p)],
+            log_pmf)
+
+    def calc_table(self):
+        """ Calculate the CDF table of the inversion method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        p = min(self._probability, 1 - self._probability)
+        size = self.table_size(
+            self._trials * p, math.sqrt(self._trials * p * (1 - p)),
+            self._trials)
+
+        values = numpy.arange(size)
+        self._cumulative_array = numpy.cumsum(
+            numpy.exp(self.log_pmf(values, p)))
+        self._numbers_array = (
+            self._trials - values if self.mirrored() else values)
+
+        return self
+
+    def calc_rejection(self):
+        """ Calculate the constants of the BTRS method.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        n = self._trials
+        p = min(self._probability, 1 - self._probability)
+        spq = math.sqrt(n * p * (1 - p))
+
+        b = 1.15 + 2.53 * spq
+        a = -0.0873 + 0.0248 * b + 0.01 * p
+        mode = math.floor((n + 1) * p)
+
+        self._constants = (
+            a,
+            b,
+            n * p + 0.5,
+            (2.83 + 5.1 / b) * spq,
+            0.92 - 4.2 / b,
+            p,
+            float(self.log_pmf(mode, p)),
+        )
+
+        return self
+
+    def reject(self, u, v):
+        """ Transform pairs of uniform values with the BTRS method.
+
+        Args:
+            u: An array of random values in the interval [0, 1).
+            v: An array of random values in the interval [0, 1).
+
+        Returns:
+            tuple: The array of candidate numbers and the boolean array of
+            the accepted ones.
+
+        """
+
+        a, b, c, alpha, vr, p, log_mode = self._constants
+        n = self._trials
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            u = u - 0.5
+            us = 0.5 - numpy.abs(u)
+            k = numpy.floor((2 * a / us + b) * u + c)
+
+            # Most candidates are accepted without the density
+            inside = (k >= 0) & (k <= n)
+            accepted = inside & (us >= 0.07) & (v <= vr)
+
+            # Check the others against the density relative to the mode
+            check = inside & ~accepted
+            kc, uc, vc = k[check], us[check], v[check]
+            accepted[check] = (
+                numpy.log(vc * alpha / (a / (uc * uc) + b))
+                <= self.log_pmf(kc, p) - log_mode
+            )
+
+        k = numpy.where(accepted, k, 0).astype(numpy.int64)
+        return (n - k if self.mirrored() else k), accepted
 
 
 ################################################################################
@@ -1,6 +1,31 @@
-from randomgen.core import RandomGenV1, RandomGenV2
+import re
+import json
+import time
+import types
+import numpy
+import itertools
+import weakref
+import threading
+from collections.abc import Mapping
+
+from randomgen.core import (
+    RandomGenV1,
+    RandomGenV2,
+    RandomGenV3,
+    RandomGenV4,
+    RandomGenV5,
+    RandomGenPoisson,
+    RandomGenBinomial,
+)
 from randomgen.hypothesis import ChiSquareTest
 from randomgen.histogram import Histogram
+from randomgen.cache import SamplerCache
+from randomgen.pool import NumberPool
+from randomgen.snapshot import (
+    SNAPSHOT_RANDOMGENS,
+    save_snapshot,
+    load_snapshot,
+)
 
 from randomgen.errors import (
     RandomGenMinError,
@@ -10,11 +35,126 @@ from randomgen.errors import (
     RandomGenMismatchError,
     RandomGenProbabilitySumError,
     RandomGenProbabilityNegativeError,
+    RandomGenOptionError,
+    RandomGenNotFoundError,
 )
 
 DEFAULT_NUMBERS = [-1, 0, 1, 2, 3]
 DEFAULT_PROBABILITIES = [0.01, 0.3, 0.58, 0.1, 0.01]
 MAX_NUMBERS = 10000
+MAX_SAMPLERS = 8
+MAX_DISTRIBUTIONS = 256
+MAX_DISTRIBUTION_SAMPLERS = 64
+MAX_STREAM_NUMBERS = 10 ** 9
+MAX_BINARY_NUMBERS = 10 ** 7
+STREAM_CHUNK_SIZE = 65536
+
+# Seconds between two checks of the configuration shared by the workers
+STORE_INTERVAL = 0.1
+
+# Seconds to wait for more changes before the configuration is saved
+SNAPSHOT_DELAY = 1.0
+
+# Valid names of the named distributions
+DISTRIBUTION_NAME = re.compile(r'[A-Za-z0-9_.-]{1,64}')
+
+# Levels of the quality report
+QUALITY_NONE = 'none'
+QUALITY_HISTOGRAM = 'histogram'
+QUALITY_FULL = 'full'
+
+# Values of a patched configuration derived on their first use
+PATCHED_KEYS = ('NUMBERS', 'PROBABILITIES')
+
+
+class PatchedConfig(Mapping):
+    """ Read-only snapshot of a configuration after a partial update.
+
+    The numbers and probabilities are derived from the previous snapshot
+    and the patch when they are first read, so a PATCH request does not
+    rebuild the lists of the whole distribution. Several patches in a row
+    are applied together by the first reader. The values never change once
+    derived.
+
+    The derivation still takes O(n) for the first reader of each snapshot.
+    The RandomGenV4 requests without a quality report never read the
+    values, but a quality report lists the whole expected distribution and
+    derives them once per snapshot.
+
+    The new weights of a patch are given on the scale of the current
+    probabilities, and the result is normalized to sum to 1.
+
+    Attributes:
+        _values: The values of the snapshot.
+        _previous: The previous snapshot until the values are derived.
+        _patch: The numbers, their weights and the removed numbers.
+
+    """
+
+    # Serializes the derivation of the values of all the snapshots
+    _lock = threading.Lock()
+
+    def __init__(self, previous, numbers, weights, remove, **changes):
+        self._values = {
+            key: previous[key] for key in previous if key not in PATCHED_KEYS}
+        self._values.update(changes)
+        self._previous = previous
+        self._patch = (list(numbers), list(weights), list(remove))
+
+    def __getitem__(self, key):
+        if key in PATCHED_KEYS and 'PROBABILITIES' not in self._values:
+            self.derive()
+
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(list(self._values) + [
+            key for key in PATCHED_KEYS if key not in self._values])
+
+    def __len__(self):
+        return len(set(self._values) | set(PATCHED_KEYS))
+
+    def derive(self):
+        """ Apply the pending patches to the last derived snapshot.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        with self._lock:
+            if 'PROBABILITIES' in self._values:
+                return self
+
+            # Collect the patches back to the last derived snapshot
+            patches = []
+            config = self
+            while (isinstance(config, PatchedConfig)
+                    and 'PROBABILITIES' not in config._values):
+                patches.append(config._patch)
+                config = config._previous
+
+            weights = dict(zip(config['NUMBERS'], config['PROBABILITIES']))
+            total = sum(weights.values())
+
+            # The weights of a patch are relative to the current total
+            for numbers, values, remove in reversed(patches):
+                scale = total
+
+                for number in remove:
+                    total -= weights.pop(number)
+
+                for number, value in zip(numbers, values):
+                    total += value * scale - weights.get(number, 0)
+                    weights[number] = value * scale
+
+            total = sum(weights.values())
+            self._values['NUMBERS'] = list(weights)
+            self._values['PROBABILITIES'] = [
+                weight / total for weight in weights.values()]
+            self._previous = None
+
+        return self
 
 
 class RandomGenRestApi(object):
@@ -25,92 +165,739 @@ class RandomGenRestApi(object):
     performs the business logic and some checks before returning the results
     to the web framework.
 
+    The configuration is an immutable snapshot which is replaced as a whole
+    with a new version after every change. A request reads the snapshot
+    once and uses it until the end, so it never sees the numbers of one
+    configuration with the probabilities of another one, and the readers
+    do not need a lock.
+
+    Under a server with several worker processes, a shared ConfigStore
+    carries the changes of the default configuration from the worker that
+    received them to the other ones. Every worker checks the store at most
+    once per `store_interval` when reading the configuration and rebuilds
+    its generators once per change.
+
+    With a snapshot directory, the configuration and the tables of its
+    generators are saved in the background after a change and memory-mapped
+    at the next start, so a large configuration is neither sent again nor
+    validated again after a restart.
+
     Attributes:
-        config (dict): The configuration dict used by the API.
+        config (MappingProxyType): The current snapshot of the configuration.
+        samplers (SamplerCache): The prepared random number generators.
+        distribution_samplers (SamplerCache): The prepared random number
+            generators of the named distributions.
+        pool_size (int): The number of random numbers generated in advance
+            for each generator, or 0 to generate them on request.
+        store (ConfigStore): The configuration shared with the other worker
+            processes, or None.
+        store_interval (float): The seconds between two checks of the
+            store.
+        snapshot (str): The directory of the saved configuration, or None.
+        _local (threading.local): The generators spawned for each thread
+            by their prepared generator.
+        _spawn_lock (threading.Lock): A lock to serialize the spawning.
+        _pools (dict): The pools of random numbers of the generators.
+        _config (MappingProxyType): The current snapshot of the configuration.
+        _config_lock (threading.RLock): A lock to serialize the changes.
+        _distributions (MappingProxyType): The snapshots of the named
+            distributions by their name.
+        _versions (itertools.count): The versions of the named distributions,
+            unique for the lifetime of the API.
+        _store_revision (int): The revision of the shared configuration
+            applied to this worker.
+        _store_checked (float): The monotonic time of the last check of the
+            store, or None.
+        _snapshot_pending (tuple): The configuration waiting to be saved and
+            its revision in the store, or None.
+        _snapshot_timer (threading.Timer): The timer of the next save, or
+            None.
+        _snapshot_lock (threading.Lock): A lock to serialize the saves.
+        _pending_lock (threading.Lock): A lock to serialize the access to
+            the pending save.
 
     """
 
-    def __init__(self):
+    def __init__(self, pool_size=0, store=None, snapshot=None,
+                 store_interval=STORE_INTERVAL):
+
+        self._config = types.MappingProxyType({})
+        self._config_lock = threading.RLock()
+        self.samplers = SamplerCache(max_size=MAX_SAMPLERS)
+
+        # Named distributions
+        self._distributions = types.MappingProxyType({})
+        self._versions = itertools.count(1)
+        self.distribution_samplers = SamplerCache(
+            max_size=MAX_DISTRIBUTION_SAMPLERS)
+
+        # Random number generators of the threads
+        self._local = threading.local()
+        self._spawn_lock = threading.Lock()
 
-        self.config = {}
+        # Random numbers generated in advance
+        self.pool_size = pool_size
+        self._pools = {}
+
+        # Configuration shared with the other workers
+        self.store = store
+        self.store_interval = store_interval
+        self._store_revision = None
+        self._store_checked = None
 
         # Set the configuration
+        self.snapshot = snapshot
+        self._snapshot_pending = None
+        self._snapshot_timer = None
+        self._snapshot_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
         self.setup_config()
 
+        # Restore the configuration of the previous run
+        if snapshot is not None:
+            self.restore_config()
+
+    @property
+    def config(self):
+        """ The current snapshot of the configuration (read-only). """
+
+        if self.store is not None:
+            self.sync_config()
+
+        return self._config
+
+    def sync_config(self):
+        """ Apply the changes of the shared configuration to this worker.
+
+        The store is checked at most once per `store_interval`, it is only
+        read after another worker has written to it, and the configuration
+        is only replaced if the revision is new, so the generators are
+        rebuilt once per change.
+
+        Returns:
+            MappingProxyType: The current snapshot of the configuration.
+
+        """
+
+        if self.store is None:
+            return self._config
+
+        # A request reads the configuration several times
+        now = time.monotonic()
+        checked = self._store_checked
+        if checked is not None and now - checked < self.store_interval:
+            return self._config
+
+        self._store_checked = now
+
+        # The threads check under the lock, so a thread which finds no
+        # change waits until the change found by another one is applied
+        with self._config_lock:
+            if not self.store.changed():
+                return self._config
+
+            record = self.store.load()
+
+            if record is not None and record[0] != self._store_revision:
+                self._store_revision, numbers, probabilities = record
+                self.update_config(
+                    NUMBERS=numbers,
+                    PROBABILITIES=probabilities,
+                )
+
+        return self._config
+
+    def publish_config(self, config):
+        """ Write the configuration to the store of the other workers.
+
+        The configuration is also saved to the snapshot directory by a
+        background thread after SNAPSHOT_DELAY seconds, so the request does
+        not wait for the files and a series of changes is saved once.
+
+        Args:
+            config: The snapshot of the configuration.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        with self._config_lock:
+            if self.store is not None:
+                self._store_revision = self.store.save(
+                    config['NUMBERS'], config['PROBABILITIES'])
+
+            revision = self._store_revision
+
+        if self.snapshot is None:
+            return self
+
+        # Replace the pending configuration and start the timer if needed
+        with self._pending_lock:
+            self._snapshot_pending = config, revision
+
+            if self._snapshot_timer is None:
+                self._snapshot_timer = threading.Timer(
+                    SNAPSHOT_DELAY, self.flush_snapshot)
+                self._snapshot_timer.start()
+
+        return self
+
+    def flush_snapshot(self):
+        """ Save the pending configuration to the snapshot directory now.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        # The saves run one after the other, so the last one always has
+        # the latest configuration
+        with self._snapshot_lock:
+            with self._pending_lock:
+                pending, self._snapshot_pending = self._snapshot_pending, None
+                timer, self._snapshot_timer = self._snapshot_timer, None
+
+            if timer is not None:
+                timer.cancel()
+
+            if pending is not None:
+                self.persist_config(*pending)
+
+        return self
+
+    def persist_config(self, config, revision=None):
+        """ Save the configuration and the tables of its generators.
+
+        Only the tables of the generators already prepared are saved, the
+        other ones are prepared again at their first use after a restart.
+
+        Args:
+            config: The snapshot of the configuration.
+            revision: The revision of the configuration in the store, or
+                None.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        randomgens = [
+            randomgen for randomgen in (
+                self.samplers.peek(self.sampler_key(randomgen_type, config))
+                for randomgen_type in SNAPSHOT_RANDOMGENS
+            )
+            if randomgen is not None
+        ]
+
+        # The numbers and probabilities are saved with the tables
+        if not randomgens:
+            randomgens.append(
+                self.prepare_randomgen(SNAPSHOT_RANDOMGENS[0], config))
+
+        save_snapshot(self.snapshot, randomgens, revision)
+        return self
+
+    def restore_config(self):
+        """ Restore the configuration saved by persist_config().
+
+        The tables are memory-mapped and the restored generators are put in
+        the cache, so they are used without being validated again.
+
+        Returns:
+            MappingProxyType: The current snapshot of the configuration.
+
+        """
+
+        record = load_snapshot(self.snapshot)
+
+        if record is None:
+            return self._config
+
+        with self._config_lock:
+            self._store_revision, numbers, probabilities, randomgens = record
+            config = self.update_config(
+                NUMBERS=numbers,
+                PROBABILITIES=probabilities,
+            )
+
+            for randomgen in randomgens:
+                self.samplers.get(
+                    self.sampler_key(type(randomgen), config),
+                    lambda restored=randomgen: restored)
+
+        return self._config
+
+    def distribution_config(self, name=None):
+        """ Return the snapshot of a named distribution.
+
+        Args:
+            name: The name of the distribution, or None for the default
+                configuration.
+
+        Returns:
+            MappingProxyType: The snapshot of the distribution.
+
+        """
+
+        if name is None:
+            return self.config
+
+        config = self._distributions.get(name)
+
+        if config is None:
+            raise RandomGenNotFoundError()
+
+        return config
+
     def setup_config(self):
         """ Configure the Flask application using the default values.
 
         Returns:
-            dict: The configuration dict after the change.
+            MappingProxyType: The configuration after the change.
 
         """
 
-        self.config['MAX_NUMBERS'] = MAX_NUMBERS
-        self.config['NUMBERS'] = DEFAULT_NUMBERS
-        self.config['PROBABILITIES'] = DEFAULT_PROBABILITIES
+        return self.update_config(
+            MAX_NUMBERS=MAX_NUMBERS,
+            MAX_STREAM_NUMBERS=MAX_STREAM_NUMBERS,
+            MAX_BINARY_NUMBERS=MAX_BINARY_NUMBERS,
+            NUMBERS=list(DEFAULT_NUMBERS),
+            PROBABILITIES=list(DEFAULT_PROBABILITIES),
+        )
 
-    def generate_random_numbers(self, randomgen, quantity):
-        """ Generate random numbers using the given random number generator.
+    def update_config(self, **changes):
+        """ Replace the configuration with a new version.
+
+        The new snapshot is built from a copy of the current one and swapped
+        in with a single assignment. The values of a snapshot are never
+        modified afterwards.
+
+        Args:
+            **changes: The changed values of the configuration.
+
+        Returns:
+            MappingProxyType: The new snapshot of the configuration.
+
+        """
+
+        with self._config_lock:
+            config = dict(self._config, **changes)
+            config['VERSION'] = self._config.get('VERSION', 0) + 1
+            self._config = types.MappingProxyType(config)
+
+        self.close_pools(None)
+        return self._config
+
+    def update_version(self):
+        """ Increment the version of the configuration.
+
+        The prepared random number generators are cached by the version, so
+        they are rebuilt after every change of the configuration.
+
+        Returns:
+            int: The new version of the configuration.
+
+        """
+
+        return self.update_config()['VERSION']
+
+    def prepare_randomgen(self, randomgen_type, config=None):
+        """ Return a validated random number generator for the configuration.
+
+        Args:
+            randomgen_type: The concrete class of RandomGen to use.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            The prepared random number generator.
+
+        """
+
+        # All the values come from the same snapshot of the configuration
+        config = self.config if config is None else config
+
+        # The values are only read to build a missing generator, so that a
+        # cached generator does not derive the values of a patched snapshot
+        def factory():
+            return (
+                randomgen_type()
+                .set_numbers(config['NUMBERS'])
+                .set_probabilities(config['PROBABILITIES'])
+                .validate()
+            )
+
+        return self.sampler_cache(config).get(
+            self.sampler_key(randomgen_type, config), factory)
+
+    def sampler_cache(self, config):
+        """ Return the cache of the prepared generators of a configuration.
+
+        Args:
+            config: The snapshot of the configuration.
+
+        Returns:
+            SamplerCache: The cache of the default configuration or the cache
+            of the named distributions.
+
+        """
+
+        if config.get('NAME') is None:
+            return self.samplers
+
+        return self.distribution_samplers
+
+    @staticmethod
+    def sampler_key(randomgen_type, config):
+        """ Return the key of a prepared generator in its cache.
+
+        Args:
+            randomgen_type: The concrete class of RandomGen to use.
+            config: The snapshot of the configuration.
+
+        Returns:
+            tuple: The type of the generator, the name of the distribution
+            and the version of the configuration.
+
+        """
+
+        return randomgen_type, config.get('NAME'), config['VERSION']
+
+    def thread_randomgen(self, randomgen_type, config=None):
+        """ Return the random number generator of the current thread.
+
+        Each thread gets its own copy of the prepared generator with an
+        independent random number generator, so the threads neither share
+        nor lock a common random state.
+
+        Args:
+            randomgen_type: The concrete class of RandomGen to use.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            The random number generator of the current thread.
+
+        """
+
+        config = self.config if config is None else config
+        prepared = self.prepare_randomgen(randomgen_type, config)
+
+        # The copies are dropped with their prepared generator, when it is
+        # evicted from the cache or its distribution is deleted
+        if not hasattr(self._local, 'randomgens'):
+            self._local.randomgens = weakref.WeakKeyDictionary()
+
+        # Spawn a new copy also if the prepared generator has been updated
+        # in place for a new version of the configuration
+        version, child = self._local.randomgens.get(prepared, (None, None))
+        if version != config['VERSION']:
+            with self._spawn_lock:
+                child = prepared.spawn(1)[0]
+            self._local.randomgens[prepared] = (config['VERSION'], child)
+
+        return child
+
+    def pool_randomgen(self, randomgen_type, config=None):
+        """ Return the pool of random numbers of a generator.
+
+        The pool is started at the first request of the generator and
+        replaced when the configuration changes.
+
+        Args:
+            randomgen_type: The concrete class of RandomGen to use.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            NumberPool: The pool of random numbers of the generator.
+
+        """
+
+        config = self.config if config is None else config
+        prepared = self.prepare_randomgen(randomgen_type, config)
+        key = (randomgen_type, config.get('NAME'))
+
+        with self._spawn_lock:
+            pool = self._pools.get(key)
+
+            if pool is None or pool.source is not prepared:
+                if pool is not None:
+                    pool.close()
+
+                pool = NumberPool(prepared, capacity=self.pool_size)
+                self._pools[key] = pool
+
+        return pool
+
+    def close_pools(self, *names):
+        """ Stop the pools of random numbers of the generators.
+
+        Args:
+            *names: The names of the distributions (None for the default
+                configuration). The pools of all the distributions are
+                stopped if no name is given.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        with self._spawn_lock:
+            for key in list(self._pools):
+                if not names or key[1] in names:
+                    self._pools.pop(key).close()
+
+        return self
+
+    def validate_request(self, quantity, quality, limit):
+        """ Check the quantity and the quality level of a request.
 
         Args:
-            randomgen: The random number generator object.
             quantity: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            limit: The maximum quantity of random numbers.
 
         Returns:
-            dict: A dictionary containing the generated random numbers and the
-            results of the Chi-Square test.
+            self: The instance of the class.
+
         """
 
+        # Check if the quality level is known
+        if quality not in (QUALITY_NONE, QUALITY_HISTOGRAM, QUALITY_FULL):
+            raise RandomGenOptionError()
+
         # Check if the amount is negative or zero
-        if quantity <= 0:
+        elif quantity <= 0:
             raise RandomGenMinError()
 
         # Check if the amount exceeds the maximum limit
-        elif quantity > self.config['MAX_NUMBERS']:
+        elif quantity > limit:
             raise RandomGenMaxError()
 
-        # Generate random numbers
-        random_numbers = [randomgen.next_num() for _ in range(quantity)]
+        return self
+
+    def quality_report(self, observed, quality, config=None):
+        """ Build the quality report of the generated random numbers.
+
+        Args:
+            observed: The histogram of the generated random numbers.
+            quality: The level of the quality report.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            dict: The expected and observed histograms and, for the full
+            report, the results of the Chi-Square test. The test is None if
+            the distribution has a single number, which leaves no degree of
+            freedom.
+        """
+
+        config = self.config if config is None else config
 
         # Expected distribution
         expected = dict(zip(
-            self.config['NUMBERS'],
-            self.config['PROBABILITIES'])
+            config['NUMBERS'],
+            config['PROBABILITIES'])
         )
 
-        # Observed distribution
-        observed = (
-            Histogram()
-            .set_numbers(random_numbers)
-            .calc()
-        )
+        report = {
+            'expected_histogram': expected,
+            'observed_histogram': observed,
+        }
+
+        if quality == QUALITY_HISTOGRAM:
+            return report
 
-        # Chi-Square test to check the quality of the random number generator
+        # A single number always matches, there is nothing to test
+        if len(expected) < 2:
+            report['chi_square_test'] = None
+            return report
+
+        # Chi-Square test reusing the counts of the observed histogram
         hypothesis = (
             ChiSquareTest()
-            .set_observed_numbers(random_numbers)
-            .set_expected_probabilities(self.config['PROBABILITIES'])
+            .set_observed_counts(observed.counts)
+            .set_expected_probabilities(config['PROBABILITIES'])
             .calc()
         )
 
+        report['chi_square_test'] = {
+            'is_null': int(hypothesis.is_null()),
+            'chi_square': hypothesis.chi_square,
+            'p_value': hypothesis.p_value,
+            'df': hypothesis.df,
+        }
+
+        return report
+
+    @staticmethod
+    def draw_random_numbers(randomgen, quantity, seed=None, offset=0):
+        """ Draw random numbers from a fresh or from a seeded stream.
+
+        Args:
+            randomgen: The random number generator object.
+            quantity: The quantity of random numbers to generate.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+
+        Returns:
+            A NumPy array of random numbers.
+        """
+
+        if seed is None:
+            return randomgen.generate(quantity, as_array=True)
+
+        return randomgen.generate_seeded(
+            quantity, seed=seed, offset=offset, as_array=True)
+
+    def generate_random_numbers(self, randomgen, quantity,
+                                quality=QUALITY_FULL, seed=None, offset=0,
+                                config=None):
+        """ Generate random numbers using the given random number generator.
+
+        Args:
+            randomgen: The random number generator object.
+            quantity: The quantity of random numbers to generate.
+            quality: The level of the quality report, one of QUALITY_NONE,
+                QUALITY_HISTOGRAM or QUALITY_FULL.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            dict: A dictionary containing the generated random numbers and the
+            results of the Chi-Square test.
+        """
+
+        config = self.config if config is None else config
+        self.validate_request(quantity, quality, config['MAX_NUMBERS'])
+
+        # Generate random numbers
+        random_numbers = self.draw_random_numbers(
+            randomgen, quantity, seed, offset)
+
         # Prepare the response
         response = {
-            'numbers': random_numbers,
-            "quality": {
-                "chi_square_test": {
-                    'is_null': int(hypothesis.is_null()),
-                    'chi_square': hypothesis.chi_square,
-                    'p_value': hypothesis.p_value,
-                    'df': hypothesis.df,
-                },
-                'expected_histogram': expected,
-                'observed_histogram': observed,
-            },
+            'numbers': random_numbers.tolist(),
         }
 
+        # Skip the statistics if the client only wants the numbers
+        if quality == QUALITY_NONE:
+            return response
+
+        # Observed distribution
+        observed = (
+            Histogram()
+            .set_numbers(random_numbers)
+            .calc()
+        )
+
+        response['quality'] = self.quality_report(observed, quality, config)
+
         # Return the response
         return response
 
+    def pack_random_numbers(self, randomgen, quantity, quality=QUALITY_FULL,
+                            seed=None, offset=0, config=None):
+        """ Generate random numbers as a packed little-endian array.
+
+        Integers are packed as int32 (int64 if they do not fit) and all other
+        numbers as float64. The returned buffer is a view of the generated
+        array, so the numbers are not copied.
+
+        Args:
+            randomgen: The random number generator object.
+            quantity: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            tuple: The buffer with the packed numbers, the name of the type of
+            the numbers and the quality report (None for QUALITY_NONE).
+        """
+
+        config = self.config if config is None else config
+        self.validate_request(
+            quantity, quality, config['MAX_BINARY_NUMBERS'])
+
+        # Generate random numbers
+        random_numbers = self.draw_random_numbers(
+            randomgen, quantity, seed, offset)
+
+        # Select the packed type of the numbers
+        if random_numbers.dtype.kind in 'iu':
+            info = numpy.iinfo(numpy.int32)
+            fits = (random_numbers.min() >= info.min
+                    and random_numbers.max() <= info.max)
+            dtype = numpy.dtype('<i4' if fits else '<i8')
+        else:
+            dtype = numpy.dtype('<f8')
+
+        # Convert only if the array does not have the packed type already
+        random_numbers = numpy.ascontiguousarray(
+            random_numbers.astype(dtype, copy=False))
+
+        report = None
+        if quality != QUALITY_NONE:
+            observed = Histogram().set_numbers(random_numbers).calc()
+            report = self.quality_report(observed, quality, config)
+
+        return memoryview(random_numbers).cast('B'), dtype.name, report
+
+    def stream_random_numbers(self, randomgen, quantity,
+                              quality=QUALITY_FULL, seed=None, offset=0,
+                              config=None):
+        """ Generate random numbers as a stream of NDJSON records.
+
+        The request is checked before the stream starts, so that errors are
+        reported before the first record is sent.
+
+        Args:
+            randomgen: The random number generator object.
+            quantity: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+            config: The snapshot of the configuration (the current one by
+                default).
+
+        Returns:
+            generator: The lines of the NDJSON stream.
+        """
+
+        config = self.config if config is None else config
+        self.validate_request(
+            quantity, quality, config['MAX_STREAM_NUMBERS'])
+
+        return self._stream(randomgen, quantity, quality, seed, offset, config)
+
+    def _stream(self, randomgen, quantity, quality, seed, offset, config):
+        """ Yield the NDJSON records of an already checked request. """
+
+        observed = Histogram()
+
+        # Generate the random numbers chunk by chunk
+        for start in range(0, quantity, STREAM_CHUNK_SIZE):
+            size = min(STREAM_CHUNK_SIZE, quantity - start)
+            random_numbers = self.draw_random_numbers(
+                randomgen, size, seed, offset + start)
+
+            if quality != QUALITY_NONE:
+                observed.update(random_numbers)
+
+            yield json.dumps({'numbers': random_numbers.tolist()}) + '\n'
+
+        # Emit the quality summary as a trailing record
+        if quality != QUALITY_NONE:
+            report = self.quality_report(observed, quality, config)
+            yield json.dumps({'quality': report}) + '\n'
+
     @staticmethod
     def home_endpoint():
         """ Home endpoint.
@@ -136,8 +923,22 @@ class RandomGenRestApi(object):
             <ul>
                 <li> GET /api/v1/randomgen?numbers=1000 </li>
                 <li> GET /api/v2/randomgen?numbers=1000 </li>
+                <li> GET /api/v3/randomgen?numbers=1000 </li>
+                <li> GET /api/v4/randomgen?numbers=1000 </li>
+                <li> GET /api/v5/randomgen?numbers=1000 </li>
+                <li> GET /api/v1/randomgen?numbers=1000&quality=none </li>
+                <li> GET /api/v1/randomgen?numbers=1000000&format=ndjson </li>
+                <li> GET /api/v1/randomgen?numbers=1000000&format=binary </li>
+                <li> GET /api/v1/randomgen?numbers=1000&seed=42&offset=0 </li>
+                <li> GET /api/poisson/randomgen?rate=4&numbers=1000 </li>
+                <li> GET /api/binomial/randomgen?trials=10&probability=0.3&numbers=1000 </li>
                 <li> POST /api/config {"numbers":[1, 2], "probabilities":[0.5, 0.5]}</li>
+                <li> PATCH /api/config {"numbers":[1, 3], "probabilities":[0.2, 0.3]}</li>
                 <li> POST /api/reset </li>
+                <li> GET /api/distributions </li>
+                <li> POST /api/distributions {"name":"dice", "numbers":[1, 2], "probabilities":[0.5, 0.5]}</li>
+                <li> GET /api/distributions/dice/randomgen?numbers=1000 </li>
+                <li> DELETE /api/distributions/dice </li>
             </ul>
 
             """
@@ -145,34 +946,211 @@ class RandomGenRestApi(object):
 
         return body
 
-    def randomgen_endpoint(self, randomgen_type, numbers):
+    def randomgen_endpoint(self, randomgen_type, numbers,
+                           quality=QUALITY_FULL, seed=None, offset=0,
+                           name=None):
         """ Generate random numbers using the given version of RandomGen.
 
         Args:
             randomgen_type: The concrete class of RandomGen to use.
             numbers: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+            name: The name of the distribution, or None for the default
+                configuration.
 
         Returns:
             dict: A dictionary containing the generated random numbers and the
             results of the Chi-Square test.
         """
 
-        # Create the random number generator
+        # Read the configuration once for the whole request
+        config = self.distribution_config(name)
+
+        # Take the numbers from the pool unless a seeded stream is requested
+        if self.pool_size and seed is None:
+            rg = self.pool_randomgen(randomgen_type, config)
+
+        # Reuse the random number generator prepared for the configuration
+        else:
+            rg = self.thread_randomgen(randomgen_type, config)
+
+        # Generate random numbers
+        return self.generate_random_numbers(
+            randomgen=rg, quantity=numbers, quality=quality,
+            seed=seed, offset=offset, config=config)
+
+    def randomgen_stream_endpoint(self, randomgen_type, numbers,
+                                  quality=QUALITY_FULL, seed=None, offset=0,
+                                  name=None):
+        """ Stream random numbers using the given version of RandomGen.
+
+        Args:
+            randomgen_type: The concrete class of RandomGen to use.
+            numbers: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+            name: The name of the distribution, or None for the default
+                configuration.
+
+        Returns:
+            generator: The lines of the NDJSON stream.
+        """
+
+        # Reuse the random number generator prepared for the configuration
+        config = self.distribution_config(name)
+        rg = self.thread_randomgen(randomgen_type, config)
+
+        # Stream random numbers
+        return self.stream_random_numbers(
+            randomgen=rg, quantity=numbers, quality=quality,
+            seed=seed, offset=offset, config=config)
+
+    def randomgen_binary_endpoint(self, randomgen_type, numbers,
+                                  quality=QUALITY_FULL, seed=None, offset=0,
+                                  name=None):
+        """ Generate packed random numbers using the given version of RandomGen.
+
+        Args:
+            randomgen_type: The concrete class of RandomGen to use.
+            numbers: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+            name: The name of the distribution, or None for the default
+                configuration.
+
+        Returns:
+            tuple: The buffer with the packed numbers, the name of the type of
+            the numbers and the quality report.
+        """
+
+        # Reuse the random number generator prepared for the configuration
+        config = self.distribution_config(name)
+        rg = self.thread_randomgen(randomgen_type, config)
+
+        # Generate packed random numbers
+        return self.pack_random_numbers(
+            randomgen=rg, quantity=numbers, quality=quality,
+            seed=seed, offset=offset, config=config)
+
+    def parametric_endpoint(self, randomgen, numbers, quality=QUALITY_FULL,
+                            seed=None, offset=0):
+        """ Generate random numbers of a parametric distribution.
+
+        The support of the distribution may be unbounded, so the quality
+        report counts the random numbers in the bins of randomgen.bins().
+        The histograms are keyed by the smallest number of each bin, and
+        every bin expects at least MIN_EXPECTED_COUNT random numbers.
+
+        Args:
+            randomgen: The validated parametric random number generator.
+            numbers: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+
+        Returns:
+            dict: A dictionary containing the parameters, the generated
+            random numbers and the results of the Chi-Square test.
+        """
+
+        self.validate_request(numbers, quality, self.config['MAX_NUMBERS'])
+
+        # Generate random numbers
+        random_numbers = self.draw_random_numbers(
+            randomgen, numbers, seed, offset)
+
+        # Prepare the response
+        response = {
+            'parameters': randomgen.to_dict(),
+            'numbers': random_numbers.tolist(),
+        }
+
+        # Skip the statistics if the client only wants the numbers
+        if quality == QUALITY_NONE:
+            return response
+
+        # Expected probabilities of the bins covering the support
+        values, probabilities = randomgen.bins(numbers)
+        expected = {
+            'NUMBERS': values.tolist(),
+            'PROBABILITIES': probabilities.tolist(),
+        }
+
+        # Observed distribution, counted in the same bins
+        indices = numpy.searchsorted(values, random_numbers, side='right') - 1
+        counts = numpy.bincount(indices, minlength=values.size)
+        observed = Histogram().from_counts(
+            dict(zip(expected['NUMBERS'], counts.tolist())))
+
+        response['quality'] = self.quality_report(observed, quality, expected)
+
+        # Return the response
+        return response
+
+    def poisson_endpoint(self, rate, numbers, quality=QUALITY_FULL,
+                         seed=None, offset=0):
+        """ Generate random numbers of a Poisson distribution.
+
+        Args:
+            rate: The mean number of events.
+            numbers: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+
+        Returns:
+            dict: A dictionary containing the parameters, the generated
+            random numbers and the results of the Chi-Square test.
+        """
+
+        rg = RandomGenPoisson().set_rate(rate).validate()
+
+        return self.parametric_endpoint(
+            randomgen=rg, numbers=numbers, quality=quality,
+            seed=seed, offset=offset)
+
+    def binomial_endpoint(self, trials, probability, numbers,
+                          quality=QUALITY_FULL, seed=None, offset=0):
+        """ Generate random numbers of a binomial distribution.
+
+        Args:
+            trials: The number of trials.
+            probability: The probability of a success in one trial.
+            numbers: The quantity of random numbers to generate.
+            quality: The level of the quality report.
+            seed: The seed of a reproducible stream or None.
+            offset: The position of the first number in the seeded stream.
+
+        Returns:
+            dict: A dictionary containing the parameters, the generated
+            random numbers and the results of the Chi-Square test.
+        """
+
         rg = (
-            randomgen_type()
-            .set_numbers(self.config['NUMBERS'])
-            .set_probabilities(self.config['PROBABILITIES'])
+            RandomGenBinomial()
+            .set_trials(trials)
+            .set_success_probability(probability)
             .validate()
         )
 
-        # Generate random numbers
-        return self.generate_random_numbers(randomgen=rg, quantity=numbers)
+        return self.parametric_endpoint(
+            randomgen=rg, numbers=numbers, quality=quality,
+            seed=seed, offset=offset)
 
-    def config_endpoint(self, numbers, probabilities):
-        """ Configure the numbers and probabilities.
+    @staticmethod
+    def validate_distribution(numbers, probabilities):
+        """ Check the numbers and probabilities of a distribution.
+
+        Args:
+            numbers: The list of numbers.
+            probabilities: The list of probabilities.
 
         Returns:
-            dict: A dictionary containing the new numbers and probabilities.
+            None
 
         """
 
@@ -191,14 +1169,122 @@ class RandomGenRestApi(object):
         elif sum(probabilities) != 1:
             raise RandomGenProbabilitySumError()
 
-        self.config['NUMBERS'] = numbers
-        self.config['PROBABILITIES'] = probabilities
+    def config_endpoint(self, numbers, probabilities):
+        """ Configure the numbers and probabilities.
+
+        Returns:
+            dict: A dictionary containing the new numbers and probabilities.
+
+        """
+
+        self.validate_distribution(numbers, probabilities)
+
+        with self._config_lock:
+            config = self.update_config(
+                NUMBERS=list(numbers),
+                PROBABILITIES=list(probabilities),
+            )
+            self.publish_config(config)
 
         return {
-            'numbers': self.config['NUMBERS'],
-            'probabilities': self.config['PROBABILITIES']
+            'numbers': config['NUMBERS'],
+            'probabilities': config['PROBABILITIES']
         }
 
+    def patch_config_endpoint(self, numbers, probabilities, remove=None):
+        """ Update the weights of some numbers of the configuration.
+
+        New numbers are added and the numbers in `remove` are removed. The
+        new weights are given on the scale of the current probabilities and
+        the configuration is normalized afterwards, so a single weight can
+        be changed. The prepared RandomGenV4 generator is copied in O(n)
+        and the copy is updated in O(log n) per number, so that the requests
+        of the previous snapshot never see a half-applied patch. The numbers
+        and probabilities of the new configuration are only derived when
+        they are read, e.g. by a quality report.
+
+        Args:
+            numbers: The numbers to update or to add.
+            probabilities: The new weights of the numbers.
+            remove: The numbers to remove.
+
+        Returns:
+            dict: A dictionary containing the updated numbers, their new
+            probabilities and the removed numbers.
+
+        """
+
+        remove = [] if remove is None else remove
+
+        if (not isinstance(numbers, list)
+                or not isinstance(probabilities, list)
+                or not isinstance(remove, list)):
+            raise RandomGenTypeError()
+
+        elif not all(isinstance(n, (int, float)) for n in numbers):
+            raise RandomGenTypeError()
+
+        elif not all(isinstance(p, (int, float)) for p in probabilities):
+            raise RandomGenTypeError()
+
+        elif len(numbers) != len(probabilities):
+            raise RandomGenMismatchError()
+
+        elif any(p < 0 for p in probabilities):
+            raise RandomGenProbabilityNegativeError()
+
+        # Serialize the changes, so that no concurrent change is lost
+        with self._config_lock:
+            previous_config = self.config
+            randomgen = self.prepare_randomgen(RandomGenV4, previous_config)
+
+            # Check the whole patch before the generator is changed
+            scale = randomgen.total()
+            changed = {}
+
+            for number in remove:
+                if number not in randomgen._positions or number in changed:
+                    raise RandomGenNotFoundError()
+                changed[number] = 0.0
+
+            for number, probability in zip(numbers, probabilities):
+                changed[number] = probability * scale
+
+            delta = sum(
+                weight - randomgen.weight(number)
+                for number, weight in changed.items())
+
+            if scale + delta <= 0:
+                raise RandomGenProbabilitySumError()
+
+            # Update a copy, the requests of the previous snapshot keep
+            # using the previous generator and its copies
+            randomgen = randomgen.copy()
+
+            for number in remove:
+                randomgen.remove(number)
+
+            for number, probability in zip(numbers, probabilities):
+                randomgen.insert(number, probability * scale)
+
+            self._config = PatchedConfig(
+                previous_config, numbers, probabilities, remove,
+                VERSION=previous_config['VERSION'] + 1)
+            config = self._config
+            self.close_pools(None)
+
+            self.samplers.get(
+                self.sampler_key(RandomGenV4, config), lambda: randomgen)
+            self.publish_config(config)
+
+            total = randomgen.total()
+            return {
+                'numbers': list(numbers),
+                'probabilities': [
+                    randomgen.weight(number) / total for number in numbers],
+                'removed': list(remove),
+            }
+
     def reset_endpoint(self):
         """ Reset the configuration to the default values.
 
@@ -207,13 +1293,131 @@ class RandomGenRestApi(object):
 
         """
 
-        self.setup_config()
+        with self._config_lock:
+            config = self.setup_config()
+            self.publish_config(config)
 
         return {
-            'numbers': self.config['NUMBERS'],
-            'probabilities': self.config['PROBABILITIES']
+            'numbers': config['NUMBERS'],
+            'probabilities': config['PROBABILITIES']
         }
 
+    def create_distribution_endpoint(self, name, numbers, probabilities):
+        """ Create or replace a named distribution.
+
+        Each distribution has its own snapshot and prepared generators, so
+        the distributions of different clients do not overwrite each other
+        nor the default configuration.
+
+        Args:
+            name: The name of the distribution.
+            numbers: The list of numbers.
+            probabilities: The list of probabilities.
+
+        Returns:
+            dict: A dictionary containing the name, the numbers and the
+            probabilities of the distribution.
+
+        """
+
+        if not isinstance(name, str):
+            raise RandomGenTypeError()
+
+        elif not DISTRIBUTION_NAME.fullmatch(name):
+            raise RandomGenOptionError()
+
+        self.validate_distribution(numbers, probabilities)
+
+        with self._config_lock:
+            distributions = dict(self._distributions)
+
+            if (name not in distributions
+                    and len(distributions) >= MAX_DISTRIBUTIONS):
+                raise RandomGenMaxError()
+
+            # The limits of the requests are shared by all distributions
+            config = dict(self.config)
+            config.update(
+                NAME=name,
+                NUMBERS=list(numbers),
+                PROBABILITIES=list(probabilities),
+                VERSION=next(self._versions),
+            )
+
+            distributions[name] = types.MappingProxyType(config)
+            self._distributions = types.MappingProxyType(distributions)
+
+        self.close_pools(name)
+        return self.distribution_endpoint(name)
+
+    def list_distributions_endpoint(self):
+        """ List the named distributions.
+
+        Returns:
+            dict: A dictionary with the numbers and probabilities of every
+            distribution by its name.
+
+        """
+
+        return {
+            'distributions': {
+                name: {
+                    'numbers': config['NUMBERS'],
+                    'probabilities': config['PROBABILITIES'],
+                }
+                for name, config in self._distributions.items()
+            }
+        }
+
+    def distribution_endpoint(self, name):
+        """ Return a named distribution.
+
+        Args:
+            name: The name of the distribution.
+
+        Returns:
+            dict: A dictionary containing the name, the numbers and the
+            probabilities of the distribution.
+
+        """
+
+        config = self._distributions.get(name)
+
+        if config is None:
+            raise RandomGenNotFoundError()
+
+        return {
+            'name': name,
+            'numbers': config['NUMBERS'],
+            'probabilities': config['PROBABILITIES']
+        }
+
+    def delete_distribution_endpoint(self, name):
+        """ Delete a named distribution.
+
+        Its prepared generators and pools are removed, which also drops the
+        copies of the generators in the threads.
+
+        Args:
+            name: The name of the distribution.
+
+        Returns:
+            dict: A dictionary containing the name, the numbers and the
+            probabilities of the deleted distribution.
+
+        """
+
+        with self._config_lock:
+            response = self.distribution_endpoint(name)
+
+            distributions = dict(self._distributions)
+            del distributions[name]
+            self._distributions = types.MappingProxyType(distributions)
+
+        self.distribution_samplers.remove(lambda key: key[1] == name)
+        self.close_pools(name)
+        return response
+
 
 ###############################################################################
 # Example
@@ -246,6 +1450,24 @@ if __name__ == "__main__":
         numbers = int(request.args.get('numbers', 1000))
         return jsonify(api.randomgen_endpoint(RandomGenV2, numbers))
 
+    # RandomGen V3 endpoint
+    @app.get('/api/v3/randomgen')
+    def randomgen_v3():
+        numbers = int(request.args.get('numbers', 1000))
+        return jsonify(api.randomgen_endpoint(RandomGenV3, numbers))
+
+    # RandomGen V4 endpoint
+    @app.get('/api/v4/randomgen')
+    def randomgen_v4():
+        numbers = int(request.args.get('numbers', 1000))
+        return jsonify(api.randomgen_endpoint(RandomGenV4, numbers))
+
+    # RandomGen V5 endpoint
+    @app.get('/api/v5/randomgen')
+    def randomgen_v5():
+        numbers = int(request.args.get('numbers', 1000))
+        return jsonify(api.randomgen_endpoint(RandomGenV5, numbers))
+
     # Config endpoint
     @app.post('/api/config')
     def config():
@@ -77,3 +77,21 @@ class RandomGenMinError(RandomGenError):
 
     def __init__(self):
         super().__init__(message=self.MESSAGE)
+
+
+class RandomGenOptionError(RandomGenError):
+    """Error for unsupported option values."""
+
+    MESSAGE = "The option value is not supported."
+
+    def __init__(self):
+        super().__init__(message=self.MESSAGE)
+
+
+class RandomGenNotFoundError(RandomGenError):
+    """Error for numbers or items that do not exist."""
+
+    MESSAGE = "The requested item does not exist."
+
+    def __init__(self):
+        super().__init__(message=self.MESSAGE)
@@ -1,15 +1,68 @@
 # encoding: utf-8
 
+import numpy
 from collections import Counter
+from collections.abc import Mapping
 from randomgen.errors import (
     RandomGenTypeError,
     RandomGenEmptyError
 )
 
+# Maximum ratio of the value range to the array size for numpy.bincount
+BINCOUNT_MAX_SPAN = 4
+
+
+def count_array(numbers):
+    """ Count the occurrences of each number in an array.
+
+    Integer arrays are shifted to zero and counted with numpy.bincount if
+    the range of the values is small compared to the size of the array.
+    Sparse integers and floats are counted with numpy.unique instead.
+
+    Args:
+        numbers: A NumPy array of numbers.
+
+    Returns:
+        tuple: An array of the distinct numbers and an array of their
+        occurrences.
+
+    """
+
+    numbers = numpy.asarray(numbers).ravel()
+
+    if numbers.dtype.kind in 'iu' and numbers.size:
+        low, high = int(numbers.min()), int(numbers.max())
+        span = high - low + 1
+
+        if span <= BINCOUNT_MAX_SPAN * numbers.size:
+
+            # Unsigned differences cannot overflow and uint64 may not fit
+            # into int64, but narrow signed types overflow, e.g. int8
+            if numbers.dtype.kind == 'u':
+                dtype = numbers.dtype
+            else:
+                dtype = numpy.dtype(numpy.int64)
+
+            low = dtype.type(low)
+            shifted = numbers.astype(dtype, copy=False) - low
+
+            counts = numpy.bincount(
+                shifted.astype(numpy.intp, copy=False),
+                minlength=span)
+            values = numpy.flatnonzero(counts)
+            return values.astype(dtype) + low, counts[values]
+
+    return numpy.unique(numbers, return_counts=True)
+
 
 class Histogram(dict):
     """ Helper class to build a histogram from a list of numbers
 
+    The histogram can also be built incrementally from chunks of numbers
+    with update() and combined with the histograms of other workers with
+    merge(). The raw counts are kept next to the probabilities, so that the
+    numbers themselves do not need to be stored.
+
     Attributes:
         _numbers: A list of numbers.
         _counter: A Counter object to count the occurrences of each number.
@@ -21,10 +74,20 @@ class Histogram(dict):
     def __init__(self):
         super().__init__()
         self._numbers = ()
-        self._counter = 0
+        self._counter = Counter()
         self._total = 0
         self._probabilities = ()
 
+    @property
+    def counts(self):
+        """ The occurrences of each number counted so far. """
+        return self._counter
+
+    @property
+    def total(self):
+        """ The number of elements counted so far. """
+        return self._total
+
     def from_dict(self, histogram):
         """ Set the histogram from a dictionary.
 
@@ -36,9 +99,103 @@ class Histogram(dict):
 
         """
 
-        self.update(histogram)
+        dict.update(self, histogram)
+        return self
+
+    def from_counts(self, counts):
+        """ Set the histogram from the occurrences of each number.
+
+        Args:
+            counts: A dictionary of numbers and their occurrences.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._counter = Counter(counts)
+
+        # Calculate the total number of elements
+        self._total = sum(self._counter.values())
+
+        return self.normalize()
+
+    def normalize(self):
+        """ Update the probabilities from the counts.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        # Update self with the histogram parameters
+        dict.update(
+            self,
+            {
+                num: count / self._total
+                for num, count in
+                self._counter.items()
+            }
+        )
+
         return self
 
+    def update(self, chunk=(), **kwargs):
+        """ Add a chunk of numbers to the histogram.
+
+        A mapping or keyword arguments update the probabilities like
+        dict.update() does.
+
+        Args:
+            chunk: A list or a NumPy array of numbers.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        # Keep the behaviour of dict for mappings
+        if isinstance(chunk, Mapping) or kwargs:
+            dict.update(self, chunk, **kwargs)
+            return self
+
+        # Count the chunk and add the counts
+        if isinstance(chunk, numpy.ndarray):
+            values, counts = count_array(chunk)
+            counts = dict(zip(values.tolist(), counts.tolist()))
+        else:
+            counts = Counter(chunk)
+
+        if not counts:
+            return self
+
+        self._counter.update(counts)
+        self._total += sum(counts.values())
+
+        return self.normalize()
+
+    def merge(self, other):
+        """ Add the counts of another histogram, e.g. of another worker.
+
+        Args:
+            other: A Histogram object.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if not isinstance(other, Histogram):
+            raise RandomGenTypeError()
+
+        elif not other.total:
+            return self
+
+        self._counter.update(other.counts)
+        self._total += other.total
+
+        return self.normalize()
+
     def set_numbers(self, numbers):
         """ Set the numbers to build the histogram.
 
@@ -65,6 +222,14 @@ class Histogram(dict):
         if self._numbers is None:
             raise RandomGenTypeError()
 
+        # Check the type of a NumPy array once instead of every member
+        elif isinstance(self._numbers, numpy.ndarray):
+            if self._numbers.dtype.kind not in 'iuf':
+                raise RandomGenTypeError()
+
+            elif not self._numbers.size:
+                raise RandomGenEmptyError()
+
         # Check if the numbers are a dictionary
         elif isinstance(self._numbers, dict):
             raise RandomGenTypeError()
@@ -102,22 +267,11 @@ class Histogram(dict):
 
         """
 
-        # Count the occurrences of each number
-        self._counter = Counter(self._numbers)
-
-        # Calculate the total number of elements
-        self._total = sum(self._counter.values())
-
-        # Update self with the histogram parameters
-        self.update(
-            {
-                num: count / self._total
-                for num, count in
-                self._counter.items()
-            }
-        )
+        # Count the occurrences of each number from scratch
+        self._counter = Counter()
+        self._total = 0
 
-        return self
+        return self.update(self._numbers)
 
 
 ###############################################################################
@@ -142,3 +296,18 @@ if __name__ == "__main__":
 
     h2 = Histogram().from_dict(h1)
     print(h2)
+
+    # Count an array of random numbers with numpy.bincount
+    h3 = (
+        Histogram()
+        .set_numbers(numpy.random.default_rng().integers(-1, 4, 10 ** 7))
+        .validate_numbers()
+        .calc()
+    )
+    print(h3)
+
+    # Build a histogram chunk by chunk and merge it with the first one
+    h4 = Histogram()
+    for _ in range(10):
+        h4.update([random.randint(-1, 3) for _ in range(1000)])
+    print(h4.merge(h1).total)
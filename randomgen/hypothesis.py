@@ -1,16 +1,98 @@
 # encoding: utf-8
 
+import numpy
 import random
-from scipy.stats import chi2
 from collections import Counter
 from abc import ABCMeta, abstractmethod
 
+from randomgen.histogram import Histogram, count_array
+from randomgen.special import chi2_sf, chi2_critical
 from randomgen.errors import (
     RandomGenTypeError,
-    RandomGenEmptyError
+    RandomGenEmptyError,
+    RandomGenMismatchError,
+    RandomGenProbabilityNegativeError
 )
 
 
+def chi_square_statistic(counts, probabilities):
+    """ Calculate the chi-square values of many samples at once.
+
+    Args:
+        counts: A 2-D array of occurrences (samples x categories).
+        probabilities: The expected probabilities of the categories, either
+            a 1-D array shared by all samples or a 2-D array with one row
+            per sample.
+
+    Returns:
+        tuple: The arrays of the chi-square values and the degrees of
+        freedom of the samples.
+
+    """
+
+    counts = numpy.asarray(counts)
+    probabilities = numpy.asarray(probabilities, dtype=float)
+
+    # Check the shapes of the arrays
+    if counts.ndim != 2 or probabilities.ndim not in (1, 2):
+        raise RandomGenTypeError()
+
+    elif counts.dtype.kind not in 'iuf':
+        raise RandomGenTypeError()
+
+    elif probabilities.shape[-1] != counts.shape[1]:
+        raise RandomGenMismatchError()
+
+    elif probabilities.ndim == 2 and probabilities.shape[0] != counts.shape[0]:
+        raise RandomGenMismatchError()
+
+    elif (probabilities < 0).any():
+        raise RandomGenProbabilityNegativeError()
+
+    probabilities = numpy.broadcast_to(probabilities, counts.shape)
+    totals = counts.sum(axis=1, keepdims=True)
+    expected = probabilities * totals
+    positive = probabilities > 0
+
+    # Sum only the categories with a positive expected value
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        terms = numpy.where(
+            positive, (counts - expected) ** 2 / expected, 0.0)
+
+    chi_square = terms.sum(axis=1)
+    chi_square[(counts * ~positive).any(axis=1)] = numpy.inf
+    chi_square[totals[:, 0] == 0] = numpy.nan
+
+    df = numpy.count_nonzero(positive, axis=1) - 1
+
+    return chi_square, df
+
+
+def chi_square_batch(counts, probabilities):
+    """ Perform the chi-square test for many samples at once.
+
+    Every row of the count matrix is tested against the expected
+    probabilities in a single vectorized pass. Categories with a
+    probability of zero do not count as degrees of freedom and make the
+    chi-square value infinite if they occur. Rows without any counts give
+    NaN values.
+
+    Args:
+        counts: A 2-D array of occurrences (samples x categories).
+        probabilities: The expected probabilities of the categories, either
+            a 1-D array shared by all samples or a 2-D array with one row
+            per sample.
+
+    Returns:
+        tuple: The arrays of the chi-square values, the degrees of freedom
+        and the p-values of the samples.
+
+    """
+
+    chi_square, df = chi_square_statistic(counts, probabilities)
+    return chi_square, df, chi2_sf(chi_square, df)
+
+
 class HypothesisTestAbc(metaclass=ABCMeta):
     """ Abstract base class for hypothesis tests. """
 
@@ -105,6 +187,7 @@ class ChiSquareTest(HypothesisTestAbc):
         df: The degrees of freedom.
         p_value: The p-value.
         numbers: The observed random numbers.
+        counts: The observed occurrences of each number (optional).
         probabilities: The expected probabilities.
 
     """
@@ -128,12 +211,15 @@ class ChiSquareTest(HypothesisTestAbc):
         # Degrees of freedom
         self.df = None
 
-        # P-value
-        self.p_value = None
+        # P-value, calculated on demand
+        self._p_value = None
 
         # Observed random numbers
         self.numbers = ()
 
+        # Observed occurrences of each number, if already counted
+        self.counts = None
+
         # Given probabilities to test
         self.probabilities = ()
 
@@ -143,6 +229,15 @@ class ChiSquareTest(HypothesisTestAbc):
 
         return message
 
+    @property
+    def p_value(self):
+        """ The p-value, calculated at the first access after calc(). """
+
+        if self._p_value is None and self.chi_square is not None:
+            self._p_value = chi2_sf(self.chi_square, self.df)
+
+        return self._p_value
+
     def set_observed_numbers(self, values):
         """ Set the observed random numbers.
 
@@ -155,6 +250,63 @@ class ChiSquareTest(HypothesisTestAbc):
         """
 
         self.numbers = values
+        self.counts = None
+        return self
+
+    def set_observed_counts(self, values):
+        """ Set the occurrences of each observed random number.
+
+        This avoids counting the random numbers again, e.g. when they are
+        already counted by a histogram.
+
+        Args:
+            values: A dictionary of numbers and their occurrences.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self.numbers = ()
+        self.counts = values
+        return self
+
+    def set_observed_histogram(self, histogram):
+        """ Set the observed random numbers from the counts of a histogram.
+
+        Args:
+            histogram: A Histogram object.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if not isinstance(histogram, Histogram):
+            raise RandomGenTypeError()
+
+        return self.set_observed_counts(histogram.counts)
+
+    def validate_observed_counts(self):
+        """ Validate the occurrences of the observed random numbers.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        # Check if the counts are a dictionary
+        if not isinstance(self.counts, dict):
+            raise RandomGenTypeError()
+
+        # Check if the counts are integers
+        elif not all(isinstance(count, int) for count in self.counts.values()):
+            raise RandomGenTypeError()
+
+        # Check if the counts are empty
+        elif not self.counts:
+            raise RandomGenEmptyError()
+
         return self
 
     def validate_observed_numbers(self):
@@ -241,7 +393,11 @@ class ChiSquareTest(HypothesisTestAbc):
 
         """
 
-        self.validate_observed_numbers()
+        if self.counts is None:
+            self.validate_observed_numbers()
+        else:
+            self.validate_observed_counts()
+
         self.validate_expected_probabilities()
         return self
 
@@ -257,8 +413,11 @@ class ChiSquareTest(HypothesisTestAbc):
 
         """
 
-        # Calculate the frequency of each number
-        self._counter = Counter(self.numbers)
+        # Calculate the frequency of each number unless already counted
+        if self.counts is None:
+            self._counter = Counter(self.numbers)
+        else:
+            self._counter = self.counts
 
         # Calculate the total number of random numbers
         self._total = sum(self._counter.values())
@@ -300,8 +459,8 @@ class ChiSquareTest(HypothesisTestAbc):
 
         self.df = len(self._counter) - 1
 
-        # Calculate the p-value that corresponds to the chi-square value
-        self.p_value = 1 - chi2.cdf(self.chi_square, self.df)
+        # The p-value is only calculated if it is needed
+        self._p_value = None
 
         return self
 
@@ -318,9 +477,192 @@ class ChiSquareTest(HypothesisTestAbc):
             Scipy/Numpy hijacks bool somehow, and it becomes a bool_ object.
             Unfortunately, this causes some problems when comparing the
             result using the is operator (e.g bool(0.05) is False).
+
+            The chi-square value is compared with the cached critical value
+            of the significance level, which is the same as comparing the
+            p-value with the significance level without calculating it.
+        """
+
+        return bool(self.chi_square < chi2_critical(alpha, self.df))
+
+
+class ChiSquareAccumulator(object):
+    """ Chi-square test updated chunk by chunk with constant memory.
+
+    Only the occurrences of the expected numbers are kept, so the test can
+    run continuously over the output of a generator without storing the
+    random numbers. A number which is not expected, or has a probability
+    of zero, makes the chi-square value infinite.
+
+    Attributes:
+        _numbers: The sorted array of the expected numbers.
+        _probabilities: The expected probabilities in the same order.
+        _counts: The occurrences of each expected number.
+        _unexpected: The occurrences of the unexpected numbers.
+        total: The number of random numbers counted so far.
+        chi_square: The chi-square value.
+        df: The degrees of freedom.
+        p_value: The p-value.
+
+    """
+
+    def __init__(self, numbers, probabilities):
+
+        if len(numbers) != len(probabilities):
+            raise RandomGenMismatchError()
+
+        elif not numbers:
+            raise RandomGenEmptyError()
+
+        elif any(p < 0 for p in probabilities):
+            raise RandomGenProbabilityNegativeError()
+
+        order = sorted(range(len(numbers)), key=lambda i: numbers[i])
+        self._numbers = numpy.array([numbers[i] for i in order])
+        self._probabilities = numpy.array(
+            [probabilities[i] for i in order], dtype=float)
+        self._counts = numpy.zeros(len(numbers), dtype=numpy.int64)
+        self._unexpected = 0
+        self.total = 0
+        self.chi_square = None
+        self.df = None
+        self._p_value = None
+
+    def __str__(self):
+
+        # Nothing has been counted yet, so there is no result
+        is_null = None if self.chi_square is None else self.is_null()
+
+        message = (f"Chi-square: {self.chi_square} df: {self.df} P-value"
+                   f":{self.p_value} Null hypothesis: {is_null}")
+
+        return message
+
+    @property
+    def p_value(self):
+        """ The p-value after calc(), None before any number is counted. """
+
+        if self._p_value is None and self.chi_square is not None:
+            self._p_value = chi2_sf(self.chi_square, self.df)
+
+        return self._p_value
+
+    def update(self, chunk):
+        """ Add a chunk of random numbers to the test.
+
+        Args:
+            chunk: A list or a NumPy array of random numbers.
+
+        Returns:
+            self: The instance of the class.
+
         """
 
-        return bool(self.p_value > alpha)
+        values, counts = count_array(numpy.asarray(chunk))
+        return self._add(values, counts)
+
+    def update_counts(self, counts):
+        """ Add the occurrences of random numbers to the test.
+
+        Args:
+            counts: A dictionary of numbers and their occurrences, e.g. the
+                counts of a Histogram.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if not isinstance(counts, dict):
+            raise RandomGenTypeError()
+
+        return self._add(
+            numpy.array(list(counts.keys())),
+            numpy.array(list(counts.values()), dtype=numpy.int64)
+        )
+
+    def merge(self, other):
+        """ Add the occurrences counted by another accumulator.
+
+        Args:
+            other: A ChiSquareAccumulator with the same expected numbers.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if not isinstance(other, ChiSquareAccumulator):
+            raise RandomGenTypeError()
+
+        elif not numpy.array_equal(self._numbers, other._numbers):
+            raise RandomGenMismatchError()
+
+        self._counts += other._counts
+        self._unexpected += other._unexpected
+        self.total += other.total
+
+        return self.calc()
+
+    def _add(self, values, counts):
+        """ Add the occurrences of distinct values and update the test. """
+
+        if not values.size:
+            return self
+
+        # Find the position of each value in the expected numbers
+        indices = numpy.searchsorted(self._numbers, values)
+        indices = numpy.minimum(indices, self._numbers.size - 1)
+        found = self._numbers[indices] == values
+
+        numpy.add.at(self._counts, indices[found], counts[found])
+        self._unexpected += int(counts[~found].sum())
+        self.total += int(counts.sum())
+
+        return self.calc()
+
+    def calc(self):
+        """ Calculate the chi-square test from the counts so far.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        if not self.total:
+            return self
+
+        chi_square, df = chi_square_statistic(
+            self._counts[numpy.newaxis], self._probabilities)
+
+        # Numbers which are not expected must not occur
+        if self._unexpected:
+            chi_square[0] = numpy.inf
+
+        self.chi_square = float(chi_square[0])
+        self.df = int(df[0])
+        self._p_value = None
+
+        return self
+
+    def is_null(self, alpha=0.05):
+        """ Check if the null hypothesis is true.
+
+        The test needs random numbers, otherwise RandomGenEmptyError is
+        raised.
+
+        Args:
+            alpha: The significance level.
+
+        Returns:
+            bool: True if the null hypothesis is true, False otherwise.
+
+        """
+
+        if self.chi_square is None:
+            raise RandomGenEmptyError()
+
+        return bool(self.chi_square < chi2_critical(alpha, self.df))
 
 
 ###############################################################################
@@ -356,3 +698,16 @@ if __name__ == "__main__":
     )
 
     print("Hypothesis is: ", hypothesis.is_null())
+
+    # Test a stream of random numbers chunk by chunk with constant memory
+    accumulator = ChiSquareAccumulator([-1, 0, 1, 2, 3], [0.2] * 5)
+    for _ in range(100):
+        accumulator.update([random.randint(-1, 3) for _ in range(10000)])
+
+    print(accumulator)
+
+    # Test 1000 samples of 1000 random numbers at once
+    rng = numpy.random.default_rng()
+    samples = rng.multinomial(1000, probs, size=1000)
+    chi_squares, dfs, p_values = chi_square_batch(samples, probs)
+    print("Rejected samples: ", numpy.count_nonzero(p_values <= 0.05))
@@ -0,0 +1,228 @@
+# encoding: utf-8
+
+import os
+import mmap
+import numpy
+import tempfile
+from collections import namedtuple
+
+from randomgen.errors import RandomGenOptionError
+
+# Numbers generated at once by a worker
+PARALLEL_CHUNK_SIZE = 1 << 20
+
+# Directory of the POSIX shared memory on Linux
+SHARED_MEMORY_DIR = '/dev/shm'
+
+
+class MappedArray(namedtuple(
+        'MappedArray', ['filename', 'dtype', 'shape', 'offset'])):
+    """ Location of a read-only memory-mapped array in its file. """
+
+    def open(self):
+        """ Map the array again, e.g. in another process.
+
+        Returns:
+            numpy.memmap: The read-only array.
+
+        """
+
+        return numpy.memmap(self.filename, dtype=self.dtype, mode='r',
+                            shape=self.shape, offset=self.offset)
+
+
+def map_array(array):
+    """ Return the location of a read-only memory-mapped array.
+
+    Only whole arrays mapped from a file are located, not their views. An
+    array whose file has been removed, e.g. the table of a replaced
+    snapshot, is still mapped here but cannot be mapped again elsewhere, so
+    it is not located either.
+
+    Args:
+        array: Any object.
+
+    Returns:
+        MappedArray: The location of the array, or None if the object is
+        not a read-only memory-mapped array.
+
+    """
+
+    if (isinstance(array, numpy.memmap)
+            and isinstance(array.base, mmap.mmap)
+            and array.mode == 'r'
+            and array.filename
+            and array.flags.c_contiguous
+            and os.path.exists(array.filename)):
+        return MappedArray(
+            array.filename, array.dtype.str, array.shape, array.offset)
+
+    return None
+
+
+def split_amount(amount, workers):
+    """ Split an amount of numbers into contiguous slices for the workers.
+
+    Args:
+        amount: The number of random numbers.
+        workers: The number of workers.
+
+    Returns:
+        A list of (start, stop) tuples, one for every worker.
+
+    """
+
+    size, rest = divmod(amount, workers)
+
+    bounds = []
+    start = 0
+    for worker in range(workers):
+        stop = start + size + (1 if worker < rest else 0)
+        bounds.append((start, stop))
+        start = stop
+
+    return bounds
+
+
+def free_space(directory):
+    """ Return the free space of the file system of a directory.
+
+    Args:
+        directory: The path of the directory.
+
+    Returns:
+        int: The number of bytes available, or 0 if unknown.
+
+    """
+
+    try:
+        stats = os.statvfs(directory)
+    except (OSError, AttributeError):
+        return 0
+
+    return stats.f_bavail * stats.f_frsize
+
+
+def create_shared_array(amount, dtype):
+    """ Create an array in a file in the shared memory.
+
+    The file is placed in the POSIX shared memory if it has enough free
+    space, so that the workers write into memory which the parent process
+    maps as well, and in the temporary directory otherwise. The space of
+    the file is reserved before it is mapped, since writing to a mapping
+    without backing space kills the workers with SIGBUS.
+
+    Args:
+        amount: The number of elements.
+        dtype: The type of the elements.
+
+    Returns:
+        tuple: The path of the file and the memory-mapped array.
+
+    """
+
+    size = amount * numpy.dtype(dtype).itemsize
+    directories = [
+        directory for directory in (SHARED_MEMORY_DIR, tempfile.gettempdir())
+        if os.path.isdir(directory) and free_space(directory) >= size
+    ]
+
+    for directory in directories:
+        handle, path = tempfile.mkstemp(prefix='randomgen-', dir=directory)
+
+        try:
+            if size and hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(handle, 0, size)
+
+        # The space was taken in the meantime
+        except OSError:
+            os.unlink(path)
+            continue
+
+        finally:
+            os.close(handle)
+
+        array = numpy.memmap(path, dtype=dtype, mode='w+', shape=(amount,))
+        return path, array
+
+    raise RandomGenOptionError()
+
+
+def fill_shared_array(randomgen, path, dtype, amount, start, stop, indices):
+    """ Generate a slice of random numbers into a shared array.
+
+    Args:
+        randomgen: The prepared random number generator of the worker.
+        path: The path of the shared array.
+        dtype: The type of the elements of the shared array.
+        amount: The number of elements of the shared array.
+        start: The first position of the slice.
+        stop: The position after the last one of the slice.
+        indices: Write the indices of the numbers instead of the numbers.
+
+    Returns:
+        int: The number of generated random numbers.
+
+    """
+
+    array = numpy.memmap(path, dtype=dtype, mode='r+', shape=(amount,))
+
+    for begin in range(start, stop, PARALLEL_CHUNK_SIZE):
+        end = min(begin + PARALLEL_CHUNK_SIZE, stop)
+
+        if indices:
+            array[begin:end] = randomgen.generate_indices(end - begin)
+        else:
+            array[begin:end] = randomgen.generate(end - begin, as_array=True)
+
+    array.flush()
+    del array
+
+    return stop - start
+
+
+def count_indices(randomgen, amount, size):
+    """ Count the indices of randomly generated numbers.
+
+    Args:
+        randomgen: The prepared random number generator of the worker.
+        amount: The number of random numbers to generate.
+        size: The number of different numbers of the generator.
+
+    Returns:
+        An array with the occurrences of each index.
+
+    """
+
+    counts = numpy.zeros(size, dtype=numpy.int64)
+
+    for begin in range(0, amount, PARALLEL_CHUNK_SIZE):
+        end = min(begin + PARALLEL_CHUNK_SIZE, amount)
+        indices = randomgen.generate_indices(end - begin)
+        counts += numpy.bincount(indices, minlength=size)
+
+    return counts
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    from randomgen.core import RandomGenV3
+
+    rg = (
+        RandomGenV3()
+        .set_numbers([-1, 0, 1, 2, 3])
+        .set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        .validate()
+    )
+
+    # Generate the numbers in four processes
+    random_numbers = rg.generate_parallel(10 ** 7, workers=4)
+    print("Generated numbers:", random_numbers.size)
+
+    # Count the numbers in four processes
+    print("Observed distribution:", rg.generate_parallel(
+        10 ** 7, workers=4, histogram=True))
@@ -0,0 +1,189 @@
+# encoding: utf-8
+
+import numpy
+import threading
+from collections import deque
+
+# Numbers generated at once by the background thread
+POOL_CHUNK_SIZE = 1 << 14
+
+
+class NumberPool(object):
+    """ Buffer of random numbers generated in advance by a background thread.
+
+    The requests take their numbers from the buffer instead of generating
+    them on the request thread. The background thread refills the buffer
+    when it falls below the low-water mark. A request larger than the
+    buffered numbers gets the rest generated directly, so it never waits
+    for the background thread.
+
+    The pool implements the generate() method of the random number
+    generators, so it can be used in their place.
+
+    Attributes:
+        source: The prepared random number generator of the pool.
+        capacity: The maximum number of buffered random numbers.
+        low_water: The level below which the buffer is refilled.
+        _randomgen: The copy of the source used by the background thread.
+        _fallback: The copy of the source used when the buffer is empty.
+        _chunks: The buffered arrays of random numbers.
+        _level: The number of buffered random numbers.
+        _lock: A lock to serialize the access to the buffer.
+        _fallback_lock: A lock to serialize the access to the fallback.
+        _refill: An event to wake up the background thread.
+        _closed: True after the pool is closed.
+        _thread: The background thread.
+
+    """
+
+    def __init__(self, source, capacity, low_water=None):
+        self.source = source
+        self.capacity = capacity
+        self.low_water = capacity // 4 if low_water is None else low_water
+
+        # The background thread gets its own random number generator
+        self._randomgen, self._fallback = source.spawn(2)
+
+        self._chunks = deque()
+        self._level = 0
+        self._lock = threading.Lock()
+        self._fallback_lock = threading.Lock()
+        self._refill = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._refill.set()
+        self._thread.start()
+
+    def __len__(self):
+        return self._level
+
+    def _run(self):
+        """ Refill the buffer whenever the requests ask for it. """
+
+        while True:
+            self._refill.wait()
+
+            if self._closed:
+                return
+
+            # Generate chunks until the buffer is full
+            while self._level < self.capacity and not self._closed:
+                size = min(POOL_CHUNK_SIZE, self.capacity - self._level)
+                chunk = self._randomgen.generate(size, as_array=True)
+
+                with self._lock:
+                    if self._closed:
+                        return
+
+                    self._chunks.append(chunk)
+                    self._level += chunk.size
+
+            self._refill.clear()
+
+            # Do not miss a request or a close during the last chunk
+            if self._closed or self._level < self.low_water:
+                self._refill.set()
+
+    def generate(self, amount, as_array=False):
+        """ Take random numbers from the buffer.
+
+        Args:
+            amount: The number of random numbers.
+            as_array: Return a NumPy array instead of a list.
+
+        Returns:
+            A list of random numbers.
+
+        """
+
+        parts = []
+        missing = amount
+
+        with self._lock:
+            while missing and self._chunks:
+                chunk = self._chunks.popleft()
+
+                # Put the rest of a partially used chunk back
+                if chunk.size > missing:
+                    self._chunks.appendleft(chunk[missing:])
+                    chunk = chunk[:missing]
+
+                parts.append(chunk)
+                missing -= chunk.size
+                self._level -= chunk.size
+
+            if self._level < self.low_water:
+                self._refill.set()
+
+        # Generate the rest on the request thread
+        if missing or not parts:
+            with self._fallback_lock:
+                parts.append(self._fallback.generate(missing, as_array=True))
+
+        random_numbers = (
+            numpy.concatenate(parts) if len(parts) != 1 else parts[0])
+
+        return random_numbers if as_array else random_numbers.tolist()
+
+    def generate_seeded(self, amount, seed, offset=0, as_array=False):
+        """ Generate seeded random numbers with the source of the pool.
+
+        Seeded streams do not depend on the random state, so they are not
+        buffered.
+
+        Args:
+            amount: The number of random numbers to generate.
+            seed: The seed of the stream.
+            offset: The position of the first random number.
+            as_array: Return a NumPy array instead of a list.
+
+        Returns:
+            A list of random numbers.
+
+        """
+
+        return self.source.generate_seeded(
+            amount, seed=seed, offset=offset, as_array=as_array)
+
+    def close(self):
+        """ Stop the background thread and drop the buffered numbers.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        self._closed = True
+        self._refill.set()
+
+        with self._lock:
+            self._chunks.clear()
+            self._level = 0
+
+        return self
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    import time
+    from randomgen.core import RandomGenV3
+
+    rg = (
+        RandomGenV3()
+        .set_numbers([-1, 0, 1, 2, 3])
+        .set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        .validate()
+    )
+
+    pool = NumberPool(rg, capacity=10 ** 6)
+    time.sleep(0.1)
+
+    # The numbers are taken from the buffer
+    print("Buffered numbers:", len(pool))
+    print("Random numbers:", pool.generate(10))
+    pool.close()
@@ -1,10 +1,56 @@
-from flask import Flask, jsonify, request
-from randomgen.core import RandomGenV1, RandomGenV2
-from randomgen.endpoints import RandomGenRestApi
+import atexit
+import os
+from flask import Flask, Response, jsonify, request
+from randomgen.core import (
+    RandomGenV1,
+    RandomGenV2,
+    RandomGenV3,
+    RandomGenV4,
+    RandomGenV5,
+)
+from randomgen.endpoints import RandomGenRestApi, QUALITY_FULL
+from randomgen.errors import RandomGenOptionError
+from randomgen.store import ConfigStore
+
+# Response formats of the randomgen endpoints
+FORMAT_JSON = 'json'
+FORMAT_NDJSON = 'ndjson'
+FORMAT_BINARY = 'binary'
+
+MIMETYPE_JSON = 'application/json'
+MIMETYPE_NDJSON = 'application/x-ndjson'
+MIMETYPE_BINARY = 'application/octet-stream'
+
+FORMATS = {
+    MIMETYPE_JSON: FORMAT_JSON,
+    MIMETYPE_NDJSON: FORMAT_NDJSON,
+    MIMETYPE_BINARY: FORMAT_BINARY,
+}
+
+# Size of the pieces of a binary response passed to the WSGI server
+BINARY_CHUNK_SIZE = 1 << 20
+
+# Generator of the named distributions
+DISTRIBUTION_RANDOMGEN = RandomGenV3
+
+# Database file of the configuration shared by the worker processes
+CONFIG_STORE_PATH = os.environ.get('RANDOMGEN_CONFIG_STORE')
+
+# Directory of the configuration saved for the next start
+SNAPSHOT_PATH = os.environ.get('RANDOMGEN_SNAPSHOT')
+
+# Random numbers generated in advance for each generator (0 to disable)
+POOL_SIZE = int(os.environ.get('RANDOMGEN_POOL_SIZE') or 0)
 
 # Create the Flask application
 app = Flask(__name__)
-app.rest_api = RandomGenRestApi()
+app.rest_api = RandomGenRestApi(
+    pool_size=POOL_SIZE,
+    store=ConfigStore(CONFIG_STORE_PATH) if CONFIG_STORE_PATH else None,
+    snapshot=SNAPSHOT_PATH or None)
+
+# Stop the background threads of the pools at shutdown
+atexit.register(app.rest_api.close_pools)
 
 
 @app.route('/')
@@ -20,27 +66,140 @@ def hello_world():
     return app.rest_api.home_endpoint()
 
 
-@app.get('/api/v1/randomgen')
-def api_v1_randomgen():
-    """Route for the /api/v1/randomgen endpoint.
+def response_format():
+    """Return the response format of the request.
+
+    The format is selected by the `format` query parameter or, if missing,
+    by the Accept header of the request.
+
+    Returns:
+        str: The response format.
+
+    """
+
+    return request.args.get(
+        'format',
+        default=FORMATS[request.accept_mimetypes.best_match(
+            list(FORMATS), default=MIMETYPE_JSON)],
+        type=str
+    )
+
+
+def randomgen_response(randomgen_type, name=None):
+    """Generate the response of a randomgen endpoint.
+
+    The format is selected by the `format` query parameter or, if missing,
+    by the Accept header of the request.
+
+    Args:
+        randomgen_type: The concrete class of RandomGen to use.
+        name: The name of the distribution, or None for the default
+            configuration.
 
     Returns:
         flask.Response: The response from the randomgen endpoint.
+
     """
 
-    # Parse the query parameter
+    # Parse the query parameters
     quantity = request.args.get('numbers', default=1, type=int)
+    quality = request.args.get('quality', default=QUALITY_FULL, type=str)
+    seed = request.args.get('seed', default=None, type=int)
+    offset = request.args.get('offset', default=0, type=int)
+    fmt = response_format()
+
+    # Stream the random numbers as NDJSON records
+    if fmt == FORMAT_NDJSON:
+        return Response(
+            app.rest_api.randomgen_stream_endpoint(
+                randomgen_type=randomgen_type,
+                numbers=quantity,
+                quality=quality,
+                seed=seed,
+                offset=offset,
+                name=name
+            ),
+            mimetype=MIMETYPE_NDJSON
+        )
+
+    # Send the random numbers as a packed array
+    elif fmt == FORMAT_BINARY:
+        return binary_response(
+            *app.rest_api.randomgen_binary_endpoint(
+                randomgen_type=randomgen_type,
+                numbers=quantity,
+                quality=quality,
+                seed=seed,
+                offset=offset,
+                name=name
+            )
+        )
+
+    # Check if the format is known
+    elif fmt != FORMAT_JSON:
+        raise RandomGenOptionError()
 
     # Return the response
     return jsonify(
         app.rest_api
         .randomgen_endpoint(
-            randomgen_type=RandomGenV1,
-            numbers=quantity
+            randomgen_type=randomgen_type,
+            numbers=quantity,
+            quality=quality,
+            seed=seed,
+            offset=offset,
+            name=name
         )
     )
 
 
+def binary_response(buffer, dtype, report):
+    """Build the response for packed random numbers.
+
+    WSGI servers only accept bytes, so the buffer is copied piece by piece
+    while it is sent instead of being copied as a whole. The results of the
+    Chi-Square test are sent in the response headers. The histograms are
+    left out, since a histogram of many numbers would exceed the size limits
+    of the headers in servers and proxies.
+
+    Args:
+        buffer: The memoryview of the packed random numbers.
+        dtype: The name of the type of the packed numbers.
+        report: The quality report or None.
+
+    Returns:
+        flask.Response: The binary response.
+
+    """
+
+    headers = {
+        'Content-Length': str(buffer.nbytes),
+        'X-RandomGen-Dtype': dtype,
+    }
+
+    if report is not None and 'chi_square_test' in report:
+        for key, value in report['chi_square_test'].items():
+            name = 'X-RandomGen-' + key.replace('_', '-').title()
+            headers[name] = str(value)
+
+    def chunks():
+        for start in range(0, buffer.nbytes, BINARY_CHUNK_SIZE):
+            yield bytes(buffer[start:start + BINARY_CHUNK_SIZE])
+
+    return Response(chunks(), mimetype=MIMETYPE_BINARY, headers=headers)
+
+
+@app.get('/api/v1/randomgen')
+def api_v1_randomgen():
+    """Route for the /api/v1/randomgen endpoint.
+
+    Returns:
+        flask.Response: The response from the randomgen endpoint.
+    """
+
+    return randomgen_response(RandomGenV1)
+
+
 @app.get('/api/v2/randomgen')
 def api_v2_randomgen():
     """Route for the /api/v2/randomgen endpoint.
@@ -50,15 +209,103 @@ def api_v2_randomgen():
 
     """
 
-    # Parse the query parameter
-    quantity = request.args.get('numbers', default=1, type=int)
+    return randomgen_response(RandomGenV2)
+
+
+@app.get('/api/v3/randomgen')
+def api_v3_randomgen():
+    """Route for the /api/v3/randomgen endpoint.
+
+    Returns:
+        flask.Response: The response from the randomgen endpoint.
+
+    """
+
+    return randomgen_response(RandomGenV3)
+
+
+@app.get('/api/v4/randomgen')
+def api_v4_randomgen():
+    """Route for the /api/v4/randomgen endpoint.
+
+    Returns:
+        flask.Response: The response from the randomgen endpoint.
+
+    """
+
+    return randomgen_response(RandomGenV4)
+
+
+@app.get('/api/v5/randomgen')
+def api_v5_randomgen():
+    """Route for the /api/v5/randomgen endpoint.
+
+    Returns:
+        flask.Response: The response from the randomgen endpoint.
+
+    """
+
+    return randomgen_response(RandomGenV5)
+
+
+def parametric_query():
+    """Parse the query parameters shared by the parametric endpoints.
+
+    The parametric endpoints only send JSON, other formats are rejected.
+
+    Returns:
+        dict: The quantity, quality level, seed and offset of the request.
+
+    """
+
+    if response_format() != FORMAT_JSON:
+        raise RandomGenOptionError()
+
+    return {
+        'numbers': request.args.get('numbers', default=1, type=int),
+        'quality': request.args.get('quality', default=QUALITY_FULL, type=str),
+        'seed': request.args.get('seed', default=None, type=int),
+        'offset': request.args.get('offset', default=0, type=int),
+    }
+
+
+@app.get('/api/poisson/randomgen')
+def api_poisson_randomgen():
+    """Route for random numbers of a Poisson distribution.
+
+    Returns:
+        flask.Response: The response from the Poisson endpoint.
+
+    """
+
+    # Parse the query parameters
+    rate = request.args.get('rate', default=None, type=float)
 
     # Return the response
     return jsonify(
-        app.rest_api
-        .randomgen_endpoint(
-            randomgen_type=RandomGenV2,
-            numbers=quantity
+        app.rest_api.poisson_endpoint(rate=rate, **parametric_query())
+    )
+
+
+@app.get('/api/binomial/randomgen')
+def api_binomial_randomgen():
+    """Route for random numbers of a binomial distribution.
+
+    Returns:
+        flask.Response: The response from the binomial endpoint.
+
+    """
+
+    # Parse the query parameters
+    trials = request.args.get('trials', default=None, type=int)
+    probability = request.args.get('probability', default=None, type=float)
+
+    # Return the response
+    return jsonify(
+        app.rest_api.binomial_endpoint(
+            trials=trials,
+            probability=probability,
+            **parametric_query()
         )
     )
 
@@ -85,6 +332,102 @@ def api_config():
     )
 
 
+@app.patch('/api/config')
+def api_patch_config():
+    """Route for partial updates with the /api/config endpoint.
+
+    Returns:
+        flask.Response: The response from the patch config endpoint.
+
+    """
+
+    # Parse the request body
+    numbers = request.json.get('numbers', [])
+    probabilities = request.json.get('probabilities', [])
+    remove = request.json.get('remove', [])
+
+    # Return the response
+    return jsonify(
+        app.rest_api.patch_config_endpoint(
+            numbers=numbers,
+            probabilities=probabilities,
+            remove=remove
+        )
+    )
+
+
+@app.get('/api/distributions')
+def api_list_distributions():
+    """Route for listing the named distributions.
+
+    Returns:
+        flask.Response: The response from the list distributions endpoint.
+
+    """
+
+    return jsonify(app.rest_api.list_distributions_endpoint())
+
+
+@app.post('/api/distributions')
+def api_create_distribution():
+    """Route for creating a named distribution.
+
+    Returns:
+        flask.Response: The response from the create distribution endpoint.
+
+    """
+
+    # Parse the request body
+    name = request.json['name']
+    numbers = request.json['numbers']
+    probabilities = request.json['probabilities']
+
+    # Return the response
+    return jsonify(
+        app.rest_api.create_distribution_endpoint(
+            name=name,
+            numbers=numbers,
+            probabilities=probabilities
+        )
+    )
+
+
+@app.get('/api/distributions/<name>')
+def api_distribution(name):
+    """Route for reading a named distribution.
+
+    Returns:
+        flask.Response: The response from the distribution endpoint.
+
+    """
+
+    return jsonify(app.rest_api.distribution_endpoint(name))
+
+
+@app.delete('/api/distributions/<name>')
+def api_delete_distribution(name):
+    """Route for deleting a named distribution.
+
+    Returns:
+        flask.Response: The response from the delete distribution endpoint.
+
+    """
+
+    return jsonify(app.rest_api.delete_distribution_endpoint(name))
+
+
+@app.get('/api/distributions/<name>/randomgen')
+def api_distribution_randomgen(name):
+    """Route for generating random numbers from a named distribution.
+
+    Returns:
+        flask.Response: The response from the randomgen endpoint.
+
+    """
+
+    return randomgen_response(DISTRIBUTION_RANDOMGEN, name=name)
+
+
 @app.post('/api/reset')
 def api_reset():
     """Route for the /api/reset endpoint.
@@ -0,0 +1,178 @@
+# encoding: utf-8
+
+import os
+import json
+import uuid
+import numpy
+
+from randomgen.core import RandomGenV1, RandomGenV2, RandomGenV3
+
+# Version of the layout of the snapshot directory
+SNAPSHOT_FORMAT = 1
+
+# File describing the current snapshot
+SNAPSHOT_META = 'meta.json'
+
+# Generators whose tables are saved in the snapshot
+SNAPSHOT_RANDOMGENS = (RandomGenV1, RandomGenV2, RandomGenV3)
+
+
+def _read_meta(directory):
+    """ Read the description of the current snapshot or None. """
+
+    try:
+        with open(os.path.join(directory, SNAPSHOT_META)) as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(meta, dict) or meta.get('format') != SNAPSHOT_FORMAT:
+        return None
+
+    return meta
+
+
+def save_snapshot(directory, randomgens, revision=None):
+    """ Save the prepared tables of validated generators to a directory.
+
+    Every table is written to its own .npy file, so that it can be
+    memory-mapped when it is loaded. The file names are unique for every
+    snapshot and the description of the snapshot is replaced atomically at
+    the end, so a reader never sees the tables of two different snapshots.
+    The files of the previous snapshot are kept, since the generators which
+    use them may still be sent to other processes, and the older files are
+    removed.
+
+    Args:
+        directory: The directory of the snapshot.
+        randomgens: The validated generators of the same configuration.
+        revision: The revision of the shared configuration or None.
+
+    Returns:
+        dict: The description of the saved snapshot.
+
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    previous = _read_meta(directory)
+    token = uuid.uuid4().hex
+
+    tables = {}
+    for randomgen in randomgens:
+        tables.update(randomgen.get_tables())
+
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'revision': revision,
+        'randomgens': [type(randomgen).__name__ for randomgen in randomgens],
+        'tables': {},
+    }
+
+    for name, table in tables.items():
+        table = numpy.asarray(table)
+
+        # Mixed integers and floats cannot be saved without pickle
+        if table.dtype == object:
+            meta[name] = table.tolist()
+            continue
+
+        filename = '{}-{}.npy'.format(name, token)
+        numpy.save(os.path.join(directory, filename), table,
+                   allow_pickle=False)
+        meta['tables'][name] = filename
+
+    # Swap the description of the snapshot in a single step
+    path = os.path.join(directory, SNAPSHOT_META)
+    with open(path + '.' + token, 'w') as file:
+        json.dump(meta, file)
+    os.replace(path + '.' + token, path)
+
+    # Keep the tables of the previous snapshot and remove the older ones
+    keep = set(meta['tables'].values())
+    if previous is not None:
+        keep.update(previous.get('tables', {}).values())
+
+    for filename in os.listdir(directory):
+        if filename.endswith('.npy') and filename not in keep:
+            try:
+                os.remove(os.path.join(directory, filename))
+            except OSError:
+                pass
+
+    return meta
+
+
+def load_snapshot(directory):
+    """ Load the generators of the snapshot in a directory.
+
+    The tables are memory-mapped instead of being read, and the generators
+    are restored without being validated again.
+
+    Args:
+        directory: The directory of the snapshot.
+
+    Returns:
+        tuple: The revision of the shared configuration, the numbers, the
+        probabilities and the list of generators, or None if the directory
+        has no valid snapshot.
+
+    """
+
+    meta = _read_meta(directory)
+
+    if meta is None:
+        return None
+
+    types = {
+        randomgen.__name__: randomgen for randomgen in SNAPSHOT_RANDOMGENS}
+
+    try:
+        tables = {
+            name: numpy.load(os.path.join(directory, filename),
+                             mmap_mode='r', allow_pickle=False)
+            for name, filename in meta['tables'].items()
+        }
+
+        if 'numbers' in meta:
+            tables['numbers'] = numpy.asarray(meta['numbers'], dtype=object)
+
+        randomgens = [
+            types[name]().set_tables(tables) for name in meta['randomgens']]
+
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if not randomgens:
+        return None
+
+    return (
+        meta['revision'],
+        tables['numbers'].tolist(),
+        tables['probabilities'].tolist(),
+        randomgens,
+    )
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+
+    rg = (
+        RandomGenV3()
+        .set_numbers([-1, 0, 1, 2, 3])
+        .set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        .validate()
+    )
+
+    save_snapshot(directory, [rg])
+
+    # The restored generator uses the memory-mapped tables
+    revision, numbers, probabilities, randomgens = load_snapshot(directory)
+    print("Numbers:", numbers)
+    print("Random numbers:", randomgens[0].generate(10))
@@ -0,0 +1,347 @@
+# encoding: utf-8
+
+import math
+import numpy
+from functools import lru_cache
+
+# Maximum number of terms of the series and the continued fraction
+GAMMA_MAX_ITERATIONS = 10000
+
+# Relative accuracy of the incomplete gamma function
+GAMMA_EPSILON = 1e-15
+
+# Smallest value to avoid divisions by zero in the continued fraction
+GAMMA_TINY = 1e-300
+
+# Vectorized logarithm of the gamma function
+_lgamma = numpy.vectorize(math.lgamma, otypes=[float])
+
+# Maximum number of cached critical values
+CRITICAL_VALUE_CACHE_SIZE = 1024
+
+# Relative accuracy of the critical values
+CRITICAL_VALUE_EPSILON = 1e-12
+
+# Backend of the incomplete gamma function, selected at the first use
+_backend = None
+
+# Coefficients of the Stirling series of the logarithm of the gamma function
+STIRLING_COEFFICIENTS = (
+    8.333333333333333e-02, -2.777777777777778e-03, 7.936507936507937e-04,
+    -5.952380952380952e-04, 8.417508417508418e-04, -1.917526917526918e-03,
+    6.410256410256410e-03, -2.955065359477124e-02, 1.796443723688307e-01,
+    -1.39243221690590e+00,
+)
+
+# Smallest argument of the Stirling series, smaller ones are shifted
+STIRLING_MIN = 7
+
+
+def _gamma_series(a, x):
+    """ Regularized lower incomplete gamma function P(a, x) as a series.
+
+    The series converges quickly for x < a + 1.
+
+    """
+
+    term = 1.0 / a
+    total = term.copy()
+    n = a.copy()
+
+    for _ in range(GAMMA_MAX_ITERATIONS):
+        n += 1
+        term *= x / n
+        total += term
+
+        if numpy.all(numpy.abs(term) < numpy.abs(total) * GAMMA_EPSILON):
+            break
+
+    return total * numpy.exp(-x + a * numpy.log(x) - _lgamma(a))
+
+
+def _gamma_fraction(a, x):
+    """ Regularized upper incomplete gamma function Q(a, x) as a fraction.
+
+    The continued fraction is evaluated with the modified Lentz method and
+    converges quickly for x >= a + 1.
+
+    """
+
+    b = x + 1 - a
+    c = numpy.full_like(x, 1.0 / GAMMA_TINY)
+    d = 1.0 / b
+    h = d.copy()
+
+    for i in range(1, GAMMA_MAX_ITERATIONS):
+        an = -i * (i - a)
+        b += 2
+
+        d = an * d + b
+        d[numpy.abs(d) < GAMMA_TINY] = GAMMA_TINY
+        c = b + an / c
+        c[numpy.abs(c) < GAMMA_TINY] = GAMMA_TINY
+
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+
+        if numpy.all(numpy.abs(delta - 1) < GAMMA_EPSILON):
+            break
+
+    return numpy.exp(-x + a * numpy.log(x) - _lgamma(a)) * h
+
+
+def _stirling_series(x):
+    """ Stirling series of log(gamma(x)) for arguments >= STIRLING_MIN. """
+
+    inverse = 1.0 / (x * x)
+    series = numpy.zeros_like(x)
+    for coefficient in reversed(STIRLING_COEFFICIENTS):
+        series = series * inverse + coefficient
+
+    return series / x
+
+
+def gammaln(x):
+    """ Logarithm of the gamma function of an array.
+
+    The Stirling series is evaluated for all the values at once. Values
+    below STIRLING_MIN are shifted up with the recurrence of the gamma
+    function, like the loggam() function used by the NumPy samplers.
+
+    Args:
+        x: The positive arguments, a number or an array.
+
+    Returns:
+        An array with the values of log(gamma(x)).
+
+    """
+
+    x = numpy.asarray(x, dtype=float)
+    shift = numpy.maximum(numpy.floor(STIRLING_MIN - x), 0)
+    shifted = x + shift
+
+    result = (_stirling_series(shifted) + 0.5 * math.log(2 * math.pi)
+              + (shifted - 0.5) * numpy.log(shifted) - shifted)
+
+    # Undo the shift with log(gamma(x)) = log(gamma(x + 1)) - log(x)
+    for step in range(1, STIRLING_MIN + 1):
+        result -= numpy.where(
+            step <= shift, numpy.log(numpy.maximum(shifted - step, x)), 0.0)
+
+    return result
+
+
+def stirling_error(x):
+    """ Error of the Stirling approximation of log(x!) of an array.
+
+    The error is log(x!) - (x + 0.5) * log(x) + x - log(sqrt(2 * pi)). It
+    is small and computed from the Stirling series for large values, so a
+    probability computed with it does not lose its precision in the
+    difference of large logarithms.
+
+    Args:
+        x: The positive arguments, a number or an array.
+
+    Returns:
+        An array with the errors of the Stirling approximation.
+
+    """
+
+    x = numpy.asarray(x, dtype=float)
+    small = numpy.minimum(x, STIRLING_MIN)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        direct = (gammaln(small + 1) - (small + 0.5) * numpy.log(small)
+                  + small - 0.5 * math.log(2 * math.pi))
+
+    return numpy.where(
+        x < STIRLING_MIN, direct,
+        _stirling_series(numpy.maximum(x, STIRLING_MIN)))
+
+
+def deviance(x, mean):
+    """ The value x * log(x / mean) + mean - x of arrays.
+
+    It is computed as mean * ((1 + u) * log(1 + u) - u) with the relative
+    difference u = (x - mean) / mean, which avoids the difference of large
+    numbers near the mean.
+
+    Args:
+        x: The non-negative arguments, a number or an array.
+        mean: The positive means, a number or an array.
+
+    Returns:
+        An array with the deviances.
+
+    """
+
+    x = numpy.asarray(x, dtype=float)
+    mean = numpy.asarray(mean, dtype=float)
+    u = (x - mean) / mean
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return numpy.where(
+            x == 0, mean, mean * ((1 + u) * numpy.log1p(u) - u))
+
+
+def xlogy(x, y):
+    """ Product x * log(y) of arrays, which is 0 where x is 0.
+
+    Args:
+        x: A number or an array.
+        y: The non-negative arguments of the logarithm.
+
+    Returns:
+        An array with the values of x * log(y).
+
+    """
+
+    x = numpy.asarray(x, dtype=float)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return numpy.where(x == 0, 0.0, x * numpy.log(y))
+
+
+def gammaincc(a, x):
+    """ Regularized upper incomplete gamma function Q(a, x).
+
+    Pure NumPy implementation with the series and the continued fraction
+    of Numerical Recipes, so that p-values can be computed without SciPy.
+
+    Args:
+        a: The shape parameter (a > 0), a number or an array.
+        x: The upper limit of the integral (x >= 0), a number or an array.
+
+    Returns:
+        An array with the values of Q(a, x).
+
+    """
+
+    a, x = numpy.broadcast_arrays(
+        numpy.asarray(a, dtype=float), numpy.asarray(x, dtype=float))
+    shape = x.shape
+    a, x = a.ravel(), x.ravel()
+
+    result = numpy.full(x.shape, numpy.nan)
+
+    # Limits of the function
+    valid = (a > 0) & (x >= 0)
+    result[valid & (x == 0)] = 1.0
+    result[valid & numpy.isposinf(x)] = 0.0
+
+    finite = valid & (x > 0) & numpy.isfinite(x)
+    series = finite & (x < a + 1)
+    fraction = finite & ~series
+
+    if series.any():
+        result[series] = 1.0 - _gamma_series(a[series], x[series])
+
+    if fraction.any():
+        result[fraction] = _gamma_fraction(a[fraction], x[fraction])
+
+    return result.reshape(shape)
+
+
+def _load_backend():
+    """ Return the incomplete gamma function of SciPy or the built-in one.
+
+    SciPy is imported at the first call instead of the start of the
+    application, and the built-in function is used if it is not installed.
+
+    """
+
+    global _backend
+
+    if _backend is None:
+        try:
+            from scipy.special import gammaincc as scipy_gammaincc
+            _backend = scipy_gammaincc
+        except ImportError:
+            _backend = gammaincc
+
+    return _backend
+
+
+def chi2_sf(chi_square, df):
+    """ Survival function (1 - CDF) of the chi-square distribution.
+
+    Args:
+        chi_square: The chi-square value, a number or an array.
+        df: The degrees of freedom, a number or an array.
+
+    Returns:
+        The p-value as a float or an array of p-values.
+
+    """
+
+    df = numpy.asarray(df, dtype=float)
+    chi_square = numpy.asarray(chi_square, dtype=float)
+
+    # The distribution is only defined for positive degrees of freedom
+    p_value = numpy.where(
+        df > 0,
+        _load_backend()(numpy.maximum(df, 1) / 2, chi_square / 2),
+        numpy.nan
+    )
+
+    return p_value if p_value.ndim else float(p_value)
+
+
+@lru_cache(maxsize=CRITICAL_VALUE_CACHE_SIZE)
+def chi2_critical(alpha, df):
+    """ Critical value of the chi-square distribution.
+
+    The critical value is the chi-square value with a p-value of alpha, so
+    the null hypothesis holds for smaller chi-square values. It is found by
+    bisection and memoized per significance level and degrees of freedom.
+
+    Args:
+        alpha: The significance level.
+        df: The degrees of freedom.
+
+    Returns:
+        float: The critical value (NaN for df <= 0).
+
+    """
+
+    if df <= 0:
+        return math.nan
+
+    elif alpha <= 0:
+        return math.inf
+
+    elif alpha >= 1:
+        return 0.0
+
+    # Find an upper bound of the critical value
+    low, high = 0.0, float(df)
+    while chi2_sf(high, df) > alpha:
+        low, high = high, 2 * high
+
+    # Bisect the interval until the requested accuracy
+    while high - low > CRITICAL_VALUE_EPSILON * high:
+        middle = (low + high) / 2
+
+        if chi2_sf(middle, df) > alpha:
+            low = middle
+        else:
+            high = middle
+
+    return (low + high) / 2
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    # Critical value of the chi-square distribution with 4 degrees of freedom
+    print("P-value:", chi2_sf(9.487729036781154, 4))
+
+    # The critical value is cached for the following tests
+    print("Critical value:", chi2_critical(0.05, 4))
+
+    # The built-in function agrees with SciPy
+    print("Q(2, 3):", gammaincc(2, 3))
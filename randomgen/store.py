@@ -0,0 +1,152 @@
+# encoding: utf-8
+
+import json
+import sqlite3
+import threading
+
+# Seconds to wait for a lock of the database held by another process
+STORE_TIMEOUT = 10.0
+
+
+class ConfigStore(object):
+    """ Configuration shared by the worker processes in an SQLite file.
+
+    Every process opens the same file. A change of the configuration is
+    written with a new revision number, and the other processes notice it
+    with `PRAGMA data_version`, which changes when another connection
+    commits to the database. The check does not read the configuration
+    itself, so it is cheap enough to run before every request.
+
+    Attributes:
+        path: The path of the SQLite database file.
+        _connection: The connection to the database.
+        _data_version: The last data version seen by this connection.
+        _lock: A lock to serialize the access to the connection.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(
+            path, timeout=STORE_TIMEOUT, check_same_thread=False,
+            isolation_level=None)
+        self._data_version = None
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS config ('
+                'id INTEGER PRIMARY KEY CHECK (id = 1), '
+                'revision INTEGER NOT NULL, '
+                'numbers TEXT NOT NULL, '
+                'probabilities TEXT NOT NULL)'
+            )
+
+    def changed(self):
+        """ Check if another process has changed the database.
+
+        Returns:
+            bool: True at the first call and after a change by another
+            connection, False otherwise.
+
+        """
+
+        with self._lock:
+            data_version = self._connection.execute(
+                'PRAGMA data_version').fetchone()[0]
+
+            changed = data_version != self._data_version
+            self._data_version = data_version
+
+        return changed
+
+    def load(self):
+        """ Read the shared configuration.
+
+        Returns:
+            tuple: The revision, the numbers and the probabilities, or None
+            if no configuration has been saved yet.
+
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT revision, numbers, probabilities FROM config '
+                'WHERE id = 1').fetchone()
+
+        if row is None:
+            return None
+
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def save(self, numbers, probabilities):
+        """ Write a new revision of the shared configuration.
+
+        Args:
+            numbers: The list of numbers.
+            probabilities: The list of probabilities.
+
+        Returns:
+            int: The revision of the saved configuration.
+
+        """
+
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+
+            try:
+                row = cursor.execute(
+                    'SELECT revision FROM config WHERE id = 1').fetchone()
+                revision = 1 if row is None else row[0] + 1
+
+                cursor.execute(
+                    'INSERT OR REPLACE INTO config '
+                    '(id, revision, numbers, probabilities) '
+                    'VALUES (1, ?, ?, ?)',
+                    (revision, json.dumps(numbers), json.dumps(probabilities))
+                )
+                cursor.execute('COMMIT')
+
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+
+        return revision
+
+    def close(self):
+        """ Close the connection to the database.
+
+        Returns:
+            self: The instance of the class.
+
+        """
+
+        with self._lock:
+            self._connection.close()
+
+        return self
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    import os
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), 'config.db')
+
+    # Two stores stand for two worker processes
+    worker_1 = ConfigStore(path)
+    worker_2 = ConfigStore(path)
+    worker_2.changed()
+
+    worker_1.save([1, 2, 3], [0.2, 0.3, 0.5])
+
+    # The second worker notices the change and loads the configuration
+    print("Changed:", worker_2.changed())
+    print("Configuration:", worker_2.load())
@@ -0,0 +1,213 @@
+# encoding: utf-8
+
+import numpy
+import random
+
+from randomgen.errors import RandomGenOptionError
+
+# Philox keys are 128-bit integers
+MAX_SEED = 2 ** 128
+
+# Philox produces four 64-bit values per counter increment
+PHILOX_BLOCK = 4
+
+# Lanes start at the highest word of the 256-bit Philox counter
+LANE_SHIFT = 192
+MAX_LANE = 2 ** 64
+
+# Bytes drawn at once by a bit source
+BIT_BUFFER_SIZE = 1 << 12
+
+
+class CounterStream(object):
+    """ Seeded stream of uniform random values with random access.
+
+    The stream is based on the counter-based Philox generator. The value at
+    any position is a function of the seed and the position only, so a slice
+    of the stream is computed directly by advancing the counter without
+    generating the values before it. Disjoint slices can be generated by
+    different workers and the stream can be served again without storing it.
+
+    A stream has independent lanes which start at different words of the
+    counter, e.g. for the rejection samplers which need more values at some
+    positions than at others.
+
+    Attributes:
+        seed: The seed of the stream, used as the Philox key.
+
+    """
+
+    def __init__(self, seed):
+
+        # Check if the seed is a valid Philox key
+        if not isinstance(seed, int) or not 0 <= seed < MAX_SEED:
+            raise RandomGenOptionError()
+
+        self.seed = seed
+
+    def uniforms(self, offset, count, lane=0):
+        """ Return the uniform random values at the given positions.
+
+        Args:
+            offset: The position of the first value.
+            count: The number of values.
+            lane: The lane of the stream.
+
+        Returns:
+            An array of random values in the interval [0, 1).
+
+        """
+
+        # Check if the offset and the lane are valid
+        if not isinstance(offset, int) or offset < 0:
+            raise RandomGenOptionError()
+
+        elif not isinstance(lane, int) or not 0 <= lane < MAX_LANE:
+            raise RandomGenOptionError()
+
+        # Jump to the block of the first value and skip the rest
+        bit_generator = numpy.random.Philox(
+            key=self.seed, counter=lane << LANE_SHIFT)
+        bit_generator.advance(offset // PHILOX_BLOCK)
+        bit_generator.random_raw(offset % PHILOX_BLOCK)
+
+        # Convert the 64-bit values to doubles like numpy.random.Generator
+        raw = bit_generator.random_raw(count)
+        return (raw >> numpy.uint64(11)) * (1.0 / 2 ** 53)
+
+
+def validate_rng(rng):
+    """ Check if the object is a supported random number generator.
+
+    Args:
+        rng: A random.Random or a numpy.random.Generator object.
+
+    Returns:
+        The random number generator.
+
+    """
+
+    if not isinstance(rng, (random.Random, numpy.random.Generator)):
+        raise RandomGenOptionError()
+
+    return rng
+
+
+def random_uniforms(rng, amount):
+    """ Draw an array of uniform random values from a generator.
+
+    Args:
+        rng: A random.Random or a numpy.random.Generator object.
+        amount: The number of values.
+
+    Returns:
+        An array of random values in the interval [0, 1).
+
+    """
+
+    if isinstance(rng, numpy.random.Generator):
+        return rng.random(amount)
+
+    return numpy.fromiter(
+        (rng.random() for _ in range(amount)), dtype=float, count=amount)
+
+
+class BitSource(object):
+    """ Buffered source of random bits.
+
+    The bits are drawn from the random number generator as whole bytes,
+    BIT_BUFFER_SIZE of them at once, and handed out one by one, so no bit
+    of the generator is thrown away. The consumed bits are counted to
+    measure the entropy used by a sampler.
+
+    Attributes:
+        rng: A random.Random or a numpy.random.Generator object.
+        consumed: The number of bits handed out so far.
+        _buffer: The unused bits of the last draw.
+        _position: The position of the next unused bit in the buffer.
+
+    """
+
+    def __init__(self, rng):
+        self.rng = validate_rng(rng)
+        self.consumed = 0
+        self._buffer = numpy.empty(0, dtype=numpy.uint8)
+        self._position = 0
+
+    def draw_bytes(self, amount):
+        """ Draw random bytes from the random number generator.
+
+        Args:
+            amount: The number of bytes.
+
+        Returns:
+            An array of random bytes.
+
+        """
+
+        if isinstance(self.rng, numpy.random.Generator):
+            data = self.rng.bytes(amount)
+        else:
+            data = self.rng.getrandbits(8 * amount).to_bytes(amount, 'little')
+
+        return numpy.frombuffer(data, dtype=numpy.uint8)
+
+    def bits(self, amount):
+        """ Return random bits.
+
+        Args:
+            amount: The number of bits.
+
+        Returns:
+            An array of random bits (0 or 1) of type uint8.
+
+        """
+
+        rest = self._buffer[self._position:]
+
+        # Refill the buffer with whole bytes after the unused bits
+        if rest.size < amount:
+            size = max(BIT_BUFFER_SIZE, -(-(amount - rest.size) // 8))
+            self._buffer = numpy.concatenate(
+                (rest, numpy.unpackbits(self.draw_bytes(size))))
+            self._position = 0
+
+        bits = self._buffer[self._position:self._position + amount]
+        self._position += amount
+        self.consumed += amount
+
+        return bits
+
+
+def spawn_rngs(rng, amount):
+    """ Create independent child generators of a random number generator.
+
+    NumPy generators are spawned from their seed sequence. The children of
+    random.Random objects are seeded with 128 random bits of the parent.
+
+    Args:
+        rng: A random.Random or a numpy.random.Generator object.
+        amount: The number of child generators.
+
+    Returns:
+        A list of child generators of the same kind as the parent.
+
+    """
+
+    if isinstance(rng, numpy.random.Generator):
+        return rng.spawn(amount)
+
+    return [type(rng)(rng.getrandbits(128)) for _ in range(amount)]
+
+
+###############################################################################
+# Examples
+###############################################################################
+
+if __name__ == "__main__":
+
+    stream = CounterStream(seed=42)
+
+    # The second slice is computed without the values before it
+    print(stream.uniforms(offset=0, count=8))
+    print(stream.uniforms(offset=4, count=4))
@@ -0,0 +1,108 @@
+# encoding: utf-8
+import pytest
+import threading
+
+from randomgen.cache import SamplerCache
+
+
+class TestSamplerCache(object):
+    """ Test the cache of prepared random number generators."""
+
+    def test_reuse(self):
+        """ Test that the factory is called once per key."""
+
+        calls = []
+        cache = SamplerCache(max_size=2)
+
+        for _ in range(3):
+            cache.get('a', lambda: calls.append('a') or object())
+
+        assert calls == ['a']
+        assert len(cache) == 1
+
+    def test_eviction(self):
+        """ Test that the least recently used key is evicted."""
+
+        cache = SamplerCache(max_size=2)
+
+        cache.get('a', object)
+        cache.get('b', object)
+
+        # Use the key "a" again, so that "b" becomes the oldest one
+        cache.get('a', object)
+        cache.get('c', object)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+
+    def test_concurrent(self):
+        """ Test that a slow factory only blocks the requests of its key."""
+
+        cache = SamplerCache(max_size=4)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append('a')
+            started.set()
+            release.wait(5)
+            return 'A'
+
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                cache.get('a', slow)))
+            for _ in range(2)
+        ]
+        threads[0].start()
+        started.wait(5)
+        threads[1].start()
+
+        # Another key is prepared while "a" is being built
+        assert cache.get('b', lambda: 'B') == 'B'
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == ['A', 'A']
+        assert calls == ['a']
+
+    def test_factory_error(self):
+        """ Test that a failed factory is not cached."""
+
+        cache = SamplerCache(max_size=2)
+
+        def fail():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            cache.get('a', fail)
+
+        assert cache.get('a', lambda: 'A') == 'A'
+
+    def test_clear(self):
+        """ Test that the cache can be cleared."""
+
+        cache = SamplerCache(max_size=2)
+        cache.get('a', object)
+        cache.clear()
+
+        assert len(cache) == 0
+
+    def test_remove(self):
+        """ Test that the matching keys are removed."""
+
+        cache = SamplerCache(max_size=4)
+        for key in ('a1', 'a2', 'b1'):
+            cache.get(key, object)
+        cache.remove(lambda key: key.startswith('a'))
+
+        assert len(cache) == 1
+        assert 'b1' in cache
+
+
+if __name__ == "__main__":
+    pytest.main()
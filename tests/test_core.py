@@ -1,17 +1,33 @@
+import os
 import time
+import numpy
+import pickle
 import pytest
-
-from randomgen.core import RandomGenV1, RandomGenV2
+import random
+
+from randomgen.core import (
+    RandomGenV1,
+    RandomGenV2,
+    RandomGenV3,
+    RandomGenV4,
+    RandomGenV5,
+    RandomGenPoisson,
+    RandomGenBinomial,
+    SEARCH_BISECT,
+    SEARCH_LINEAR,
+)
 from randomgen.hypothesis import ChiSquareTest
+from randomgen.streams import BitSource
 from randomgen.errors import (
     RandomGenTypeError,
     RandomGenEmptyError,
     RandomGenMismatchError,
     RandomGenProbabilitySumError,
-
+    RandomGenOptionError,
+    RandomGenNotFoundError,
 )
 
-versions = [RandomGenV1, RandomGenV2]
+versions = [RandomGenV1, RandomGenV2, RandomGenV3, RandomGenV4, RandomGenV5]
 
 
 # #############################################################################
@@ -342,6 +358,746 @@ class TestRandomGenDistribution(object):
         assert hypothesis.is_null() is False
 
 
+@pytest.mark.parametrize("randomgen", versions, indirect=True)
+class TestRandomGenBatch(object):
+    """ Test the vectorized batch generation."""
+
+    def test_list(self, randomgen):
+        """ Test that the batch is returned as a list of numbers."""
+
+        randomgen.set_numbers([-1, 0, 1, 2, 3])
+        randomgen.set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        randomgen.validate()
+
+        random_numbers = randomgen.generate(amount=1000)
+
+        assert isinstance(random_numbers, list)
+        assert len(random_numbers) == 1000
+        assert set(random_numbers) <= {-1, 0, 1, 2, 3}
+
+    def test_array(self, randomgen):
+        """ Test that the batch is returned as a NumPy array."""
+
+        randomgen.set_numbers([1.5, 2.5])
+        randomgen.set_probabilities([0.5, 0.5])
+        randomgen.validate()
+
+        random_numbers = randomgen.generate(amount=1000, as_array=True)
+
+        assert isinstance(random_numbers, numpy.ndarray)
+        assert random_numbers.shape == (1000,)
+        assert set(random_numbers.tolist()) <= {1.5, 2.5}
+
+    def test_mixed_numbers(self, randomgen):
+        """ Test that mixed numbers keep their types."""
+
+        randomgen.set_numbers([1, 2.5])
+        randomgen.set_probabilities([0.5, 0.5])
+        randomgen.validate()
+
+        random_numbers = randomgen.generate(amount=100)
+
+        assert {type(num) for num in random_numbers} <= {int, float}
+        assert all(isinstance(num, int)
+                   for num in random_numbers if num == 1)
+
+    def test_fit(self, randomgen):
+        """ Test that the batch fits the distribution."""
+
+        probabilities = [0.1, 0.2, 0.3, 0.4]
+
+        randomgen.set_numbers([1, 2, 3, 4])
+        randomgen.set_probabilities(probabilities)
+        randomgen.validate()
+        randomgen.set_rng(numpy.random.default_rng(seed=1))
+
+        hypothesis = (
+            ChiSquareTest()
+            .set_observed_numbers(randomgen.generate(amount=10000))
+            .set_expected_probabilities(probabilities)
+            .calc()
+        )
+
+        assert hypothesis.is_null() is True
+
+
+@pytest.mark.parametrize("randomgen", versions, indirect=True)
+class TestRandomGenSeeded(object):
+    """ Test the seeded streams with random access."""
+
+    def test_slices(self, randomgen):
+        """ Test that the slices of a stream are reproducible."""
+
+        randomgen.set_numbers([-1, 0, 1, 2, 3])
+        randomgen.set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        randomgen.validate()
+
+        numbers = randomgen.generate_seeded(amount=1000, seed=5)
+
+        assert randomgen.generate_seeded(amount=1000, seed=5) == numbers
+        assert randomgen.generate_seeded(
+            amount=100, seed=5, offset=450) == numbers[450:550]
+
+
+@pytest.mark.parametrize("randomgen", versions, indirect=True)
+class TestRandomGenRng(object):
+    """ Test the random number generator of the instance."""
+
+    @pytest.mark.parametrize("rng_type", [
+        random.Random,
+        numpy.random.default_rng,
+    ])
+    def test_reproducible(self, randomgen, rng_type):
+        """ Test that equally seeded generators give the same numbers."""
+
+        randomgen.set_numbers([-1, 0, 1, 2, 3])
+        randomgen.set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        randomgen.validate()
+
+        results = []
+        for _ in range(2):
+            randomgen.set_rng(rng_type(3))
+            results.append(
+                [randomgen.next_num() for _ in range(100)]
+                + randomgen.generate(amount=100)
+            )
+
+        assert results[0] == results[1]
+        assert set(results[0]) <= {-1, 0, 1, 2, 3}
+
+    def test_invalid(self, randomgen):
+        """ Test that unsupported generators are rejected."""
+
+        with pytest.raises(RandomGenOptionError):
+            randomgen.set_rng(random)
+
+    @pytest.mark.parametrize("rng_type", [
+        random.Random,
+        numpy.random.default_rng,
+    ])
+    def test_spawn(self, randomgen, rng_type):
+        """ Test that the spawned copies have independent generators."""
+
+        randomgen.set_numbers(list(range(100)))
+        randomgen.set_probabilities([0.01] * 100)
+        randomgen.validate()
+        randomgen.set_rng(rng_type(5))
+
+        children = randomgen.spawn(2)
+
+        assert children[0]._rng is not children[1]._rng
+        assert children[0]._numbers is randomgen._numbers
+        assert children[0].generate(50) != children[1].generate(50)
+
+
+@pytest.mark.parametrize("randomgen", versions, indirect=True)
+class TestRandomGenParallel(object):
+    """ Test the generation in a pool of processes."""
+
+    def test_array(self, randomgen):
+        """ Test that the workers fill a single array."""
+
+        randomgen.set_numbers([-1, 0, 1, 2, 3])
+        randomgen.set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+        randomgen.validate()
+
+        random_numbers = randomgen.generate_parallel(amount=10001, workers=2)
+
+        assert isinstance(random_numbers, numpy.ndarray)
+        assert random_numbers.size == 10001
+        assert set(random_numbers.tolist()) <= {-1, 0, 1, 2, 3}
+
+        # The workers must use independent random number generators
+        assert random_numbers[:5000].tolist() != \
+            random_numbers[5000:10000].tolist()
+
+    def test_mixed_numbers(self, randomgen):
+        """ Test that mixed numbers keep their types."""
+
+        randomgen.set_numbers([1, 2.5])
+        randomgen.set_probabilities([0.5, 0.5])
+        randomgen.validate()
+
+        random_numbers = randomgen.generate_parallel(amount=100, workers=2)
+
+        assert set(random_numbers.tolist()) <= {1, 2.5}
+
+    def test_histogram(self, randomgen):
+        """ Test that the counts of the workers are merged."""
+
+        randomgen.set_numbers([1, 2, 3])
+        randomgen.set_probabilities([0.2, 0.2, 0.6])
+        randomgen.validate()
+
+        histogram = randomgen.generate_parallel(
+            amount=10000, workers=2, histogram=True)
+
+        assert sum(histogram.counts.values()) == 10000
+        assert set(histogram) <= {1, 2, 3}
+        assert sum(histogram.values()) == pytest.approx(1)
+
+
+class TestRandomGenSearch(object):
+    """ Test the search modes of RandomGenV1."""
+
+    def test_same_results(self):
+        """ Test that both search modes give the same numbers."""
+
+        results = []
+        for mode in (SEARCH_BISECT, SEARCH_LINEAR):
+            randomgen = (
+                RandomGenV1()
+                .set_numbers([-1, 0, 1, 2, 3])
+                .set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+                .set_search(mode)
+                .validate()
+            )
+
+            randomgen.set_rng(random.Random(1))
+            results.append([randomgen.next_num() for _ in range(1000)])
+
+        assert results[0] == results[1]
+
+    def test_linear_generate(self):
+        """ Test the batch generation in the linear search mode."""
+
+        randomgen = (
+            RandomGenV1()
+            .set_numbers([1, 2])
+            .set_probabilities([0.5, 0.5])
+            .set_search(SEARCH_LINEAR)
+            .validate()
+        )
+
+        assert set(randomgen.generate(amount=100)) <= {1, 2}
+
+    def test_invalid_mode(self):
+        """ Test that unknown search modes are rejected."""
+
+        with pytest.raises(RandomGenOptionError):
+            RandomGenV1().set_search('unknown')
+
+    def test_cdf_large(self):
+        """ Test the cumulative probabilities of many numbers."""
+
+        size = 100000
+
+        randomgen = (
+            RandomGenV1()
+            .set_numbers(list(range(size)))
+            .set_probabilities([1 / size] * size)
+        )
+
+        # Start measuring the time
+        timestamp_1 = time.time_ns()
+
+        randomgen.validate()
+
+        # Stop measuring the time
+        timestamp_2 = time.time_ns()
+
+        assert randomgen._cumulative_array[-1] == pytest.approx(1)
+        assert timestamp_2 - timestamp_1 < 1e9
+
+
+class TestRandomGenAlias(object):
+    """ Test the alias table of RandomGenV3."""
+
+    def test_alias_table(self):
+        """ Test that the alias table preserves the probabilities."""
+
+        probabilities = [0.01, 0.3, 0.58, 0.1, 0.01]
+
+        randomgen = (
+            RandomGenV3()
+            .set_numbers([-1, 0, 1, 2, 3])
+            .set_probabilities(probabilities)
+            .validate()
+        )
+
+        # Collect the probability mass of each column and its alias
+        size = len(probabilities)
+        masses = [0.0] * size
+        for column in range(size):
+            keep = randomgen._alias_probabilities[column]
+            masses[column] += keep / size
+            masses[randomgen._alias_indices[column]] += (1 - keep) / size
+
+        assert masses == pytest.approx(probabilities)
+
+    def test_single_number(self):
+        """ Test that a single number is always generated."""
+
+        randomgen = (
+            RandomGenV3()
+            .set_numbers([7])
+            .set_probabilities([1.0])
+            .validate()
+        )
+
+        assert randomgen.generate(amount=100) == [7] * 100
+
+    def test_zero_probability(self):
+        """ Test that numbers with zero probability are never generated."""
+
+        randomgen = (
+            RandomGenV3()
+            .set_numbers([1, 2, 3])
+            .set_probabilities([0.5, 0.0, 0.5])
+            .validate()
+        )
+
+        assert 2 not in randomgen.generate(amount=1000)
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_alias_table_random(self, seed):
+        """ Test the alias table of random skewed distributions."""
+
+        rng = numpy.random.default_rng(seed)
+        probabilities = rng.random(1000) ** 10
+        probabilities[rng.integers(1000, size=5)] *= 1000
+        probabilities /= probabilities.sum()
+
+        randomgen = (
+            RandomGenV3()
+            .set_numbers(numpy.arange(1000))
+            .set_probabilities(probabilities)
+            .validate()
+        )
+
+        keep = randomgen._alias_probabilities
+        masses = keep / 1000
+        numpy.add.at(masses, randomgen._alias_indices, (1 - keep) / 1000)
+
+        assert masses == pytest.approx(probabilities, abs=1e-12)
+        assert keep.min() >= 0 and keep.max() <= 1 + 1e-12
+
+
+@pytest.mark.parametrize("randomgen", versions, indirect=True)
+class TestRandomGenArrays(object):
+    """ Test the numbers and probabilities given as NumPy arrays."""
+
+    def test_generate(self, randomgen):
+        """ Test that the arrays are used without a copy."""
+
+        numbers = numpy.array([-1, 0, 1, 2, 3])
+        randomgen.set_numbers(numbers)
+        randomgen.set_probabilities(numpy.array([0.01, 0.3, 0.58, 0.1, 0.01]))
+        randomgen.validate()
+
+        assert set(randomgen.generate(amount=1000)) <= {-1, 0, 1, 2, 3}
+        assert randomgen.next_num() in {-1, 0, 1, 2, 3}
+
+        if not isinstance(randomgen, RandomGenV4):
+            assert randomgen._numbers_array is numbers
+
+    @pytest.mark.parametrize('numbers, error', [
+        (numpy.array([]), RandomGenEmptyError),
+        (numpy.array(['1', '2']), RandomGenTypeError),
+        (numpy.array([[1, 2]]), RandomGenTypeError),
+    ])
+    def test_invalid_numbers(self, randomgen, numbers, error):
+        """ Test the validation of the arrays of numbers."""
+
+        with pytest.raises(error):
+            randomgen.set_numbers(numbers)
+            randomgen.validate_numbers()
+
+    @pytest.mark.parametrize('probabilities, error', [
+        (numpy.array([]), RandomGenEmptyError),
+        (numpy.array([True, False]), RandomGenTypeError),
+        (numpy.array([1.5, -0.5]), RandomGenTypeError),
+        (numpy.array([0.5, 0.4]), RandomGenProbabilitySumError),
+    ])
+    def test_invalid_probabilities(self, randomgen, probabilities, error):
+        """ Test the validation of the arrays of probabilities."""
+
+        with pytest.raises(error):
+            randomgen.set_probabilities(probabilities)
+            randomgen.validate_probabilities()
+
+    def test_memmap(self, randomgen, tmp_path):
+        """ Test that memory-mapped tables are mapped again when pickled."""
+
+        path = str(tmp_path / 'numbers.npy')
+        numpy.save(path, numpy.arange(1000))
+        numbers = numpy.load(path, mmap_mode='r')
+
+        randomgen.set_numbers(numbers)
+        randomgen.set_probabilities(numpy.full(1000, 0.001))
+        randomgen.validate()
+
+        clone = pickle.loads(pickle.dumps(randomgen))
+
+        assert set(clone.generate(amount=100)) <= set(range(1000))
+
+        if not isinstance(randomgen, RandomGenV4):
+            assert isinstance(clone._numbers_array, numpy.memmap)
+
+        # The data is sent instead if the file has been removed
+        os.remove(path)
+        clone = pickle.loads(pickle.dumps(randomgen))
+
+        assert set(clone.generate(amount=100)) <= set(range(1000))
+
+
+class TestRandomGenLoadedDice(object):
+    """ Test the Fast Loaded Dice Roller of RandomGenV5."""
+
+    def test_weights(self):
+        """ Test the distribution of integer weights."""
+
+        randomgen = (
+            RandomGenV5()
+            .set_numbers([1, 2, 3, 4])
+            .set_weights([1, 2, 3, 7])
+            .set_rng(numpy.random.default_rng(3))
+            .validate()
+        )
+
+        numbers = randomgen.generate(amount=100000)
+
+        hypothesis = (
+            ChiSquareTest()
+            .set_observed_numbers(numbers)
+            .set_expected_probabilities([1 / 13, 2 / 13, 3 / 13, 7 / 13])
+            .calc()
+        )
+        assert hypothesis.is_null()
+
+        # The weights do not need to sum to anything
+        assert randomgen.to_dict() == pytest.approx(
+            {1: 1 / 13, 2: 2 / 13, 3: 3 / 13, 4: 7 / 13})
+
+    def test_levels(self):
+        """ Test the levels of the walk."""
+
+        randomgen = RandomGenV5().set_numbers([1, 2, 3]).set_weights([2, 4, 2])
+        randomgen.validate()
+
+        # The weights are divided by 2 and padded with a rejection of 0
+        assert randomgen._depth == 2
+        assert randomgen._level_offsets.tolist() == [0, 1, 3]
+        assert randomgen._level_indices.tolist() == [1, 0, 2]
+
+        # A single number needs no bits
+        randomgen.set_weights([0, 5, 0]).validate()
+        assert randomgen.generate(amount=5) == [2] * 5
+        assert randomgen.bit_source().consumed == 0
+
+    def test_entropy(self):
+        """ Test that the walk uses less than H + 6 bits per number."""
+
+        randomgen = (
+            RandomGenV5()
+            .set_numbers([-1, 0, 1, 2, 3])
+            .set_probabilities([0.01, 0.3, 0.58, 0.1, 0.01])
+            .validate()
+        )
+
+        randomgen.generate(amount=100000)
+        bits = randomgen.bit_source().consumed / 100000
+
+        assert randomgen.entropy() <= bits < randomgen.entropy() + 6
+
+    def test_bit_source(self):
+        """ Test that the bits of the generator are used in order."""
+
+        bits = BitSource(random.Random(5))
+        values = numpy.concatenate([bits.bits(3), bits.bits(5000)])
+
+        expected = BitSource(random.Random(5)).bits(5003)
+        assert values.tolist() == expected.tolist()
+        assert bits.consumed == 5003
+
+    def test_invalid(self):
+        """ Test the validation of the weights."""
+
+        randomgen = RandomGenV5().set_numbers([1, 2])
+
+        for weights in (5, [1, 0.5], numpy.array([1.0, 2.0])):
+            with pytest.raises(RandomGenTypeError):
+                randomgen.set_weights(weights).validate()
+
+        for weights in ([1, -1], numpy.array([1, -1])):
+            with pytest.raises(RandomGenTypeError):
+                randomgen.set_weights(weights).validate()
+
+        for weights in ([], numpy.array([], dtype=int)):
+            with pytest.raises(RandomGenEmptyError):
+                randomgen.set_weights(weights).validate()
+
+        with pytest.raises(RandomGenProbabilitySumError):
+            randomgen.set_weights([0, 0]).validate()
+
+        with pytest.raises(RandomGenMismatchError):
+            randomgen.set_weights([1, 2, 3]).validate()
+
+
+class TestRandomGenDynamic(object):
+    """ Test the dynamic weights of RandomGenV4."""
+
+    @staticmethod
+    def create():
+        return (
+            RandomGenV4()
+            .set_numbers([1, 2, 3])
+            .set_probabilities([0.2, 0.2, 0.6])
+            .validate()
+        )
+
+    def test_update_weight(self):
+        """ Test that an updated weight changes the probabilities."""
+
+        randomgen = self.create().update_weight(3, 0.1)
+
+        assert randomgen.total() == pytest.approx(0.5)
+        assert randomgen.to_dict() == pytest.approx({1: 0.4, 2: 0.4, 3: 0.2})
+
+    def test_insert(self):
+        """ Test that inserted numbers are generated."""
+
+        randomgen = self.create()
+
+        # Insert more numbers than the initial slots
+        for number in range(4, 20):
+            randomgen.insert(number, 0.1)
+
+        randomgen.insert(2.5, 0.1)
+        randomgen.set_rng(numpy.random.default_rng(seed=1))
+
+        assert randomgen.total() == pytest.approx(2.7)
+        assert set(randomgen.generate(amount=10000)) == \
+            {1, 2, 2.5, 3} | set(range(4, 20))
+
+    def test_remove(self):
+        """ Test that removed numbers are never generated."""
+
+        randomgen = self.create().remove(2)
+
+        assert 2 not in randomgen.to_dict()
+        assert 2 not in randomgen.generate(amount=1000)
+        assert 2 not in [randomgen.next_num() for _ in range(1000)]
+
+        with pytest.raises(RandomGenNotFoundError):
+            randomgen.update_weight(2, 0.5)
+
+    def test_remove_last(self):
+        """ Test that rounding errors never select a removed last slot."""
+
+        randomgen = self.create().remove(3)
+
+        # A value at the total goes past all the slots
+        assert randomgen.select_indices(numpy.array([1.0])).tolist() == [1]
+        assert randomgen.weight(2) == pytest.approx(0.2)
+        assert randomgen.weight(3) == 0
+
+        randomgen._rng = random.Random()
+        randomgen._rng.random = lambda: 1.0
+        assert randomgen.next_num() == 2
+
+    def test_invalid_weight(self):
+        """ Test that negative weights are rejected."""
+
+        with pytest.raises(RandomGenTypeError):
+            self.create().update_weight(1, -0.1)
+
+        with pytest.raises(RandomGenTypeError):
+            self.create().insert("4", 0.1)
+
+    def test_fit(self):
+        """ Test that the numbers fit the updated weights."""
+
+        randomgen = self.create().update_weight(1, 0.6).update_weight(3, 0.2)
+        randomgen.set_rng(numpy.random.default_rng(seed=1))
+
+        hypothesis = (
+            ChiSquareTest()
+            .set_observed_numbers(randomgen.generate(amount=10000))
+            .set_expected_probabilities([0.6, 0.2, 0.2])
+            .calc()
+        )
+
+        assert hypothesis.is_null() is True
+
+    def test_copy(self):
+        """ Test that a copy is updated independently."""
+
+        randomgen = self.create()
+        clone = randomgen.copy().update_weight(1, 0.0)
+
+        assert randomgen.to_dict() == pytest.approx({1: 0.2, 2: 0.2, 3: 0.6})
+        assert clone.to_dict() == pytest.approx({1: 0.0, 2: 0.25, 3: 0.75})
+
+
+class TestRandomGenParametric(object):
+    """ Test the generators of the Poisson and binomial distributions."""
+
+    poisson = [0.5, 4, 30, 1e4]
+    binomial = [(10, 0.3), (40, 0.9), (1000, 0.3), (10 ** 6, 0.7)]
+
+    @staticmethod
+    def fit(randomgen, numbers):
+        """ Return the p-value of the chi-square test of the numbers."""
+
+        values, counts = numpy.unique(numbers, return_counts=True)
+        expected = randomgen.pmf(values) * len(numbers)
+
+        # Merge the sparse tails into the neighbouring categories
+        keep = expected >= 5
+        counts, expected = counts[keep], expected[keep]
+        counts[0] += len(numbers) - counts.sum()
+        expected[0] += len(numbers) - expected.sum()
+
+        hypothesis = (
+            ChiSquareTest()
+            .set_observed_counts(dict(enumerate(counts.tolist())))
+            .set_expected_probabilities((expected / len(numbers)).tolist())
+            .calc()
+        )
+        return hypothesis.p_value
+
+    @pytest.mark.parametrize("rate", poisson)
+    def test_poisson(self, rate):
+        """ Test the Poisson distribution by inversion and rejection."""
+
+        randomgen = RandomGenPoisson().set_rate(rate).validate()
+        randomgen.set_rng(numpy.random.default_rng(1))
+
+        assert randomgen._rejection == (rate >= 10)
+
+        numbers = randomgen.generate(amount=100000, as_array=True)
+        assert self.fit(randomgen, numbers) > 0.001
+
+        numbers = randomgen.generate_seeded(
+            amount=100000, seed=1, as_array=True)
+        assert self.fit(randomgen, numbers) > 0.001
+
+    @pytest.mark.parametrize("trials, probability", binomial)
+    def test_binomial(self, trials, probability):
+        """ Test the binomial distribution by inversion and rejection."""
+
+        randomgen = (
+            RandomGenBinomial()
+            .set_trials(trials)
+            .set_success_probability(probability)
+            .validate()
+        )
+        randomgen.set_rng(numpy.random.default_rng(2))
+
+        numbers = randomgen.generate(amount=100000, as_array=True)
+        assert numbers.min() >= 0
+        assert numbers.max() <= trials
+        assert self.fit(randomgen, numbers) > 0.001
+
+        numbers = randomgen.generate_seeded(
+            amount=100000, seed=2, as_array=True)
+        assert self.fit(randomgen, numbers) > 0.001
+
+    def test_degenerate(self):
+        """ Test the distributions with a single number."""
+
+        randomgen = RandomGenPoisson().set_rate(0).validate()
+        assert randomgen.generate(amount=10) == [0] * 10
+
+        randomgen = RandomGenBinomial().set_trials(5)
+        assert randomgen.set_success_probability(0).validate().generate(
+            amount=10) == [0] * 10
+        assert randomgen.set_success_probability(1).validate().generate(
+            amount=10) == [5] * 10
+
+    @pytest.mark.parametrize("rate", [4, 30])
+    def test_seeded_slices(self, rate):
+        """ Test that the slices of a seeded stream are reproducible."""
+
+        randomgen = RandomGenPoisson().set_rate(rate).validate()
+        numbers = randomgen.generate_seeded(amount=1000, seed=5)
+
+        assert randomgen.generate_seeded(amount=1000, seed=5) == numbers
+        assert randomgen.generate_seeded(
+            amount=100, seed=5, offset=450) == numbers[450:550]
+
+    def test_pmf(self):
+        """ Test the probability mass functions."""
+
+        randomgen = RandomGenPoisson().set_rate(2).validate()
+        assert randomgen.pmf([0, 1, 2, -1, 1.5]).tolist() == pytest.approx(
+            [numpy.exp(-2), 2 * numpy.exp(-2), 2 * numpy.exp(-2), 0, 0])
+
+        randomgen = (
+            RandomGenBinomial()
+            .set_trials(3)
+            .set_success_probability(0.5)
+            .validate()
+        )
+        assert randomgen.pmf([0, 1, 2, 3, 4]).tolist() == pytest.approx(
+            [0.125, 0.375, 0.375, 0.125, 0])
+
+        # Large parameters keep the precision of the probabilities
+        randomgen = RandomGenPoisson().set_rate(1e15).validate()
+        assert randomgen.pmf([1e15]) == pytest.approx(
+            1 / numpy.sqrt(2 * numpy.pi * 1e15), rel=1e-6)
+
+        randomgen = (
+            RandomGenBinomial()
+            .set_trials(10 ** 15)
+            .set_success_probability(0.5)
+            .validate()
+        )
+        assert randomgen.pmf([5 * 10 ** 14]) == pytest.approx(
+            1 / numpy.sqrt(2 * numpy.pi * 2.5e14), rel=1e-6)
+
+    @pytest.mark.parametrize("randomgen", [
+        RandomGenPoisson().set_rate(0.5),
+        RandomGenPoisson().set_rate(1e15),
+        RandomGenBinomial().set_trials(10).set_success_probability(0.3),
+        RandomGenBinomial().set_trials(0).set_success_probability(0.3),
+    ])
+    def test_bins(self, randomgen):
+        """ Test the bins of the Chi-Square test."""
+
+        randomgen.validate()
+        numbers, probabilities = randomgen.bins(1000)
+
+        assert numbers[0] == 0
+        assert numpy.all(numpy.diff(numbers) > 0)
+        assert probabilities.sum() == pytest.approx(1)
+        assert probabilities.min() * 1000 >= 5
+
+    def test_parallel(self):
+        """ Test the generation in a pool of processes."""
+
+        randomgen = RandomGenPoisson().set_rate(50).validate()
+
+        numbers = randomgen.generate_parallel(amount=1000, workers=2)
+        assert numbers.size == 1000
+
+        histogram = randomgen.generate_parallel(
+            amount=1000, workers=2, histogram=True)
+        assert sum(histogram.counts.values()) == 1000
+
+    def test_invalid(self):
+        """ Test the validation of the parameters."""
+
+        for rate in (None, '1', True):
+            with pytest.raises(RandomGenTypeError):
+                RandomGenPoisson().set_rate(rate).validate()
+
+        for rate in (-1, float('nan'), float('inf')):
+            with pytest.raises(RandomGenOptionError):
+                RandomGenPoisson().set_rate(rate).validate()
+
+        for trials, probability in ((1.5, 0.5), (True, 0.5), (10, None)):
+            with pytest.raises(RandomGenTypeError):
+                RandomGenBinomial().set_trials(trials).set_success_probability(
+                    probability).validate()
+
+        for trials, probability in ((-1, 0.5), (10, -0.1), (10, 1.1)):
+            with pytest.raises(RandomGenOptionError):
+                RandomGenBinomial().set_trials(trials).set_success_probability(
+                    probability).validate()
+
+
 @pytest.mark.parametrize("randomgen", versions, indirect=True)
 class TestRandomGenPerformance(object):
     """ Test that the distribution fits on high sample size."""
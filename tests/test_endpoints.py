@@ -1,16 +1,29 @@
 # encoding: utf-8
+import gc
+import json
+import numpy
 import pytest
+import threading
 
 from randomgen.core import (
     RandomGenV1,
-    RandomGenV2
+    RandomGenV2,
+    RandomGenV3,
+    RandomGenV4,
+    RandomGenV5
 )
 
 from randomgen.endpoints import (
     RandomGenRestApi,
     DEFAULT_NUMBERS,
     DEFAULT_PROBABILITIES,
-    MAX_NUMBERS
+    MAX_NUMBERS,
+    MAX_SAMPLERS,
+    MAX_DISTRIBUTIONS,
+    QUALITY_NONE,
+    QUALITY_HISTOGRAM,
+    QUALITY_FULL,
+    STREAM_CHUNK_SIZE
 )
 
 from randomgen.errors import (
@@ -21,6 +34,8 @@ from randomgen.errors import (
     RandomGenMismatchError,
     RandomGenProbabilitySumError,
     RandomGenProbabilityNegativeError,
+    RandomGenOptionError,
+    RandomGenNotFoundError,
 )
 
 
@@ -69,6 +84,32 @@ class TestRandomGenRestApi(object):
             for num in (10001,):
                 self.api.randomgen_endpoint(RandomGenV2, num)
 
+    def test_endpoint_v3_randomgen_pos(self):
+        """Test the randomgen v3 endpoint with positive scenarios. """
+
+        for num in (1, 1000, 10000):
+            self.api.randomgen_endpoint(RandomGenV3, num)
+
+    def test_endpoint_api_v3_randomgen_neg(self):
+        """Test the randomgen v3 endpoint with negative scenarios."""
+
+        # Test the RandomGenMinError exception
+        with pytest.raises(RandomGenMinError):
+            for num in (-1, 0):
+                self.api.randomgen_endpoint(RandomGenV3, num)
+
+        # Test the RandomGenMaxError exception
+        with pytest.raises(RandomGenMaxError):
+            for num in (10001,):
+                self.api.randomgen_endpoint(RandomGenV3, num)
+
+    def test_endpoint_v5_randomgen_pos(self):
+        """Test the randomgen v5 endpoint with positive scenarios. """
+
+        for num in (1, 1000, 10000):
+            response = self.api.randomgen_endpoint(RandomGenV5, num)
+            assert set(response['numbers']) <= set(DEFAULT_NUMBERS)
+
     def test_endpoint_api_config_pos(self):
         """Test the configuration endpoin in positive scenarios."""
 
@@ -110,6 +151,520 @@ class TestRandomGenRestApi(object):
         with pytest.raises(RandomGenTypeError):
             self.api.config_endpoint(numbers=1, probabilities=[0.2, 0.2, 0.6])
 
+    def test_endpoint_quality(self):
+        """Test the levels of the quality report."""
+
+        api = RandomGenRestApi()
+
+        response = api.randomgen_endpoint(RandomGenV1, 100, QUALITY_NONE)
+        assert len(response['numbers']) == 100
+        assert 'quality' not in response
+
+        response = api.randomgen_endpoint(RandomGenV1, 100, QUALITY_HISTOGRAM)
+        assert sum(response['quality']['observed_histogram'].values()) == \
+            pytest.approx(1)
+        assert 'chi_square_test' not in response['quality']
+
+        response = api.randomgen_endpoint(RandomGenV1, 100, QUALITY_FULL)
+        assert set(response['quality']['chi_square_test']) == {
+            'is_null', 'chi_square', 'p_value', 'df'}
+
+        with pytest.raises(RandomGenOptionError):
+            api.randomgen_endpoint(RandomGenV1, 100, 'unknown')
+
+    def test_endpoint_stream(self):
+        """Test the streaming of random numbers as NDJSON records."""
+
+        api = RandomGenRestApi()
+        quantity = STREAM_CHUNK_SIZE * 2 + 1
+
+        records = [
+            json.loads(line)
+            for line in api.randomgen_stream_endpoint(RandomGenV3, quantity)
+        ]
+
+        # The numbers are sent in chunks followed by the quality summary
+        chunks = [record['numbers'] for record in records[:-1]]
+        assert [len(chunk) for chunk in chunks] == [
+            STREAM_CHUNK_SIZE, STREAM_CHUNK_SIZE, 1]
+        assert records[-1]['quality']['chi_square_test']['df'] >= 0
+
+        # Without the quality report only the numbers are sent
+        records = list(
+            api.randomgen_stream_endpoint(RandomGenV1, 10, QUALITY_NONE))
+        assert len(records) == 1
+
+    def test_endpoint_stream_neg(self):
+        """Test that invalid streams fail before the first record."""
+
+        api = RandomGenRestApi()
+
+        with pytest.raises(RandomGenMinError):
+            api.randomgen_stream_endpoint(RandomGenV1, 0)
+
+        with pytest.raises(RandomGenOptionError):
+            api.randomgen_stream_endpoint(RandomGenV1, 10, 'unknown')
+
+    def test_endpoint_binary(self):
+        """Test the packed random numbers."""
+
+        api = RandomGenRestApi()
+
+        buffer, dtype, report = api.randomgen_binary_endpoint(RandomGenV1, 100)
+        numbers = numpy.frombuffer(buffer, dtype=dtype)
+
+        assert dtype == 'int32'
+        assert numbers.size == 100
+        assert set(numbers.tolist()) <= set(DEFAULT_NUMBERS)
+        assert sum(report['observed_histogram'].values()) == pytest.approx(1)
+
+        # Floats are packed as float64
+        api.config_endpoint(numbers=[0.5, 1.5], probabilities=[0.5, 0.5])
+        buffer, dtype, report = api.randomgen_binary_endpoint(
+            RandomGenV2, 100, QUALITY_NONE)
+
+        assert dtype == 'float64'
+        assert numpy.frombuffer(buffer, dtype=dtype).size == 100
+        assert report is None
+
+    def test_endpoint_seeded(self):
+        """Test that the seeded responses are reproducible in all formats."""
+
+        api = RandomGenRestApi()
+
+        numbers = api.randomgen_endpoint(
+            RandomGenV3, 100, QUALITY_NONE, seed=9)['numbers']
+
+        # A slice of the stream can be requested with the offset
+        response = api.randomgen_endpoint(
+            RandomGenV3, 50, QUALITY_NONE, seed=9, offset=50)
+        assert response['numbers'] == numbers[50:]
+
+        # The binary format gives the same numbers
+        buffer, dtype, _ = api.randomgen_binary_endpoint(
+            RandomGenV3, 100, QUALITY_NONE, seed=9)
+        assert numpy.frombuffer(buffer, dtype=dtype).tolist() == numbers
+
+        # The NDJSON stream gives the same numbers
+        records = api.randomgen_stream_endpoint(
+            RandomGenV3, 100, QUALITY_NONE, seed=9)
+        assert json.loads(next(records))['numbers'] == numbers
+
+    def test_parametric(self):
+        """ Test the endpoints of the parametric distributions."""
+
+        api = RandomGenRestApi()
+
+        response = api.poisson_endpoint(4, 1000)
+        assert response['parameters'] == {'rate': 4}
+        assert len(response['numbers']) == 1000
+        assert 'chi_square_test' in response['quality']
+
+        response = api.binomial_endpoint(10, 0.3, 1000, QUALITY_HISTOGRAM)
+        assert set(response['numbers']) <= set(range(11))
+        assert sum(response['quality']['expected_histogram'].values()) == \
+            pytest.approx(1)
+        assert sum(response['quality']['observed_histogram'].values()) == \
+            pytest.approx(1)
+
+        # The seeded streams are reproducible
+        numbers = api.poisson_endpoint(
+            40, 100, QUALITY_NONE, seed=3)['numbers']
+        assert api.poisson_endpoint(
+            40, 50, QUALITY_NONE, seed=3, offset=50)['numbers'] == numbers[50:]
+
+        # A degenerate distribution has a single bin and no test
+        for response in (api.poisson_endpoint(0, 100),
+                         api.binomial_endpoint(0, 0.5, 100)):
+            assert response['numbers'] == [0] * 100
+            assert response['quality']['expected_histogram'] == {0: 1.0}
+            assert response['quality']['chi_square_test'] is None
+
+        with pytest.raises(RandomGenOptionError):
+            api.poisson_endpoint(-1, 10)
+
+        with pytest.raises(RandomGenOptionError):
+            api.binomial_endpoint(10, 1.5, 10)
+
+        with pytest.raises(RandomGenMaxError):
+            api.binomial_endpoint(10, 0.5, MAX_NUMBERS + 1)
+
+    @pytest.mark.parametrize('endpoint, parameters', [
+        ('poisson_endpoint', (0.5,)),
+        ('poisson_endpoint', (1e6,)),
+        ('binomial_endpoint', (10, 0.3)),
+        ('binomial_endpoint', (10 ** 8, 0.999)),
+    ])
+    def test_parametric_rejection_rate(self, endpoint, parameters):
+        """ Test that the quality report rejects about alpha of the tests."""
+
+        api = RandomGenRestApi()
+        runs = 200
+
+        rejected = sum(
+            1 - getattr(api, endpoint)(*parameters, 1000, seed=seed)[
+                'quality']['chi_square_test']['is_null']
+            for seed in range(runs)
+        )
+
+        assert 0.01 <= rejected / runs <= 0.1
+
+    def test_prepared_randomgen_reuse(self):
+        """Test that the prepared generator is reused until a change."""
+
+        api = RandomGenRestApi()
+
+        rg1 = api.prepare_randomgen(RandomGenV1)
+        rg2 = api.prepare_randomgen(RandomGenV1)
+        assert rg1 is rg2
+
+        # A new configuration must rebuild the generator
+        api.config_endpoint(numbers=[1, 2, 3], probabilities=[0.2, 0.2, 0.6])
+        rg3 = api.prepare_randomgen(RandomGenV1)
+        assert rg3 is not rg1
+        assert rg3.to_dict() == {1: 0.2, 2: 0.2, 3: 0.6}
+
+        # The reset must rebuild the generator as well
+        api.reset_endpoint()
+        rg4 = api.prepare_randomgen(RandomGenV1)
+        assert rg4 is not rg3
+        assert rg4.to_dict() == dict(zip(DEFAULT_NUMBERS,
+                                         DEFAULT_PROBABILITIES))
+
+    def test_prepared_randomgen_eviction(self):
+        """Test that the number of prepared generators is bounded."""
+
+        api = RandomGenRestApi()
+
+        for _ in range(MAX_SAMPLERS + 2):
+            api.config_endpoint(numbers=[1, 2],
+                                probabilities=[0.5, 0.5])
+            api.prepare_randomgen(RandomGenV1)
+            api.prepare_randomgen(RandomGenV2)
+
+        assert len(api.samplers) == MAX_SAMPLERS
+
+    def test_thread_randomgen(self):
+        """Test that every thread gets its own random number generator."""
+
+        api = RandomGenRestApi()
+        randomgens = [None] * 4
+
+        def worker(index):
+            randomgens[index] = api.thread_randomgen(RandomGenV1)
+            randomgens[index + 1] = api.thread_randomgen(RandomGenV1)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in (0, 2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each thread reuses its copy, but the threads do not share one
+        assert randomgens[0] is randomgens[1]
+        assert randomgens[2] is randomgens[3]
+        assert randomgens[0] is not randomgens[2]
+        assert randomgens[0]._rng is not randomgens[2]._rng
+
+        # A change of the configuration replaces the copy of the thread
+        rg = api.thread_randomgen(RandomGenV1)
+        api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+        assert api.thread_randomgen(RandomGenV1) is not rg
+
+    def test_thread_randomgen_release(self):
+        """Test that the threads drop the copies of unused generators."""
+
+        api = RandomGenRestApi()
+
+        # Evicted generators
+        for _ in range(MAX_SAMPLERS + 2):
+            api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+            api.thread_randomgen(RandomGenV1)
+        gc.collect()
+        assert len(api._local.randomgens) == MAX_SAMPLERS
+
+        # Deleted distributions
+        api.create_distribution_endpoint('coin', [0, 1], [0.5, 0.5])
+        api.randomgen_endpoint(RandomGenV1, 10, name='coin')
+        assert len(api._local.randomgens) == MAX_SAMPLERS + 1
+
+        api.delete_distribution_endpoint('coin')
+        gc.collect()
+        assert len(api._local.randomgens) == MAX_SAMPLERS
+
+    def test_config_snapshot(self):
+        """Test that the configuration is an immutable, versioned snapshot."""
+
+        api = RandomGenRestApi()
+        snapshot = api.config
+
+        with pytest.raises(TypeError):
+            api.config['NUMBERS'] = [1, 2]
+
+        api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+
+        # The old snapshot is not changed by the update
+        assert snapshot['NUMBERS'] == DEFAULT_NUMBERS
+        assert api.config['NUMBERS'] == [1, 2]
+        assert api.config['VERSION'] == snapshot['VERSION'] + 1
+
+    def test_config_snapshot_threads(self):
+        """Test that readers never see a mismatched configuration."""
+
+        api = RandomGenRestApi()
+        configs = [
+            ([1, 2], [0.5, 0.5]),
+            ([1, 2, 3, 4], [0.25, 0.25, 0.25, 0.25]),
+        ]
+        errors = []
+        done = threading.Event()
+
+        def writer():
+            for index in range(200):
+                api.config_endpoint(*configs[index % 2])
+            done.set()
+
+        def reader():
+            while not done.is_set():
+                config = api.config
+                if len(config['NUMBERS']) != len(config['PROBABILITIES']):
+                    errors.append(config)
+
+                response = api.randomgen_endpoint(RandomGenV1, 10)
+                expected = response['quality']['expected_histogram']
+                if not set(response['numbers']) <= set(expected):
+                    errors.append(response)
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+    def test_distributions(self):
+        """Test the named distributions."""
+
+        api = RandomGenRestApi()
+
+        api.create_distribution_endpoint('coin', [0, 1], [0.5, 0.5])
+        api.create_distribution_endpoint('dice', [1, 2, 3], [0.2, 0.3, 0.5])
+
+        assert list(api.list_distributions_endpoint()['distributions']) == \
+            ['coin', 'dice']
+        assert api.distribution_endpoint('dice')['numbers'] == [1, 2, 3]
+
+        # Each distribution has its own generator
+        coin = api.randomgen_endpoint(RandomGenV3, 100, name='coin')
+        dice = api.randomgen_endpoint(RandomGenV3, 100, name='dice')
+        default = api.randomgen_endpoint(RandomGenV3, 100)
+
+        assert set(coin['numbers']) <= {0, 1}
+        assert set(dice['numbers']) <= {1, 2, 3}
+        assert set(default['numbers']) <= set(DEFAULT_NUMBERS)
+        assert coin['quality']['expected_histogram'] == {0: 0.5, 1: 0.5}
+        assert len(api.distribution_samplers) == 2
+
+        # Replacing a distribution prepares a new generator
+        api.create_distribution_endpoint('coin', [2, 3], [0.5, 0.5])
+        coin = api.randomgen_endpoint(RandomGenV3, 100, name='coin')
+        assert set(coin['numbers']) <= {2, 3}
+
+        # The default configuration does not change the distributions
+        api.config_endpoint(numbers=[7], probabilities=[1])
+        dice = api.randomgen_endpoint(RandomGenV3, 100, name='dice')
+        assert set(dice['numbers']) <= {1, 2, 3}
+
+        # Deleted distributions cannot be used
+        api.delete_distribution_endpoint('coin')
+        with pytest.raises(RandomGenNotFoundError):
+            api.randomgen_endpoint(RandomGenV3, 100, name='coin')
+
+        # Recreating a deleted distribution does not reuse old generators
+        api.create_distribution_endpoint('coin', [4, 5], [0.5, 0.5])
+        coin = api.randomgen_endpoint(RandomGenV3, 100, name='coin')
+        assert set(coin['numbers']) <= {4, 5}
+
+    def test_distributions_neg(self):
+        """Test the named distributions with negative scenarios."""
+
+        api = RandomGenRestApi()
+
+        with pytest.raises(RandomGenTypeError):
+            api.create_distribution_endpoint(1, [1], [1])
+
+        with pytest.raises(RandomGenOptionError):
+            api.create_distribution_endpoint('a/b', [1], [1])
+
+        with pytest.raises(RandomGenProbabilitySumError):
+            api.create_distribution_endpoint('coin', [0, 1], [0.5, 0.6])
+
+        with pytest.raises(RandomGenNotFoundError):
+            api.distribution_endpoint('coin')
+
+        with pytest.raises(RandomGenNotFoundError):
+            api.delete_distribution_endpoint('coin')
+
+        with pytest.raises(RandomGenNotFoundError):
+            api.randomgen_stream_endpoint(RandomGenV3, 100, name='coin')
+
+        for index in range(MAX_DISTRIBUTIONS):
+            api.create_distribution_endpoint(str(index), [1], [1])
+
+        with pytest.raises(RandomGenMaxError):
+            api.create_distribution_endpoint('coin', [1], [1])
+
+        # Existing distributions can still be replaced
+        api.create_distribution_endpoint('0', [2], [1])
+
+    def test_pool_randomgen(self):
+        """ Test the pool of random numbers generated in advance."""
+
+        api = RandomGenRestApi(pool_size=1000)
+        api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+
+        response = api.randomgen_endpoint(RandomGenV1, 100)
+        pool = api.pool_randomgen(RandomGenV1)
+
+        assert len(response['numbers']) == 100
+        assert set(response['numbers']) <= {1, 2}
+        assert pool.source is api.prepare_randomgen(RandomGenV1)
+
+        # Seeded streams do not use the pool
+        seeded = api.randomgen_endpoint(RandomGenV1, 10, seed=1)
+        assert seeded == api.randomgen_endpoint(RandomGenV1, 10, seed=1)
+
+        # The pool is replaced after a change of the configuration
+        api.config_endpoint(numbers=[3, 4], probabilities=[0.5, 0.5])
+        assert pool._closed
+
+        response = api.randomgen_endpoint(RandomGenV1, 100)
+        assert set(response['numbers']) <= {3, 4}
+        assert api.pool_randomgen(RandomGenV1) is not pool
+
+        api.close_pools()
+
+    def test_endpoint_api_patch_config(self):
+        """Test the partial update of the configuration."""
+
+        api = RandomGenRestApi()
+        api.config_endpoint(numbers=[1, 2, 3], probabilities=[0.2, 0.2, 0.6])
+        previous = api.prepare_randomgen(RandomGenV4)
+
+        response = api.patch_config_endpoint(
+            numbers=[3, 4], probabilities=[0.4, 0.4], remove=[2])
+
+        assert response['numbers'] == [3, 4]
+        assert response['probabilities'] == pytest.approx([0.4, 0.4])
+        assert response['removed'] == [2]
+        assert api.config['NUMBERS'] == [1, 3, 4]
+        assert api.config['PROBABILITIES'] == [0.2, 0.4, 0.4]
+
+        # The dynamic generator is updated in a copy instead of being rebuilt
+        randomgen = api.prepare_randomgen(RandomGenV4)
+        assert randomgen is not previous
+        assert randomgen.to_dict() == pytest.approx({1: 0.2, 3: 0.4, 4: 0.4})
+        assert previous.to_dict() == pytest.approx({1: 0.2, 2: 0.2, 3: 0.6})
+
+        # The other generators are rebuilt from the configuration
+        assert api.prepare_randomgen(RandomGenV1).to_dict() == \
+            {1: 0.2, 3: 0.4, 4: 0.4}
+
+    def test_endpoint_api_patch_config_weights(self):
+        """Test the update of single weights without normalization."""
+
+        api = RandomGenRestApi()
+        api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+        thread_randomgen = api.thread_randomgen(RandomGenV4)
+
+        # The weights are relative to the current probabilities
+        response = api.patch_config_endpoint(numbers=[1], probabilities=[3])
+        assert response['probabilities'] == pytest.approx([6 / 7])
+
+        api.patch_config_endpoint(numbers=[2], probabilities=[1])
+        api.patch_config_endpoint(numbers=[5], probabilities=[1], remove=[1])
+
+        # Several patches are applied together by the first reader
+        expected = {2: 0.35, 5: 0.65}
+        config = api.config
+        assert dict(zip(config['NUMBERS'], config['PROBABILITIES'])) == \
+            pytest.approx(expected)
+        assert api.prepare_randomgen(RandomGenV4).to_dict() == \
+            pytest.approx(expected)
+
+        # The threads use a new copy of the updated generator
+        randomgen = api.thread_randomgen(RandomGenV4)
+        assert randomgen is not thread_randomgen
+        assert set(randomgen.generate(1000)) <= {2, 5}
+
+    def test_endpoint_api_patch_config_copy(self):
+        """Test that the generators of the previous snapshot are kept."""
+
+        api = RandomGenRestApi()
+        api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+        randomgen = api.thread_randomgen(RandomGenV4)
+
+        api.patch_config_endpoint(numbers=[7], probabilities=[3.0])
+
+        # The copy taken before the patch keeps the previous distribution
+        assert randomgen.to_dict() == pytest.approx({1: 0.5, 2: 0.5})
+        numbers = randomgen.generate(10000)
+        assert set(numbers) == {1, 2}
+        assert 0.45 < numbers.count(1) / len(numbers) < 0.55
+
+        # The requests of the new snapshot use the patched distribution
+        assert api.thread_randomgen(RandomGenV4).to_dict() == \
+            pytest.approx({1: 0.125, 2: 0.125, 7: 0.75})
+
+    def test_endpoint_api_patch_config_lazy(self):
+        """Test that the numbers are only derived for a quality report."""
+
+        api = RandomGenRestApi()
+        api.config_endpoint(numbers=[1, 2], probabilities=[0.5, 0.5])
+        api.prepare_randomgen(RandomGenV4)
+        api.patch_config_endpoint(numbers=[3], probabilities=[1.0])
+
+        api.randomgen_endpoint(RandomGenV4, 10, QUALITY_NONE)
+        assert 'PROBABILITIES' not in api.config._values
+
+        response = api.randomgen_endpoint(RandomGenV4, 10)
+        assert response['quality']['expected_histogram'] == \
+            pytest.approx({1: 0.25, 2: 0.25, 3: 0.5})
+
+    def test_endpoint_api_patch_config_neg(self):
+        """Test the partial update with negative scenarios."""
+
+        api = RandomGenRestApi()
+
+        with pytest.raises(RandomGenProbabilitySumError):
+            api.patch_config_endpoint(
+                numbers=DEFAULT_NUMBERS, probabilities=[0] * 5)
+
+        with pytest.raises(RandomGenNotFoundError):
+            api.patch_config_endpoint(numbers=[], probabilities=[],
+                                      remove=[1, 1])
+
+        with pytest.raises(RandomGenNotFoundError):
+            api.patch_config_endpoint(numbers=[], probabilities=[],
+                                      remove=[100])
+
+        with pytest.raises(RandomGenMismatchError):
+            api.patch_config_endpoint(numbers=[1], probabilities=[])
+
+        with pytest.raises(RandomGenProbabilityNegativeError):
+            api.patch_config_endpoint(numbers=[1], probabilities=[-0.1])
+
+        with pytest.raises(RandomGenTypeError):
+            api.patch_config_endpoint(numbers=["1"], probabilities=[0.1])
+
+        # The configuration must not change after an error
+        assert api.config['NUMBERS'] == DEFAULT_NUMBERS
+
     def test_endpoint_api_reset(self):
         """Test the reset endpoint."""
 
@@ -1,6 +1,7 @@
 # encoding: utf-8
+import numpy
 import pytest
-from randomgen.histogram import Histogram
+from randomgen.histogram import Histogram, count_array
 from randomgen.errors import *
 
 versions = [Histogram, ]
@@ -125,6 +126,26 @@ class TestHistogramParamNumbers(object):
         histogram.validate_numbers()
         assert histogram._numbers == [-1, 0, 1, 2.0, 3]
 
+    def test_int_array(self, histogram):
+        """ Test the `numbers` parameter with an integer array."""
+
+        histogram.set_numbers(numpy.array([-1, 0, 1, 2, 3]))
+        histogram.validate_numbers()
+
+    def test_empty_array(self, histogram):
+        """ Test the `numbers` parameter with an empty array."""
+
+        with pytest.raises(RandomGenEmptyError):
+            histogram.set_numbers(numpy.array([], dtype=int))
+            histogram.validate_numbers()
+
+    def test_string_array(self, histogram):
+        """ Test the `numbers` parameter with a string array."""
+
+        with pytest.raises(RandomGenTypeError):
+            histogram.set_numbers(numpy.array(["1", "2"]))
+            histogram.validate_numbers()
+
 
 @pytest.mark.parametrize("histogram", versions, indirect=True)
 class TestHistogramFunctional(object):
@@ -145,6 +166,95 @@ class TestHistogramFunctional(object):
         assert list(histogram.keys()) == [-1, 0, 1, 2, 3]
         assert list(histogram.values()) == [0.2, 0.2, 0.2, 0.2, 0.2]
 
+    def test_counts(self, histogram):
+        """ Test the counts of the `calc` method. """
+
+        histogram.set_numbers([1, 1, 1, 2])
+        histogram.calc()
+        assert histogram.counts == {1: 3, 2: 1}
+
+    def test_calc_array(self, histogram):
+        """ Test the `calc` method with arrays of numbers. """
+
+        numbers = [-1, -1, 0, 3, 3, 3, 10 ** 12]
+        expected = {-1: 2, 0: 1, 3: 3, 10 ** 12: 1}
+
+        # Sparse integers are counted with numpy.unique
+        histogram.set_numbers(numpy.array(numbers)).calc()
+        assert histogram.counts == expected
+
+        # Dense integers are counted with numpy.bincount
+        histogram.set_numbers(numpy.array(numbers[:-1], dtype=numpy.int8))
+        histogram.calc()
+        assert histogram.counts == {-1: 2, 0: 1, 3: 3}
+        assert all(type(num) is int for num in histogram.counts)
+
+        histogram.set_numbers(numpy.array([0.5, 0.5, 2.0])).calc()
+        assert histogram.counts == {0.5: 2, 2.0: 1}
+
+    def test_update(self, histogram):
+        """ Test the incremental `update` method. """
+
+        histogram = Histogram()
+        histogram.update([1, 1, 2])
+        histogram.update(numpy.array([2, 3, 3, 3]))
+
+        assert histogram.counts == {1: 2, 2: 2, 3: 3}
+        assert histogram.total == 7
+        assert histogram[3] == pytest.approx(3 / 7)
+
+        # A mapping updates the probabilities like a dictionary
+        histogram.update({4: 0.5})
+        assert histogram[4] == 0.5
+        assert histogram.total == 7
+
+    def test_merge(self, histogram):
+        """ Test the `merge` method. """
+
+        first = Histogram().update([1, 2, 2])
+        second = Histogram().set_numbers([2, 3]).calc()
+        first.merge(second)
+
+        assert first.counts == {1: 1, 2: 3, 3: 1}
+        assert first.total == 5
+        assert first == Histogram().set_numbers([1, 2, 2, 2, 3]).calc()
+
+        with pytest.raises(RandomGenTypeError):
+            first.merge({1: 1})
+
+    def test_count_array(self, histogram):
+        """ Test that both counting methods give the same counts. """
+
+        numbers = numpy.random.default_rng(1).integers(-5, 5, 1000)
+        values, counts = count_array(numbers)
+        expected_values, expected_counts = numpy.unique(
+            numbers, return_counts=True)
+
+        assert values.tolist() == expected_values.tolist()
+        assert counts.tolist() == expected_counts.tolist()
+
+    @pytest.mark.parametrize('dtype', [numpy.int8, numpy.uint8])
+    def test_count_array_dtype(self, histogram, dtype):
+        """ Test narrow integer arrays spanning the full range. """
+
+        info = numpy.iinfo(dtype)
+        numbers = numpy.arange(info.min, info.max + 1).astype(dtype)
+        numbers = numpy.concatenate([numbers, numbers[[0, -1, -1]]])
+        values, counts = count_array(numbers)
+
+        assert values.tolist() == list(range(info.min, info.max + 1))
+        assert counts.tolist() == [2] + [1] * (info.max - info.min - 1) + [3]
+
+    def test_count_array_uint64(self, histogram):
+        """ Test an unsigned array beyond the range of int64. """
+
+        numbers = numpy.iinfo(numpy.uint64).max - numpy.arange(
+            10, dtype=numpy.uint64)
+        values, counts = count_array(numbers)
+
+        assert values.tolist() == sorted(numbers.tolist())
+        assert counts.tolist() == [1] * 10
+
 
 if __name__ == "__main__":
     pytest.main()
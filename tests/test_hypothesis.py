@@ -1,9 +1,17 @@
 # encoding: utf-8
+import numpy
 import pytest
-from randomgen.hypothesis import ChiSquareTest
+from randomgen.histogram import Histogram
+from randomgen.hypothesis import (
+    ChiSquareTest,
+    ChiSquareAccumulator,
+    chi_square_batch
+)
 from randomgen.errors import (
     RandomGenTypeError,
-    RandomGenEmptyError
+    RandomGenEmptyError,
+    RandomGenMismatchError,
+    RandomGenProbabilityNegativeError
 )
 
 variations = [ChiSquareTest, ]
@@ -271,6 +279,203 @@ class TestChiSquareFunctional(object):
 
         assert hypothesis.is_null() is False
 
+    def test_chi_square_counts(self, hypothesis):
+        """ Test that counted numbers give the same result as raw numbers."""
+
+        numbers = [1, 1, 1, 2, 2, 2, 2, 3]
+        probabilities = [0.3, 0.5, 0.2]
+
+        hypothesis.set_observed_numbers(numbers)
+        hypothesis.set_expected_probabilities(probabilities)
+        hypothesis.calc()
+        expected = (hypothesis.chi_square, hypothesis.df, hypothesis.p_value)
+
+        hypothesis.set_observed_counts({1: 3, 2: 4, 3: 1})
+        hypothesis.validate()
+        hypothesis.calc()
+        observed = (hypothesis.chi_square, hypothesis.df, hypothesis.p_value)
+
+        assert observed == expected
+
+    def test_chi_square_counts_invalid(self, hypothesis):
+        """ Test the validation of the observed counts."""
+
+        with pytest.raises(RandomGenTypeError):
+            hypothesis.set_observed_counts([1, 2, 3])
+            hypothesis.validate_observed_counts()
+
+        with pytest.raises(RandomGenEmptyError):
+            hypothesis.set_observed_counts({})
+            hypothesis.validate_observed_counts()
+
+    def test_chi_square_histogram(self, hypothesis):
+        """ Test the ChiSquareTest class with the counts of a histogram."""
+
+        histogram = Histogram().update([1, 1, 1, 2, 2, 2, 2, 3])
+        hypothesis.set_observed_histogram(histogram)
+        hypothesis.set_expected_probabilities([0.3, 0.5, 0.2])
+        hypothesis.validate()
+        hypothesis.calc()
+
+        assert hypothesis.counts == {1: 3, 2: 4, 3: 1}
+        assert hypothesis.df == 2
+
+        with pytest.raises(RandomGenTypeError):
+            hypothesis.set_observed_histogram({1: 3})
+
+    def test_chi_square_lazy_p_value(self, hypothesis):
+        """ Test that is_null agrees with the p-value without computing it."""
+
+        for numbers in ([1, 1, 1, 2, 2, 2], [1] * 30 + [2] * 70):
+            hypothesis.set_observed_numbers(numbers)
+            hypothesis.set_expected_probabilities([0.5, 0.5])
+            hypothesis.calc()
+
+            decisions = [hypothesis.is_null(alpha) for alpha in (0.01, 0.1)]
+            assert hypothesis._p_value is None
+
+            assert decisions == [hypothesis.p_value > 0.01,
+                                 hypothesis.p_value > 0.1]
+
+
+##############################################################################
+
+class TestChiSquareAccumulator(object):
+    """ Test the ChiSquareAccumulator class. """
+
+    def test_update(self):
+        """ Test that chunks give the same result as all the numbers."""
+
+        numbers = [1, 1, 1, 2, 2, 2, 2, 3]
+        probabilities = [0.3, 0.5, 0.2]
+
+        expected = (
+            ChiSquareTest()
+            .set_observed_numbers(numbers)
+            .set_expected_probabilities(probabilities)
+            .calc()
+        )
+
+        accumulator = ChiSquareAccumulator([1, 2, 3], probabilities)
+        accumulator.update(numbers[:3])
+        accumulator.update(numpy.array(numbers[3:]))
+
+        assert accumulator.total == 8
+        assert accumulator.chi_square == pytest.approx(expected.chi_square)
+        assert accumulator.df == expected.df
+        assert accumulator.p_value == pytest.approx(expected.p_value)
+        assert accumulator.is_null() is expected.is_null()
+
+    def test_update_counts(self):
+        """ Test the counts of a histogram and the merge of accumulators."""
+
+        first = ChiSquareAccumulator([3, 1, 2], [0.2, 0.3, 0.5])
+        first.update_counts(Histogram().update([1, 1, 1, 2]).counts)
+
+        second = ChiSquareAccumulator([3, 1, 2], [0.2, 0.3, 0.5])
+        second.update([2, 2, 2, 3])
+
+        reference = ChiSquareAccumulator([1, 2, 3], [0.3, 0.5, 0.2])
+        reference.update([1, 1, 1, 2, 2, 2, 2, 3])
+
+        assert first.merge(second).chi_square == \
+            pytest.approx(reference.chi_square)
+
+    def test_unexpected(self):
+        """ Test that unexpected numbers reject the null hypothesis."""
+
+        accumulator = ChiSquareAccumulator([1, 2, 3], [0.5, 0.5, 0.0])
+        accumulator.update([1, 2] * 100)
+        assert accumulator.df == 1
+        assert accumulator.is_null() is True
+
+        accumulator.update([3])
+        assert accumulator.chi_square == float('inf')
+        assert accumulator.is_null() is False
+
+        accumulator = ChiSquareAccumulator([1, 2], [0.5, 0.5])
+        accumulator.update([1, 2, 4])
+        assert accumulator.is_null() is False
+
+    def test_invalid(self):
+        """ Test the validation of the accumulator."""
+
+        with pytest.raises(RandomGenMismatchError):
+            ChiSquareAccumulator([1, 2], [1.0])
+
+        with pytest.raises(RandomGenEmptyError):
+            ChiSquareAccumulator([], [])
+
+        with pytest.raises(RandomGenMismatchError):
+            ChiSquareAccumulator([1], [1.0]).merge(
+                ChiSquareAccumulator([2], [1.0]))
+
+    def test_empty(self):
+        """ Test an accumulator before any number is counted."""
+
+        accumulator = ChiSquareAccumulator([1, 2], [0.5, 0.5])
+        accumulator.update([])
+
+        assert accumulator.p_value is None
+        assert str(accumulator) == (
+            "Chi-square: None df: None P-value:None Null hypothesis: None")
+
+        with pytest.raises(RandomGenEmptyError):
+            accumulator.is_null()
+
+
+##############################################################################
+
+class TestChiSquareBatch(object):
+    """ Test the chi_square_batch function. """
+
+    def test_batch(self):
+        """ Test that every row gives the same result as ChiSquareTest."""
+
+        probabilities = [0.3, 0.5, 0.2]
+        counts = numpy.array([[3, 4, 1], [30, 50, 20], [10, 1, 9]])
+
+        chi_square, df, p_value = chi_square_batch(counts, probabilities)
+
+        for row, sample in enumerate(counts.tolist()):
+            expected = (
+                ChiSquareTest()
+                .set_observed_counts(dict(zip([1, 2, 3], sample)))
+                .set_expected_probabilities(probabilities)
+                .calc()
+            )
+            assert chi_square[row] == pytest.approx(expected.chi_square)
+            assert df[row] == expected.df
+            assert p_value[row] == pytest.approx(expected.p_value)
+
+    def test_batch_probabilities(self):
+        """ Test the probabilities per sample and the special rows."""
+
+        counts = [[5, 5, 0], [5, 5, 1], [0, 0, 0]]
+        probabilities = [[0.5, 0.5, 0.0], [0.5, 0.5, 0.0], [0.2, 0.3, 0.5]]
+
+        chi_square, df, p_value = chi_square_batch(counts, probabilities)
+
+        assert chi_square[0] == 0.0 and p_value[0] == 1.0
+        assert chi_square[1] == numpy.inf and p_value[1] == 0.0
+        assert numpy.isnan(chi_square[2])
+        assert df.tolist() == [1, 1, 2]
+
+    def test_batch_invalid(self):
+        """ Test the validation of the batch."""
+
+        with pytest.raises(RandomGenTypeError):
+            chi_square_batch([1, 2], [0.5, 0.5])
+
+        with pytest.raises(RandomGenMismatchError):
+            chi_square_batch([[1, 2]], [0.2, 0.3, 0.5])
+
+        with pytest.raises(RandomGenMismatchError):
+            chi_square_batch([[1, 2]], [[0.5, 0.5], [0.5, 0.5]])
+
+        with pytest.raises(RandomGenProbabilityNegativeError):
+            chi_square_batch([[1, 2]], [1.5, -0.5])
+
 
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,72 @@
+# encoding: utf-8
+import os
+import numpy
+import pytest
+
+from randomgen import parallel
+from randomgen.parallel import (
+    SHARED_MEMORY_DIR,
+    split_amount,
+    create_shared_array,
+)
+from randomgen.errors import RandomGenOptionError
+
+
+class TestParallel(object):
+    """ Test the helpers of the generation in a pool of processes."""
+
+    def test_split_amount(self):
+        """ Test that the slices cover the whole amount."""
+
+        bounds = split_amount(10, 3)
+
+        assert bounds == [(0, 4), (4, 7), (7, 10)]
+
+    def test_split_amount_small(self):
+        """ Test the split of fewer numbers than workers."""
+
+        bounds = split_amount(1, 3)
+
+        assert [stop - start for start, stop in bounds] == [1, 0, 0]
+
+    def test_shared_array(self):
+        """ Test that the shared array can be opened by its path."""
+
+        path, array = create_shared_array(10, numpy.int32)
+
+        try:
+            shared = numpy.memmap(path, dtype=numpy.int32, mode='r+',
+                                  shape=(10,))
+            shared[:] = numpy.arange(10)
+            shared.flush()
+
+            assert array.tolist() == list(range(10))
+
+        finally:
+            os.unlink(path)
+
+    def test_shared_array_space(self, monkeypatch):
+        """ Test the fallback when the shared memory is too small."""
+
+        monkeypatch.setattr(
+            parallel, 'free_space',
+            lambda directory: 0 if directory == SHARED_MEMORY_DIR else 10 ** 9)
+
+        path, array = create_shared_array(10, numpy.int32)
+
+        try:
+            assert not path.startswith(SHARED_MEMORY_DIR)
+            assert os.path.getsize(path) == 40
+
+        finally:
+            os.unlink(path)
+
+        # No directory has enough space
+        monkeypatch.setattr(parallel, 'free_space', lambda directory: 0)
+
+        with pytest.raises(RandomGenOptionError):
+            create_shared_array(10, numpy.int32)
+
+
+if __name__ == "__main__":
+    pytest.main()
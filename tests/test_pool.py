@@ -0,0 +1,92 @@
+# encoding: utf-8
+import time
+import pytest
+
+from randomgen.core import RandomGenV3
+from randomgen.pool import NumberPool
+
+
+@pytest.fixture
+def randomgen():
+    return (
+        RandomGenV3()
+        .set_numbers([1, 2, 3])
+        .set_probabilities([0.2, 0.3, 0.5])
+        .validate()
+    )
+
+
+def wait_for(condition, timeout=5):
+    """ Wait until the background thread reaches a condition. """
+
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    return condition()
+
+
+class TestNumberPool(object):
+    """ Test the pool of random numbers generated in advance."""
+
+    def test_fill(self, randomgen):
+        """ Test that the background thread fills the buffer."""
+
+        pool = NumberPool(randomgen, capacity=1000)
+        assert wait_for(lambda: len(pool) == 1000)
+
+        random_numbers = pool.generate(100)
+        assert len(random_numbers) == 100
+        assert set(random_numbers) <= {1, 2, 3}
+        assert len(pool) == 900
+
+        pool.close()
+
+    def test_refill(self, randomgen):
+        """ Test that the buffer is refilled below the low-water mark."""
+
+        pool = NumberPool(randomgen, capacity=1000, low_water=500)
+        assert wait_for(lambda: len(pool) == 1000)
+
+        pool.generate(600, as_array=True)
+        assert wait_for(lambda: len(pool) == 1000)
+
+        pool.close()
+
+    def test_fallback(self, randomgen):
+        """ Test that large requests are completed on the request thread."""
+
+        pool = NumberPool(randomgen, capacity=100)
+        assert wait_for(lambda: len(pool) == 100)
+
+        random_numbers = pool.generate(1000, as_array=True)
+        assert random_numbers.size == 1000
+        assert pool.generate(0) == []
+
+        pool.close()
+
+    def test_close(self, randomgen):
+        """ Test that closing the pool stops the background thread."""
+
+        pool = NumberPool(randomgen, capacity=1000)
+        pool.close()
+
+        pool._thread.join(timeout=5)
+        assert not pool._thread.is_alive()
+        assert len(pool) == 0
+
+        # The pool still generates numbers, without a buffer
+        assert len(pool.generate(10)) == 10
+
+    def test_seeded(self, randomgen):
+        """ Test that seeded streams are not buffered."""
+
+        pool = NumberPool(randomgen, capacity=100)
+        assert pool.generate_seeded(10, seed=1) == \
+            randomgen.generate_seeded(10, seed=1)
+
+        pool.close()
+
+
+if __name__ == "__main__":
+    pytest.main()
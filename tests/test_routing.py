@@ -1,4 +1,6 @@
 # encoding: utf-8
+import json
+import numpy
 import pytest
 import requests
 import threading
@@ -96,6 +98,168 @@ class TestRestApiRouting(object):
             # Check the response
             assert response.status_code == 500
 
+    def test_endpoint_api_v3_randomgen_pos(self):
+        """Test the /api/v3/randomgen endpoint with positive numbers."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/v3/randomgen'
+
+        for num in (1, 10000):
+            # Query parameters
+            params = {'numbers': num}
+
+            # Send a GET request
+            response = requests.get(url, params=params)
+
+            # Check the response
+            assert response.status_code == 200
+
+    def test_endpoint_api_v3_randomgen_neg(self):
+        """Test the /api/v3/randomgen endpoint with negative numbers."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/v3/randomgen'
+
+        for num in (-1, 0, 10001,):
+            # Query parameters
+            params = {'numbers': num}
+
+            # Send a GET request
+            response = requests.get(url, params=params)
+
+            # Check the response
+            assert response.status_code == 500
+
+    def test_endpoint_api_randomgen_quality(self):
+        """Test the quality query parameter of the randomgen endpoints."""
+
+        for version in (1, 2, 3):
+            # Endpoint URL
+            url = self.base_url + f'/api/v{version}/randomgen'
+
+            # Query parameters
+            params = {'numbers': 100, 'quality': 'none'}
+
+            # Send a GET request
+            response = requests.get(url, params=params)
+
+            # Check the response
+            assert response.status_code == 200
+            assert 'quality' not in response.json()
+
+            # Send a GET request with an unknown quality level
+            params = {'numbers': 100, 'quality': 'unknown'}
+            response = requests.get(url, params=params)
+            assert response.status_code == 500
+
+    def test_endpoint_api_randomgen_ndjson(self):
+        """Test the streaming of the randomgen endpoints."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/v1/randomgen'
+
+        # Query parameters
+        params = {'numbers': 100000, 'format': 'ndjson'}
+
+        # Send a GET request and read the stream
+        response = requests.get(url, params=params, stream=True)
+        records = [json.loads(line) for line in response.iter_lines()]
+
+        # Check the response
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'application/x-ndjson'
+        assert sum(len(r.get('numbers', ())) for r in records) == 100000
+        assert 'quality' in records[-1]
+
+        # Select the format with the Accept header
+        headers = {'Accept': 'application/x-ndjson'}
+        params = {'numbers': 10}
+        response = requests.get(url, params=params, headers=headers)
+        assert response.headers['Content-Type'] == 'application/x-ndjson'
+
+        # Send a GET request with an unknown format
+        params = {'numbers': 10, 'format': 'unknown'}
+        response = requests.get(url, params=params)
+        assert response.status_code == 500
+
+    def test_endpoint_api_randomgen_binary(self):
+        """Test the packed random numbers of the randomgen endpoints."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/v3/randomgen'
+
+        # Query parameters
+        params = {'numbers': 1000, 'format': 'binary'}
+
+        # Send a GET request
+        response = requests.get(url, params=params)
+
+        # Check the response
+        dtype = numpy.dtype(response.headers['X-RandomGen-Dtype'])
+        numbers = numpy.frombuffer(response.content, dtype=dtype)
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'application/octet-stream'
+        assert numbers.size == 1000
+        assert 'X-RandomGen-P-Value' in response.headers
+        assert 'X-RandomGen-Observed-Histogram' not in response.headers
+
+        # Select the format with the Accept header
+        headers = {'Accept': 'application/octet-stream'}
+        response = requests.get(url, params={'numbers': 10}, headers=headers)
+        assert len(response.content) == 10 * dtype.itemsize
+
+    def test_endpoint_api_randomgen_seeded(self):
+        """Test the seeded streams of the randomgen endpoints."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/v2/randomgen'
+
+        # Send two GET requests for overlapping slices of the stream
+        params = {'numbers': 20, 'seed': 11, 'quality': 'none'}
+        numbers = requests.get(url, params=params).json()['numbers']
+
+        params = {'numbers': 10, 'seed': 11, 'offset': 10, 'quality': 'none'}
+        response = requests.get(url, params=params)
+
+        # Check the response
+        assert response.status_code == 200
+        assert response.json()['numbers'] == numbers[10:]
+
+        # Send a GET request with an invalid offset
+        params = {'numbers': 10, 'seed': 11, 'offset': -1}
+        response = requests.get(url, params=params)
+        assert response.status_code == 500
+
+    def test_endpoint_api_parametric(self):
+        """Test the endpoints of the parametric distributions."""
+
+        # Send a GET request for Poisson numbers
+        url = self.base_url + '/api/poisson/randomgen'
+        response = requests.get(url, params={'rate': 4, 'numbers': 100})
+
+        # Check the response
+        assert response.status_code == 200
+        assert len(response.json()['numbers']) == 100
+
+        # Send a GET request for binomial numbers
+        url = self.base_url + '/api/binomial/randomgen'
+        params = {'trials': 10, 'probability': 0.3, 'numbers': 100}
+        response = requests.get(url, params=params)
+
+        # Check the response
+        assert response.status_code == 200
+        assert max(response.json()['numbers']) <= 10
+
+        # Send a GET request without the probability
+        response = requests.get(url, params={'trials': 10})
+        assert response.status_code == 500
+
+        # Send a GET request for a format other than JSON
+        params = {'trials': 10, 'probability': 0.3, 'format': 'binary'}
+        response = requests.get(url, params=params)
+        assert response.status_code == 500
+
     def test_endpoint_api_config(self):
         """Test the /api/config endpoint."""
 
@@ -121,6 +285,82 @@ class TestRestApiRouting(object):
         # Check the response
         assert response.status_code == 200
 
+    def test_endpoint_api_patch_config(self):
+        """Test the PATCH /api/config endpoint."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/config'
+
+        # Set a known configuration
+        data = {'numbers': [1, 2, 3], 'probabilities': [0.2, 0.2, 0.6]}
+        requests.post(url, json=data)
+
+        # Send a PATCH request
+        data = {'numbers': [1, 4], 'probabilities': [0.4, 0.4], 'remove': [3]}
+        response = requests.patch(url, json=data)
+
+        # Check the response
+        assert response.status_code == 200
+        assert response.json()['numbers'] == [1, 4]
+        assert response.json()['probabilities'] == [0.4, 0.4]
+        assert response.json()['removed'] == [3]
+
+        # Generate numbers with the dynamic generator
+        url = self.base_url + '/api/v4/randomgen'
+        response = requests.get(url, params={'numbers': 1000})
+        assert response.status_code == 200
+        assert set(response.json()['numbers']) <= {1, 2, 4}
+
+        # Reset the configuration
+        requests.post(self.base_url + '/api/reset')
+
+    def test_endpoint_api_v5_randomgen(self):
+        """Test the /api/v5/randomgen endpoint."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/v5/randomgen'
+
+        # Send a GET request
+        response = requests.get(url, params={'numbers': 1000})
+
+        # Check the response
+        assert response.status_code == 200
+        assert set(response.json()['numbers']) <= set(DEFAULT_NUMBERS)
+
+    def test_endpoint_api_distributions(self):
+        """Test the /api/distributions endpoints."""
+
+        # Endpoint URL
+        url = self.base_url + '/api/distributions'
+
+        # Create a named distribution
+        data = {'name': 'coin', 'numbers': [0, 1], 'probabilities': [0.5, 0.5]}
+        response = requests.post(url, json=data)
+        assert response.status_code == 200
+        assert response.json() == data
+
+        # List the distributions
+        response = requests.get(url)
+        assert response.json()['distributions']['coin']['numbers'] == [0, 1]
+
+        # Generate numbers from the distribution
+        response = requests.get(url + '/coin/randomgen',
+                                params={'numbers': 100})
+        assert response.status_code == 200
+        assert set(response.json()['numbers']) <= {0, 1}
+
+        # The default configuration is not changed
+        response = requests.get(self.base_url + '/api/v1/randomgen',
+                                params={'numbers': 100})
+        assert set(response.json()['numbers']) <= set(DEFAULT_NUMBERS)
+
+        # Delete the distribution
+        response = requests.delete(url + '/coin')
+        assert response.status_code == 200
+
+        response = requests.get(url + '/coin/randomgen')
+        assert response.status_code == 500
+
     def test_endpoint_api_reset(self, webserver):
         """Test the /api/reset endpoint."""
 
@@ -0,0 +1,193 @@
+# encoding: utf-8
+import os
+import numpy
+import pytest
+
+from randomgen.core import RandomGenV1, RandomGenV3
+from randomgen import endpoints
+from randomgen.endpoints import RandomGenRestApi, DEFAULT_NUMBERS
+from randomgen.snapshot import SNAPSHOT_META, save_snapshot, load_snapshot
+from randomgen.store import ConfigStore
+
+
+def prepare(randomgen_type, numbers, probabilities):
+    return (
+        randomgen_type()
+        .set_numbers(numbers)
+        .set_probabilities(probabilities)
+        .validate()
+    )
+
+
+class TestSnapshot(object):
+    """ Test the snapshots of the prepared tables."""
+
+    def test_tables(self):
+        """ Test that the restored tables give the same numbers."""
+
+        randomgen = prepare(RandomGenV3, [1, 2, 3], [0.2, 0.3, 0.5])
+        restored = RandomGenV3().set_tables(randomgen.get_tables())
+
+        uniforms = numpy.linspace(0, 1, 100, endpoint=False)
+        assert numpy.array_equal(
+            restored.map_uniforms(uniforms), randomgen.map_uniforms(uniforms))
+        assert restored.to_dict() == randomgen.to_dict()
+
+    def test_save_load(self, tmp_path):
+        """ Test that the tables are memory-mapped when loaded."""
+
+        randomgens = [
+            prepare(randomgen_type, [1, 2, 3], [0.2, 0.3, 0.5])
+            for randomgen_type in (RandomGenV1, RandomGenV3)
+        ]
+        save_snapshot(str(tmp_path), randomgens, revision=7)
+
+        revision, numbers, probabilities, restored = load_snapshot(
+            str(tmp_path))
+
+        assert revision == 7
+        assert numbers == [1, 2, 3]
+        assert probabilities == [0.2, 0.3, 0.5]
+        assert [type(randomgen) for randomgen in restored] == [
+            RandomGenV1, RandomGenV3]
+        assert isinstance(restored[1]._alias_indices, numpy.memmap)
+        assert set(restored[1].generate(100)) <= {1, 2, 3}
+
+    def test_mixed_numbers(self, tmp_path):
+        """ Test that mixed integers and floats keep their types."""
+
+        randomgen = prepare(RandomGenV3, [1, 2.5], [0.5, 0.5])
+        save_snapshot(str(tmp_path), [randomgen])
+
+        _, numbers, _, restored = load_snapshot(str(tmp_path))
+        assert numbers == [1, 2.5]
+        assert isinstance(numbers[0], int)
+        assert set(restored[0].generate(100)) <= {1, 2.5}
+
+    def test_replace(self, tmp_path):
+        """ Test that only the files of the older snapshots are removed."""
+
+        first = save_snapshot(
+            str(tmp_path), [prepare(RandomGenV3, [1, 2], [0.5, 0.5])])
+        save_snapshot(
+            str(tmp_path), [prepare(RandomGenV3, [3, 4], [0.5, 0.5])])
+
+        assert load_snapshot(str(tmp_path))[1] == [3, 4]
+        assert len(os.listdir(str(tmp_path))) == 11
+
+        save_snapshot(
+            str(tmp_path), [prepare(RandomGenV3, [5, 6], [0.5, 0.5])])
+
+        assert len(os.listdir(str(tmp_path))) == 11
+        assert not set(first['tables'].values()) & set(
+            os.listdir(str(tmp_path)))
+
+    @pytest.mark.parametrize('content', [None, '', '{"format": 0}'])
+    def test_invalid(self, tmp_path, content):
+        """ Test that a missing or an invalid snapshot is ignored."""
+
+        if content is not None:
+            (tmp_path / SNAPSHOT_META).write_text(content)
+
+        assert load_snapshot(str(tmp_path)) is None
+
+    def test_missing_tables(self, tmp_path):
+        """ Test that a snapshot with missing tables is ignored."""
+
+        meta = save_snapshot(
+            str(tmp_path), [prepare(RandomGenV3, [1, 2], [0.5, 0.5])])
+        os.remove(str(tmp_path / meta['tables']['alias_indices']))
+
+        assert load_snapshot(str(tmp_path)) is None
+
+
+class TestRestart(object):
+    """ Test the configuration restored after a restart of the API."""
+
+    def test_restart(self, tmp_path):
+        """ Test that a new instance starts with the saved configuration."""
+
+        api = RandomGenRestApi(snapshot=str(tmp_path))
+        api.config_endpoint([1, 2], [0.5, 0.5])
+        api.randomgen_endpoint(RandomGenV3, 10)
+        api.flush_snapshot()
+
+        restarted = RandomGenRestApi(snapshot=str(tmp_path))
+        assert restarted.config['NUMBERS'] == [1, 2]
+        assert restarted.config['PROBABILITIES'] == [0.5, 0.5]
+
+        # The restored generator is used without a new validation
+        randomgen = restarted.prepare_randomgen(RandomGenV3)
+        assert isinstance(randomgen._alias_indices, numpy.memmap)
+
+        response = restarted.randomgen_endpoint(RandomGenV3, 100)
+        assert set(response['numbers']) <= {1, 2}
+
+    def test_reset(self, tmp_path):
+        """ Test that a reset is saved as well."""
+
+        api = RandomGenRestApi(snapshot=str(tmp_path))
+        api.config_endpoint([1, 2], [0.5, 0.5])
+        api.reset_endpoint()
+        api.flush_snapshot()
+
+        restarted = RandomGenRestApi(snapshot=str(tmp_path))
+        assert restarted.config['NUMBERS'] == DEFAULT_NUMBERS
+
+    def test_background(self, tmp_path, monkeypatch):
+        """ Test that a series of changes is saved once in the background."""
+
+        saves = []
+        monkeypatch.setattr(
+            endpoints, 'save_snapshot',
+            lambda directory, randomgens, revision: saves.append(
+                [type(randomgen) for randomgen in randomgens]))
+
+        api = RandomGenRestApi(snapshot=str(tmp_path))
+        api.config_endpoint([1, 2], [0.5, 0.5])
+        api.randomgen_endpoint(RandomGenV3, 10)
+        api.patch_config_endpoint([3], [0.5])
+        api.config_endpoint([1, 2], [0.2, 0.8])
+        api.randomgen_endpoint(RandomGenV3, 10)
+        assert saves == []
+
+        # Only the tables of the prepared generators are saved
+        api.flush_snapshot()
+        assert saves == [[RandomGenV3]]
+
+        api.flush_snapshot()
+        assert saves == [[RandomGenV3]]
+
+    def test_timer(self, tmp_path, monkeypatch):
+        """ Test that the timer saves the configuration."""
+
+        monkeypatch.setattr(endpoints, 'SNAPSHOT_DELAY', 0.2)
+
+        api = RandomGenRestApi(snapshot=str(tmp_path))
+        api.config_endpoint([1, 2], [0.5, 0.5])
+        api._snapshot_timer.join()
+
+        assert load_snapshot(str(tmp_path))[1] == [1, 2]
+
+    def test_empty(self, tmp_path):
+        """ Test that the defaults are used without a saved configuration."""
+
+        api = RandomGenRestApi(snapshot=str(tmp_path / 'missing'))
+        assert api.config['NUMBERS'] == DEFAULT_NUMBERS
+
+    def test_store_revision(self, tmp_path):
+        """ Test that the store does not replace the restored generators."""
+
+        path = str(tmp_path / 'config.db')
+        snapshot = str(tmp_path / 'snapshot')
+
+        api = RandomGenRestApi(store=ConfigStore(path), snapshot=snapshot)
+        api.config_endpoint([1, 2], [0.5, 0.5])
+        api.flush_snapshot()
+
+        restarted = RandomGenRestApi(
+            store=ConfigStore(path), snapshot=snapshot, store_interval=0)
+        randomgen = restarted.prepare_randomgen(RandomGenV3)
+
+        assert restarted.config['NUMBERS'] == [1, 2]
+        assert restarted.prepare_randomgen(RandomGenV3) is randomgen
@@ -0,0 +1,138 @@
+# encoding: utf-8
+import os
+import math
+import sys
+import numpy
+import pytest
+import subprocess
+
+from randomgen import special
+from randomgen.special import (
+    gammaincc,
+    gammaln,
+    stirling_error,
+    deviance,
+    chi2_sf,
+    chi2_critical,
+)
+
+
+class TestIncompleteGamma(object):
+    """ Test the built-in regularized incomplete gamma function."""
+
+    def test_known_values(self):
+        """ Test values with a closed form, Q(1, x) = exp(-x)."""
+
+        x = numpy.array([0.1, 0.5, 1.0, 2.0, 10.0, 50.0])
+        assert gammaincc(1, x) == pytest.approx(numpy.exp(-x), rel=1e-12)
+
+        # Q(2, x) = (1 + x) * exp(-x)
+        assert gammaincc(2, x) == \
+            pytest.approx((1 + x) * numpy.exp(-x), rel=1e-12)
+
+    def test_limits(self):
+        """ Test the limits and the invalid arguments."""
+
+        values = gammaincc([2, 2, 2, 0, 2], [0, numpy.inf, numpy.nan, 1, -1])
+
+        assert values[0] == 1.0
+        assert values[1] == 0.0
+        assert numpy.isnan(values[2:]).all()
+
+    def test_scipy(self):
+        """ Test that the built-in function agrees with SciPy."""
+
+        scipy_special = pytest.importorskip('scipy.special')
+
+        rng = numpy.random.default_rng(0)
+        a = numpy.concatenate([rng.uniform(0.5, 20, 500),
+                               rng.uniform(20, 5000, 500)])
+        x = a * rng.uniform(0, 3, a.size)
+
+        assert gammaincc(a, x) == pytest.approx(
+            scipy_special.gammaincc(a, x), rel=1e-9, abs=1e-300)
+
+
+class TestLogGamma(object):
+    """ Test the vectorized logarithm of the gamma function."""
+
+    def test_lgamma(self):
+        """ Test that the values agree with math.lgamma."""
+
+        x = numpy.concatenate([numpy.linspace(0.1, 20, 500),
+                               numpy.geomspace(20, 1e15, 500)])
+        expected = [math.lgamma(value) for value in x]
+
+        assert gammaln(x) == pytest.approx(expected, rel=1e-13, abs=1e-13)
+
+    def test_factorials(self):
+        """ Test the logarithms of small factorials."""
+
+        assert gammaln([1, 2, 3, 11]).tolist() == pytest.approx(
+            [0, 0, math.log(2), math.log(3628800)], abs=1e-13)
+
+    def test_stirling_error(self):
+        """ Test the error of the Stirling approximation."""
+
+        x = numpy.array([1, 2.5, 6.9, 7, 30])
+        expected = [
+            math.lgamma(value + 1) - (value + 0.5) * math.log(value) + value
+            - 0.5 * math.log(2 * math.pi) for value in x]
+
+        assert stirling_error(x) == pytest.approx(expected, abs=1e-13)
+        assert stirling_error(1e15) == pytest.approx(1 / 12e15, rel=1e-9)
+
+    def test_deviance(self):
+        """ Test the deviance near and far from the mean."""
+
+        assert deviance([0, 5, 10, 20], 10).tolist() == pytest.approx(
+            [10, 5 * math.log(0.5) + 5, 0, 20 * math.log(2) - 10])
+        assert deviance(1e15 + 3e7, 1e15) == pytest.approx(0.45, rel=1e-6)
+
+
+class TestChiSquareSurvival(object):
+    """ Test the p-values of the chi-square distribution."""
+
+    def test_critical_value(self, monkeypatch):
+        """ Test the p-value of a known critical value with both backends."""
+
+        assert chi2_sf(9.487729036781154, 4) == pytest.approx(0.05)
+
+        monkeypatch.setattr(special, '_backend', gammaincc)
+        assert chi2_sf(9.487729036781154, 4) == pytest.approx(0.05)
+
+    def test_no_degrees_of_freedom(self):
+        """ Test that zero degrees of freedom give NaN."""
+
+        assert numpy.isnan(chi2_sf(1.0, 0))
+        assert numpy.isnan(chi2_sf([1.0, 1.0], [0, 1])[0])
+
+    def test_critical_value_table(self):
+        """ Test the cached critical values of the chi-square distribution."""
+
+        assert chi2_critical(0.05, 1) == pytest.approx(3.841458820694124)
+        assert chi2_critical(0.01, 10) == pytest.approx(23.209251158954356)
+        assert chi2_sf(chi2_critical(0.05, 100), 100) == pytest.approx(0.05)
+
+        # The second lookup is served from the cache
+        hits = chi2_critical.cache_info().hits
+        chi2_critical(0.05, 1)
+        assert chi2_critical.cache_info().hits == hits + 1
+
+        assert numpy.isnan(chi2_critical(0.05, 0))
+        assert chi2_critical(0, 3) == numpy.inf
+
+    def test_lazy_import(self):
+        """ Test that SciPy is not imported at the start of the service."""
+
+        code = (
+            "import sys, randomgen.endpoints;"
+            "sys.exit('scipy' in sys.modules)"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root)
+        assert result.returncode == 0
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,111 @@
+# encoding: utf-8
+import pytest
+
+from randomgen.core import RandomGenV3
+from randomgen.endpoints import RandomGenRestApi, DEFAULT_NUMBERS
+from randomgen.store import ConfigStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'config.db')
+
+
+class TestConfigStore(object):
+    """ Test the configuration shared by the worker processes."""
+
+    def test_empty(self, path):
+        """ Test that an empty store has no configuration."""
+
+        store = ConfigStore(path)
+        assert store.load() is None
+
+    def test_save_load(self, path):
+        """ Test that the revision increases with every change."""
+
+        store = ConfigStore(path)
+        assert store.save([1, 2], [0.5, 0.5]) == 1
+        assert store.save([1, 3], [0.2, 0.8]) == 2
+        assert store.load() == (2, [1, 3], [0.2, 0.8])
+
+    def test_changed(self, path):
+        """ Test that only the changes of other connections are noticed."""
+
+        writer = ConfigStore(path)
+        reader = ConfigStore(path)
+
+        assert reader.changed() is True
+        assert reader.changed() is False
+
+        writer.changed()
+        writer.save([1, 2], [0.5, 0.5])
+        assert reader.changed() is True
+        assert reader.changed() is False
+        assert writer.changed() is False
+
+
+class TestSharedConfig(object):
+    """ Test the configuration shared by several instances of the API."""
+
+    def test_config(self, path):
+        """ Test that a change reaches the other workers."""
+
+        worker_1 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        worker_2 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        assert worker_2.config['NUMBERS'] == DEFAULT_NUMBERS
+
+        worker_1.config_endpoint([1, 2], [0.5, 0.5])
+        assert worker_2.config['NUMBERS'] == [1, 2]
+        assert worker_2.config['PROBABILITIES'] == [0.5, 0.5]
+
+        response = worker_2.randomgen_endpoint(RandomGenV3, 100)
+        assert set(response['numbers']) <= {1, 2}
+
+    def test_patch_reset(self, path):
+        """ Test that the patches and the resets reach the other workers."""
+
+        worker_1 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        worker_2 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+
+        worker_1.config_endpoint([1, 2], [0.5, 0.5])
+        worker_1.patch_config_endpoint([3], [0.5], remove=[2])
+        assert worker_2.config['NUMBERS'] == [1, 3]
+
+        worker_2.reset_endpoint()
+        assert worker_1.config['NUMBERS'] == DEFAULT_NUMBERS
+
+    def test_rebuild_once(self, path):
+        """ Test that the generators are rebuilt once per change."""
+
+        worker_1 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        worker_2 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+
+        worker_1.config_endpoint([1, 2], [0.5, 0.5])
+        version = worker_2.config['VERSION']
+        randomgen = worker_2.prepare_randomgen(RandomGenV3)
+
+        assert worker_2.config['VERSION'] == version
+        assert worker_2.prepare_randomgen(RandomGenV3) is randomgen
+
+    def test_new_worker(self, path):
+        """ Test that a new worker starts with the shared configuration."""
+
+        worker_1 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        worker_1.config_endpoint([1, 2], [0.5, 0.5])
+
+        worker_2 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        assert worker_2.config['NUMBERS'] == [1, 2]
+
+    def test_interval(self, path):
+        """ Test that the store is checked at most once per interval."""
+
+        worker_1 = RandomGenRestApi(store=ConfigStore(path), store_interval=0)
+        worker_2 = RandomGenRestApi(store=ConfigStore(path), store_interval=60)
+        assert worker_2.config['NUMBERS'] == DEFAULT_NUMBERS
+
+        # The change is applied at the first check after the interval
+        worker_1.config_endpoint([1, 2], [0.5, 0.5])
+        assert worker_2.config['NUMBERS'] == DEFAULT_NUMBERS
+
+        worker_2._store_checked -= 60
+        assert worker_2.config['NUMBERS'] == [1, 2]
@@ -0,0 +1,67 @@
+# encoding: utf-8
+import pytest
+
+from randomgen.streams import CounterStream
+from randomgen.errors import RandomGenOptionError
+
+
+class TestCounterStream(object):
+    """ Test the seeded stream with random access."""
+
+    def test_reproducible(self):
+        """ Test that the same seed gives the same values."""
+
+        values_1 = CounterStream(seed=1).uniforms(offset=0, count=100)
+        values_2 = CounterStream(seed=1).uniforms(offset=0, count=100)
+        values_3 = CounterStream(seed=2).uniforms(offset=0, count=100)
+
+        assert values_1.tolist() == values_2.tolist()
+        assert values_1.tolist() != values_3.tolist()
+
+    def test_skip_ahead(self):
+        """ Test that every slice matches the values of the whole stream."""
+
+        stream = CounterStream(seed=7)
+        values = stream.uniforms(offset=0, count=64).tolist()
+
+        for offset in range(0, 32):
+            assert stream.uniforms(offset, 16).tolist() == \
+                values[offset:offset + 16]
+
+    def test_range(self):
+        """ Test that the values are in the interval [0, 1)."""
+
+        values = CounterStream(seed=3).uniforms(offset=10 ** 12, count=1000)
+
+        assert values.min() >= 0
+        assert values.max() < 1
+
+    def test_lanes(self):
+        """ Test that the lanes are independent streams."""
+
+        stream = CounterStream(seed=4)
+        values = stream.uniforms(offset=0, count=100).tolist()
+
+        assert stream.uniforms(0, 100, lane=0).tolist() == values
+        assert stream.uniforms(0, 100, lane=1).tolist() != values
+        assert stream.uniforms(10, 20, lane=1).tolist() == \
+            stream.uniforms(0, 100, lane=1).tolist()[10:30]
+
+    def test_invalid(self):
+        """ Test the validation of the seed and the offset."""
+
+        with pytest.raises(RandomGenOptionError):
+            CounterStream(seed=-1)
+
+        with pytest.raises(RandomGenOptionError):
+            CounterStream(seed=2 ** 128)
+
+        with pytest.raises(RandomGenOptionError):
+            CounterStream(seed=1).uniforms(offset=-1, count=1)
+
+        with pytest.raises(RandomGenOptionError):
+            CounterStream(seed=1).uniforms(offset=0, count=1, lane=-1)
+
+
+if __name__ == "__main__":
+    pytest.main()